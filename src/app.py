@@ -1,6 +1,7 @@
 #!/usr/bin/env python3.10
 
 import dash_bootstrap_components as dbc
+import psycopg2
 from contextlib import suppress
 from dash import Dash, html, Output, Input, dcc
 from modules.objects import HtmlSidebar
@@ -11,9 +12,16 @@ from modules.views import (
     KnowledgeAreaView,
     AgeView,
     SpecializationView,
+    View,
+)
+from settings import Connection, Files, Server
+from modules.executors import SqlExecutor
+from modules.utils import (
+    data_insertion,
+    initialize_tables,
+    prepare_files,
+    summarize_tables,
 )
-from settings import Files, Server
-from modules.utils import data_insertion, initialize_tables, prepare_files
 
 
 with suppress(Exception):
@@ -21,6 +29,22 @@ with suppress(Exception):
     initialize_tables()
     data_insertion()
 
+# The summary of a database loaded before it existed is built here. If the database
+# can't be reached it is only reported, since the views raise that error when they load.
+try:
+    summarize_tables(
+        SqlExecutor(
+            database=Connection.DATABASE,
+            user=Connection.USER,
+            password=Connection.PASSWORD,
+            host=Connection.HOST,
+            port=Connection.PORT,
+        ),
+        refresh=False,
+    )
+except psycopg2.OperationalError as error:
+    print(f"the summary couldn't be built, the database isn't reachable: {error}")
+
 app = Dash(
     __name__,
     external_stylesheets=[dbc.themes.MINTY, dbc.icons.FONT_AWESOME],
@@ -30,19 +54,30 @@ app = Dash(
 
 
 class StaticElements:
-    INTRODUCTION = Introduction("es_introduction")
+    INTRODUCTION = Introduction("es_introduction", load_all=False)
     NUMBER_PEOPLE_VIEW = NumberPeopleView(
-        title="Vista número de personas", id="number_people"
+        title="Vista número de personas", id="number_people", load_all=False
     )
     KNOWLEDGE_AREA_VIEW = KnowledgeAreaView(
-        title="Vista área de conocimientos", id="knowledge_area"
+        title="Vista área de conocimientos", id="knowledge_area", load_all=False
+    )
+    AGE_VIEW = AgeView(
+        title="Vista de edad de una persona", id="age_person", load_all=False
     )
-    AGE_VIEW = AgeView(title="Vista de edad de una persona", id="age_person")
     EDUCATION_LEVEL_VIEW = EducationLevelView(
-        "Vista del nivel académico", id="education_level"
+        "Vista del nivel académico", id="education_level", load_all=False
     )
 
 
+View.load_concurrently(
+    StaticElements.INTRODUCTION,
+    StaticElements.NUMBER_PEOPLE_VIEW,
+    StaticElements.KNOWLEDGE_AREA_VIEW,
+    StaticElements.AGE_VIEW,
+    StaticElements.EDUCATION_LEVEL_VIEW,
+)
+
+
 def main():
     sidebar = HtmlSidebar(
         "Emigrantes colombianos", "Aquí encontrarás todas las gráficas posibles"
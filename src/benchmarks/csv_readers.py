@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Compare the parsing backends of the CsvReader.
+
+Usage (from the src folder):
+    python -m benchmarks.csv_readers [file] [row_limit]
+"""
+
+import sys
+from time import perf_counter
+from rich.console import Console
+from rich.table import Table
+from modules.readers import CsvReader
+from settings import CsvBackend, Files
+
+
+def benchmark(file: str, row_limit: int = -1) -> None:
+    """
+    Print in console how long each backend takes to read the rows of a CSV file.
+
+    Arguments:
+        file: str
+            The path to the location of .csv file
+
+    Optional arguments:
+        row_limit: int
+            The number of rows. By default they are all.
+    """
+
+    output_table = Table(title=f"CsvReader backends ({file})", show_lines=True)
+    for column in ["backend", "rows", "seconds", "rows/s", "speedup"]:
+        output_table.add_column(column, justify="center")
+
+    baseline = None
+    for backend in CsvBackend:
+        csv_reader = CsvReader(file, backend=backend)
+        start = perf_counter()
+        rows = sum(1 for _ in csv_reader.get_rows(row_limit=row_limit))
+        elapsed = perf_counter() - start
+        baseline = baseline or elapsed
+        output_table.add_row(
+            backend.name.lower(),
+            str(rows),
+            f"{elapsed:.3f}",
+            f"{rows / elapsed:.0f}",
+            f"{baseline / elapsed:.2f}x",
+        )
+
+    Console().print(output_table)
+
+
+if __name__ == "__main__":
+    benchmark(
+        sys.argv[1] if len(sys.argv) > 1 else Files.CSV,
+        int(sys.argv[2]) if len(sys.argv) > 2 else -1,
+    )
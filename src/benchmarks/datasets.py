@@ -0,0 +1,302 @@
+#!/usr/bin/env python
+"""
+Generate a synthetic CSV file with the same 14 columns as the real one,
+to measure the insertion without it.
+
+Usage (from the src folder):
+    python -m benchmarks.datasets file rows [seed]
+
+The file can be a .csv or a .csv.gz file.
+"""
+
+import csv
+import gzip
+import io
+import sys
+from time import perf_counter
+import numpy as np
+import pycountry
+from pycountry_convert import map_country_alpha3_to_country_alpha2
+from pycountry_convert.convert_country_alpha2_to_continent_code import (
+    COUNTRY_ALPHA2_TO_CONTINENT_CODE,
+)
+
+
+HEADERS = [
+    "País",
+    "Código ISO país",
+    "Oficina de registro",
+    "Grupo edad",
+    "Edad (años)",
+    "Área Conocimiento",
+    "Sub Área Conocimiento",
+    "Nivel Académico",
+    "Estado civil",
+    "Género",
+    "Etnia de la persona",
+    "Estatura (CM)",
+    "Localización",
+    "Cantidad de personas",
+]
+
+# The countries with most Colombians registered, first, so they are the most frequent.
+MAIN_COUNTRIES = [
+    "VEN",
+    "USA",
+    "ESP",
+    "ECU",
+    "CHL",
+    "CAN",
+    "MEX",
+    "PAN",
+    "ARG",
+    "ITA",
+    "DEU",
+    "FRA",
+    "GBR",
+    "AUS",
+    "PER",
+    "BRA",
+    "CRI",
+    "NLD",
+    "CHE",
+    "SWE",
+]
+UNKNOWN = "NO INDICA"
+AREAS = [
+    "AGRONOMIA, VETERINARIA Y AFINES",
+    "BELLAS ARTES",
+    "CIENCIAS DE LA EDUCACION",
+    "CIENCIAS DE LA SALUD",
+    "CIENCIAS SOCIALES Y HUMANAS",
+    "ECONOMIA, ADMINISTRACION, CONTADURIA Y AFINES",
+    "INGENIERIA, ARQUITECTURA, URBANISMO Y AFINES",
+    "MATEMATICAS Y CIENCIAS NATURALES",
+]
+ACADEMIC_LEVELS = [
+    "BACHILLERATO",
+    "PREGRADO - PROFESIONAL",
+    "TECNICO",
+    "TECNOLOGO",
+    "POSTGRADO - ESPECIALIZACION",
+    "POSTGRADO - MAESTRIA",
+    "POSTGRADO - DOCTORADO",
+    "PRIMARIA",
+    "NINGUNO",
+]
+GENDERS = ["FEMENINO", "MASCULINO", "DESCONOCIDO"]
+MARITAL_STATUSES = [
+    "SOLTERO",
+    "CASADO",
+    "UNION LIBRE",
+    "DIVORCIADO",
+    "SEPARADO",
+    "VIUDO",
+]
+ETHNIC_GROUPS = [
+    "NINGUNA",
+    "AFRODESCENDIENTE",
+    "INDIGENA",
+    "RAIZAL",
+    "PALENQUERO",
+    "ROM",
+]
+AGE_GROUPS = [
+    (0, 5, "PRIMERA INFANCIA"),
+    (6, 11, "INFANCIA"),
+    (12, 17, "ADOLESCENCIA"),
+    (18, 28, "JUVENTUD"),
+    (29, 59, "ADULTEZ"),
+    (60, 100, "PERSONA MAYOR"),
+]
+
+
+def get_weights(size: int, exponent: float = 1.1) -> np.ndarray:
+    """
+    Get Zipf-like probabilities, where the first values are the most frequent.
+    """
+
+    weights = 1 / np.arange(1, size + 1) ** exponent
+    return weights / weights.sum()
+
+
+class DatasetGenerator:
+    """
+    A generator of synthetic CSV rows, with cardinalities and skews similar to the real ones:
+    about 240 countries, from 1 to 4 registry offices in each one, 8 knowledge areas
+    with 7 specializations each, and some values that aren't known ("NO INDICA" or -1).
+    The same seed always generates the same rows.
+    """
+
+    def __init__(self, seed: int = 0) -> None:
+        """
+        Optional arguments:
+            seed: int
+                By default 0.
+
+        Private attributes:
+            random: np.random.Generator
+            countries: np.ndarray
+                The name, the iso code and the location of each country.
+            offices: np.ndarray
+                The name of the registry offices of all the countries.
+            first_offices: np.ndarray
+                The index of the first office of each country.
+            office_counts: np.ndarray
+                The number of offices of each country.
+            specializations: np.ndarray
+                The knowledge area and the name of each specialization.
+        """
+
+        self.__random = np.random.default_rng(seed)
+
+        codes = [
+            alpha3
+            for alpha3, alpha2 in sorted(map_country_alpha3_to_country_alpha2().items())
+            if alpha2 in COUNTRY_ALPHA2_TO_CONTINENT_CODE
+            and alpha3 not in MAIN_COUNTRIES
+            and alpha3 != "COL"
+        ]
+        countries = []
+        for code in MAIN_COUNTRIES + codes:
+            country = pycountry.countries.get(alpha_3=code)
+            countries.append(
+                (
+                    (country.name if country is not None else code).upper(),
+                    code,
+                    f"({self.__random.uniform(-60, 70):.1f}, {self.__random.uniform(-180, 180):.1f})",
+                )
+            )
+        countries += [("DESCONOCIDO", "DDD", "(0, 0)"), (UNKNOWN, UNKNOWN, "(0, 0)")]
+        self.__countries = np.array(countries, dtype=object)
+
+        self.__office_counts = np.array(
+            [4 - index * 4 // len(countries) for index in range(len(countries))]
+        )
+        self.__office_counts[-2:] = 1
+        self.__first_offices = np.concatenate(([0], np.cumsum(self.__office_counts)[:-1]))
+        self.__offices = np.array(
+            [
+                f"{name}, CONSULADO {number}" if count > 1 else name
+                for (name, _, _), count in zip(countries, self.__office_counts)
+                for number in range(1, count + 1)
+            ],
+            dtype=object,
+        )
+        self.__offices[-1] = UNKNOWN
+
+        self.__specializations = np.array(
+            [
+                (area, f"{area.split(',')[0]} - ESPECIALIDAD {number}")
+                for area in AREAS
+                for number in range(1, 8)
+            ]
+            + [(UNKNOWN, UNKNOWN)],
+            dtype=object,
+        )
+
+    def __choose(
+        self, values: list[str], size: int, unknown_share: float = 0.05
+    ) -> np.ndarray:
+        """
+        Choose values with Zipf-like probabilities, and "NO INDICA" in a share of them.
+        """
+
+        chosen = np.array(values, dtype=object)[
+            self.__random.choice(len(values), size=size, p=get_weights(len(values)))
+        ]
+        chosen[self.__random.random(size) < unknown_share] = UNKNOWN
+        return chosen
+
+    def __choose_number(
+        self, low: int, high: int, size: int, unknown_share: float
+    ) -> np.ndarray:
+        """
+        Choose integers between low and high, included, and -1 in a share of them.
+        """
+
+        numbers = self.__random.integers(low, high + 1, size=size)
+        numbers[self.__random.random(size) < unknown_share] = -1
+        return numbers
+
+    def get_rows(self, rows: int) -> list[tuple[str, ...]]:
+        """
+        Generate rows with the columns of the CSV file.
+
+        Arguments:
+            rows: int
+
+        Returns:
+            The values of each row.
+        """
+
+        countries = self.__random.choice(
+            len(self.__countries), size=rows, p=get_weights(len(self.__countries), 1.3)
+        )
+        offices = self.__first_offices[countries] + (
+            self.__random.integers(0, 1 << 16, size=rows)
+            % self.__office_counts[countries]
+        )
+        specializations = self.__random.choice(
+            len(self.__specializations),
+            size=rows,
+            p=get_weights(len(self.__specializations), 0.6),
+        )
+        ages = np.clip(np.rint(self.__random.normal(35, 16, size=rows)), 0, 100)
+        ages = ages.astype(int)
+        ages[self.__random.random(rows) < 0.02] = -1
+        age_groups = np.array(
+            [UNKNOWN] + [group for _, _, group in AGE_GROUPS], dtype=object
+        )[np.searchsorted([low for low, _, _ in AGE_GROUPS], ages, side="right")]
+
+        columns = [
+            self.__countries[countries, 0],
+            self.__countries[countries, 1],
+            self.__offices[offices],
+            age_groups,
+            ages.astype(str),
+            self.__specializations[specializations, 0],
+            self.__specializations[specializations, 1],
+            self.__choose(ACADEMIC_LEVELS, rows),
+            self.__choose(MARITAL_STATUSES, rows),
+            self.__choose(GENDERS, rows, 0.01),
+            self.__choose(ETHNIC_GROUPS, rows),
+            self.__choose_number(140, 200, rows, 0.4).astype(str),
+            self.__countries[countries, 2],
+            self.__random.geometric(0.8, size=rows).astype(str),
+        ]
+        return list(zip(*(column.tolist() for column in columns)))
+
+    def write(self, file: str, rows: int, batch_size: int = 1 << 16) -> None:
+        """
+        Write a CSV file, with its headers, in batches of rows.
+
+        Arguments:
+            file: str
+                The path to the .csv file, which is compressed if it ends in .gz.
+            rows: int
+                The number of rows, without the headers.
+
+        Optional arguments:
+            batch_size: int
+                The number of rows generated at a time. By default 65536.
+        """
+
+        output: io.TextIOBase = (
+            gzip.open(file, "wt", encoding="utf-8", newline="")
+            if file.endswith(".gz")
+            else open(file, "w", encoding="utf-8", newline="")
+        )
+        with output:
+            writer = csv.writer(output, lineterminator="\n")
+            writer.writerow(HEADERS)
+            for start in range(0, rows, batch_size):
+                writer.writerows(self.get_rows(min(batch_size, rows - start)))
+
+
+if __name__ == "__main__":
+    start = perf_counter()
+    DatasetGenerator(int(sys.argv[3]) if len(sys.argv) > 3 else 0).write(
+        sys.argv[1], int(sys.argv[2])
+    )
+    print(f"{sys.argv[2]} rows written to {sys.argv[1]} in {perf_counter() - start:.2f}s")
@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+"""
+Measure the throughput and the peak memory of each part of the insertion
+with synthetic CSV files, so the regressions can be found before a release.
+
+Each case runs in its own process: the CsvReader backends, the encoding of the rows
+in the tables (row by row and by columns) and, with --load, the whole insertion
+in the database configured in the .env file, whose tables are emptied before each load.
+
+Usage (from the src folder):
+    python -m benchmarks.ingest [--rows 10000 1000000] [--load] [--modes copy staging]
+        [--output results.json] [--baseline results.json] [--tolerance 0.1]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from time import perf_counter
+from typing import Any
+from rich.console import Console
+from rich.table import Table
+from benchmarks.datasets import DatasetGenerator
+from modules.encoders import ColumnarEncoder
+from modules.executors import SqlExecutor
+from modules.loaders import CopyLoader
+from modules.profilers import IngestProfiler
+from modules.readers import CsvReader
+from modules.utils import data_insertion, get_country_resolver, initialize_tables
+from settings import Connection, CsvBackend, Encoding, LoadMode, Variables
+
+
+def get_dataset(directory: str, rows: int, seed: int = 0) -> str:
+    """
+    Get the path to a synthetic CSV file, generating it if it doesn't exist yet.
+    """
+
+    file = os.path.join(directory, f"synthetic_{rows}_{seed}.csv")
+    if not os.path.exists(file):
+        os.makedirs(directory, exist_ok=True)
+        print(f"generating {file}...")
+        DatasetGenerator(seed).write(f"{file}.tmp.csv", rows)
+        os.replace(f"{file}.tmp.csv", file)
+    return file
+
+
+def read_rows(file: str, backend: CsvBackend) -> int:
+    return sum(1 for _ in CsvReader(file, backend=backend).get_rows_in_range())
+
+
+def encode_rows(file: str, encoding: Encoding, batch_size: int = 1 << 16) -> int:
+    """
+    Normalize the rows of a CSV file into a CopyLoader that is never flushed,
+    discarding its rows after each batch.
+
+    Returns:
+        The number of rows.
+    """
+
+    initialize_tables()
+    country_resolver = get_country_resolver()
+    loader = CopyLoader(None, country_resolver)
+    encoder = ColumnarEncoder(country_resolver, batch_size)
+
+    rows = 0
+    for row in CsvReader(file).get_rows_in_range():
+        if encoding == Encoding.COLUMNAR:
+            encoder.add_row(row)
+        else:
+            loader.add_row(row)
+        rows += 1
+        if rows % batch_size == 0:
+            encoder.encode(loader)
+            loader.detach()
+    encoder.encode(loader)
+    return rows
+
+
+def load_rows(file: str, load_mode: LoadMode, encoding: Encoding) -> dict[str, Any]:
+    """
+    Empty the tables of the database and insert the rows of a CSV file.
+
+    Returns:
+        The summary of the insertion.
+    """
+
+    sql_executor = SqlExecutor(
+        database=Connection.DATABASE,
+        user=Connection.USER,
+        password=Connection.PASSWORD,
+        host=Connection.HOST,
+        port=Connection.PORT,
+    )
+    initialize_tables()
+    sql_executor.run_query(
+        "TRUNCATE "
+        + ",".join(
+            f'"{table.get_name()}"' for table in Variables.Sql.TABLES.values()
+        )
+        + " RESTART IDENTITY CASCADE;"
+    )
+    return data_insertion(
+        load_mode=load_mode,
+        chunk_size=1 << 16,
+        resume=False,
+        append=False,
+        encoding=encoding,
+        file=file,
+    )
+
+
+def run_case(case: str, file: str, arguments: tuple) -> dict[str, Any]:
+    """
+    Run a case of the benchmark, in the process of a worker.
+
+    Arguments:
+        case: str
+            "read", "encode" or "load".
+        file: str
+        arguments: tuple
+            The arguments of the function of the case, after the file.
+
+    Returns:
+        The number of rows, how long it took, the rows per second and the peak memory
+        of the process, along with the time of each stage of the insertion for the loads.
+    """
+
+    with redirect_stdout(io.StringIO()):
+        start = perf_counter()
+        match case:
+            case "read":
+                result = {"rows": read_rows(file, *arguments)}
+            case "encode":
+                result = {"rows": encode_rows(file, *arguments)}
+            case "load":
+                summary = load_rows(file, *arguments)
+                result = {
+                    "rows": summary["rows"],
+                    "stages": {
+                        stage: stats["seconds"]
+                        for stage, stats in summary["stages"].items()
+                    },
+                    "phases": summary["phases"],
+                }
+            case _:
+                raise ValueError(f"{case} isn't a valid case")
+        seconds = perf_counter() - start
+
+    return {
+        **result,
+        "seconds": seconds,
+        "rows_per_second": result["rows"] / max(seconds, 1e-9),
+        "peak_rss_bytes": IngestProfiler.get_peak_rss(),
+    }
+
+
+def benchmark(
+    sizes: list[int],
+    load_modes: list[LoadMode],
+    directory: str,
+    baseline: list[dict[str, Any]] | None = None,
+    tolerance: float = 0.1,
+) -> list[dict[str, Any]]:
+    """
+    Print in console the throughput and the peak memory of each case, for each size.
+
+    Arguments:
+        sizes: list[int]
+            The number of rows of each synthetic CSV file.
+        load_modes: list[LoadMode]
+            The load modes of the whole insertion, where none skips it.
+        directory: str
+            Where the synthetic CSV files are saved.
+
+    Optional arguments:
+        baseline: list[dict[str, Any]] | None
+            The results of a previous run, to compare the throughput of each case. By default none.
+        tolerance: float
+            The share of the throughput of the baseline that a case can lose before it is
+            considered a regression. By default 0.1.
+
+    Returns:
+        The results of each case.
+    """
+
+    cases = [
+        (f"read ({backend.name.lower()})", "read", (backend,))
+        for backend in CsvBackend
+    ]
+    cases += [
+        (f"encode ({encoding.name.lower()})", "encode", (encoding,))
+        for encoding in Encoding
+    ]
+    cases += [
+        (
+            f"load ({load_mode.name.lower()}, {encoding.name.lower()})",
+            "load",
+            (load_mode, encoding),
+        )
+        for load_mode in load_modes
+        for encoding in (
+            Encoding if load_mode != LoadMode.STAGING else [Encoding.ROW]
+        )
+    ]
+    previous = {
+        (result["name"], result["size"]): result for result in (baseline or [])
+    }
+
+    output_table = Table(title="Ingest benchmark", show_lines=True)
+    for column in ["case", "rows", "seconds", "rows/s", "peak RSS (MiB)", "vs baseline"]:
+        output_table.add_column(column, justify="center")
+
+    results = []
+    for size in sizes:
+        file = get_dataset(directory, size)
+        for name, case, arguments in cases:
+            print(f"{name}: {size} rows...")
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                result = executor.submit(run_case, case, file, arguments).result()
+            result = {"name": name, "size": size, **result}
+            results.append(result)
+
+            comparison = ""
+            if (name, size) in previous:
+                ratio = result["rows_per_second"] / previous[name, size]["rows_per_second"]
+                result["regression"] = ratio < 1 - tolerance
+                comparison = f"{ratio:.2f}x" + (" (regression)" if result["regression"] else "")
+            peak_rss = result["peak_rss_bytes"]
+            output_table.add_row(
+                name,
+                str(result["rows"]),
+                f"{result['seconds']:.2f}",
+                f"{result['rows_per_second']:.0f}",
+                f"{peak_rss / 2**20:.1f}" if peak_rss is not None else "-",
+                comparison,
+            )
+
+    Console().print(output_table)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000])
+    parser.add_argument(
+        "--load",
+        action="store_true",
+        help="also insert the rows, emptying the tables of the configured database",
+    )
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        default=["copy", "staging"],
+        choices=[load_mode.name.lower() for load_mode in LoadMode],
+    )
+    parser.add_argument(
+        "--directory",
+        default=os.path.join(tempfile.gettempdir(), "analysis_dataset_benchmarks"),
+    )
+    parser.add_argument("--output", help="a JSON file where the results are saved")
+    parser.add_argument("--baseline", help="a JSON file with previous results")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    results = benchmark(
+        args.rows,
+        [LoadMode[mode.upper()] for mode in args.modes] if args.load else [],
+        args.directory,
+        baseline,
+        args.tolerance,
+    )
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=4)
+    sys.exit(1 if any(result.get("regression") for result in results) else 0)
@@ -1,10 +1,18 @@
 #!/usr/bin/env python
 
+from os import path
+from modules.executors import SqlExecutor
 from modules.objects import SqlTable
 from rich.console import Console
 from rich.tree import Tree
-from modules.utils import data_insertion, initialize_tables, prepare_files
-from settings import TableReference, Variables
+from modules.utils import (
+    data_insertion,
+    index_tables,
+    initialize_tables,
+    prepare_files,
+    summarize_tables,
+)
+from settings import Connection, Encoding, Files, LoadMode, TableReference, Variables
 
 
 def get_menu_option() -> str:
@@ -13,12 +21,88 @@ def get_menu_option() -> str:
             """\
     \n1. Insert all the data from the csv to the database.\
     \n2. Print a table\
-    \n3. Exit\
+    \n3. Rebuild the indexes and the summary of the tables\
+    \n4. Exit\
     \nPlease, select an option: """
         )
     )
 
 
+def get_load_mode_option() -> LoadMode:
+    """
+    It requests how the rows of the csv will be sent to the database.
+    """
+
+    while True:
+        match str(
+            input(
+                """\
+    \n1. Run a single query with all the inserts.\
+    \n2. Stream each table with a copy query.\
+    \n3. Copy the csv to a staging table and normalize it in the database.\
+    \n4. Export each table to a compressed file, without loading it.\
+    \nPlease, select a load mode: """
+            )
+        ):
+            case "1":
+                return LoadMode.QUERY
+            case "2":
+                return LoadMode.COPY
+            case "3":
+                return LoadMode.STAGING
+            case "4":
+                return LoadMode.EXPORT
+            case _:
+                print("Invalid option. Try again")
+
+
+def get_chunk_size_option() -> int:
+    """
+    It requests how many csv rows will be sent to the database in each transaction.
+    """
+
+    while not (
+        option := str(
+            input(
+                "Enter the number of rows per transaction (0 will send all of them in a single one): "
+            )
+        )
+    ).isdigit():
+        print("Invalid option. Try again")
+    return int(option)
+
+
+def get_confirmation(text: str) -> bool:
+    while (option := str(input(f"{text} (y/n): ")).lower()) not in ("y", "n"):
+        print("Invalid option. Try again")
+    return option == "y"
+
+
+def get_resume_option() -> bool:
+    """
+    If an insertion was interrupted, it requests whether to resume it from its last checkpoint.
+    """
+
+    if not path.exists(Files.CHECKPOINT):
+        return False
+    return get_confirmation("An interrupted insertion was found. Resume it?")
+
+
+def get_csv_file_option() -> str:
+    """
+    It requests the csv file whose rows will be appended to the ones already in the database.
+    """
+
+    while not path.exists(
+        option := str(
+            input(f"Enter the path of the csv file (empty will use {Files.CSV}): ")
+        ).strip()
+        or Files.CSV
+    ):
+        print("The file doesn't exist. Try again")
+    return option
+
+
 def get_table_view_option() -> str:
     """
     It prints in console a table and all the possible combinations
@@ -191,12 +275,53 @@ def table_view_menu() -> None:
 def menu() -> None:
     global table_view_limit
     table_view_limit = 15
-    while (menu_option := get_menu_option()) != "3":
+    while (menu_option := get_menu_option()) != "4":
         match menu_option:
             case "1":
-                data_insertion()
+                load_mode = get_load_mode_option()
+                chunk_size = get_chunk_size_option()
+                resume = get_resume_option()
+                append = (
+                    not resume
+                    and load_mode != LoadMode.EXPORT
+                    and get_confirmation(
+                        "Append the rows to the ones already in the database?"
+                    )
+                )
+                fast_load = get_confirmation(
+                    "Drop the foreign keys and indexes while loading the rows?"
+                )
+                compact = load_mode != LoadMode.STAGING and get_confirmation(
+                    "Fold the rows with the same demographic description?"
+                )
+                encoding = (
+                    Encoding.COLUMNAR
+                    if load_mode != LoadMode.STAGING
+                    and get_confirmation("Normalize the rows by batches of columns?")
+                    else Encoding.ROW
+                )
+                data_insertion(
+                    load_mode=load_mode,
+                    chunk_size=chunk_size,
+                    resume=resume,
+                    append=append,
+                    fast_load=fast_load,
+                    compact=compact,
+                    encoding=encoding,
+                    file=get_csv_file_option() if append else Files.CSV,
+                )
             case "2":
                 table_view_menu()
+            case "3":
+                sql_executor = SqlExecutor(
+                    database=Connection.DATABASE,
+                    user=Connection.USER,
+                    password=Connection.PASSWORD,
+                    host=Connection.HOST,
+                    port=Connection.PORT,
+                )
+                index_tables(sql_executor, rebuild=True)
+                summarize_tables(sql_executor)
             case _:
                 print("Invalid option. Try again")
         print()
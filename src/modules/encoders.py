@@ -0,0 +1,228 @@
+from typing import Callable
+import numpy as np
+import pandas as pd
+from modules.loaders import SqlLoader
+from modules.objects import CountryResolver
+from settings import TableReference, Variables
+
+
+class ColumnarEncoder:
+    """
+    An encoder of the CSV rows by columns, as an alternative to normalizing them one by one.
+
+    The rows are grouped in batches, and each batch is encoded in two passes:
+    first the values of each dimension are factorized, so only its distinct values
+    are looked up in (or added to) the records of its table, and then the ids of those
+    distinct values are spread to all the rows with array operations.
+    The facts are sent to the loader as integer columns.
+
+    The distinct values are sorted by their first appearance, so the ids are the same
+    as the ones assigned when the rows are normalized one by one.
+    """
+
+    COLUMNS = [
+        "nombre_pais",
+        "codigo_iso_pais",
+        "oficina_registro",
+        "grupo_edad",
+        "edad",
+        "area_conocimiento",
+        "especializacion",
+        "nivel_academico",
+        "estado_civil",
+        "genero",
+        "etnia",
+        "estatura",
+        "localizacion",
+        "cantidad_personas",
+    ]
+
+    def __init__(
+        self, country_resolver: CountryResolver, batch_size: int = 1 << 16
+    ) -> None:
+        """
+        Arguments:
+            country_resolver: CountryResolver
+                The resolver of the code of the country and its continent.
+
+        Optional arguments:
+            batch_size: int
+                The number of rows encoded together. By default 65536.
+
+        Private attributes:
+            country_resolver: CountryResolver
+            rows: list[list[str]]
+                The rows that weren't encoded yet.
+        """
+
+        self.__country_resolver = country_resolver
+        self.batch_size = batch_size
+        self.__rows: list[list[str]] = []
+
+    def add_row(self, row: list[str]) -> bool:
+        """
+        Queue a CSV row to be encoded.
+
+        Arguments:
+            row: list[str]
+                The columns of a CSV row.
+
+        Returns:
+            Whether the batch is full and must be encoded.
+        """
+
+        self.__rows.append(row)
+        return len(self.__rows) >= self.batch_size
+
+    @staticmethod
+    def __to_value(value: "int | pd.NA") -> int | str:
+        return Variables.Sql.NULL_VALUE if value is pd.NA else int(value)
+
+    @staticmethod
+    def __to_integers(column: "pd.Series") -> "pd.Series":
+        """
+        Convert a column of the CSV to integers, where -1 means that it isn't known.
+        """
+
+        return pd.to_numeric(
+            column.mask(column.isin(["-1", Variables.Sql.NULL_VALUE]))
+        ).astype("Int64")
+
+    def __encode_dimension(
+        self,
+        loader: SqlLoader,
+        reference: TableReference,
+        keys: "pd.Series",
+        get_values: Callable[[int], list[str | int]],
+    ) -> "pd.arrays.IntegerArray":
+        """
+        Add the new values of a dimension to its table and the loader,
+        and get the id of the value of each row.
+
+        Arguments:
+            loader: SqlLoader
+            reference: TableReference
+            keys: pd.Series
+                The value of the identifier of the table in each row.
+            get_values: (int) -> list[str | int]
+                A function that gets the values of a new row of the table,
+                given the position of the first CSV row in which its identifier appears.
+
+        Returns:
+            The ids of each row, null where the value isn't valid.
+        """
+
+        table = Variables.Sql.TABLES[reference]
+        codes, uniques = pd.factorize(keys)
+        _, first_rows = np.unique(codes, return_index=True)
+
+        ids = []
+        for identifier_value, first_row in zip(uniques, first_rows):
+            if (values := table.add_values(get_values(first_row))) is not None:
+                loader.add_values(reference, values)
+            id = table.get_id_by_identifier_value(identifier_value)
+            ids.append(None if id == Variables.Sql.NULL_VALUE else id)
+        return pd.array(ids, dtype="Int64").take(codes)
+
+    def encode(self, loader: SqlLoader) -> None:
+        """
+        Encode the queued rows into the loader, sorted by how many relations each table has
+        (from smallest to largest), so that the ids referenced by a row were already assigned.
+
+        Arguments:
+            loader: SqlLoader
+        """
+
+        if not self.__rows:
+            return
+        df = pd.DataFrame(self.__rows, columns=self.COLUMNS, dtype=object)
+        self.__rows = []
+
+        codes, uniques = pd.factorize(df["codigo_iso_pais"])
+        countries = [self.__country_resolver.resolve(code) for code in uniques]
+        df["codigo_pais"] = np.array([code for code, _ in countries], dtype=object)[
+            codes
+        ]
+        df["codigo_continente"] = np.array(
+            [continent for _, continent in countries], dtype=object
+        )[codes]
+
+        continents = self.__encode_dimension(
+            loader,
+            TableReference.CONTINENTE,
+            df["codigo_continente"],
+            lambda row: [
+                df["codigo_continente"].iat[row],
+                Variables.CONTINENTS.get(
+                    df["codigo_continente"].iat[row], Variables.Sql.NULL_VALUE
+                ),
+            ],
+        )
+        countries = self.__encode_dimension(
+            loader,
+            TableReference.PAIS,
+            df["codigo_pais"],
+            lambda row: [
+                self.__to_value(continents[row]),
+                df["codigo_pais"].iat[row],
+                df["nombre_pais"].iat[row],
+            ],
+        )
+        offices = self.__encode_dimension(
+            loader,
+            TableReference.OFICINA_REGISTRO,
+            df["oficina_registro"],
+            lambda row: [
+                self.__to_value(countries[row]),
+                df["oficina_registro"].iat[row],
+            ],
+        )
+        levels = self.__encode_dimension(
+            loader,
+            TableReference.NIVEL_ACADEMICO,
+            df["nivel_academico"],
+            lambda row: [df["nivel_academico"].iat[row]],
+        )
+        areas = self.__encode_dimension(
+            loader,
+            TableReference.AREA_CONOCIMIENTO,
+            df["area_conocimiento"],
+            lambda row: [df["area_conocimiento"].iat[row]],
+        )
+        specializations = self.__encode_dimension(
+            loader,
+            TableReference.ESPECIALIZACION,
+            df["especializacion"],
+            lambda row: [
+                df["especializacion"].iat[row],
+                self.__to_value(areas[row]),
+            ],
+        )
+        genders = self.__encode_dimension(
+            loader,
+            TableReference.GENERO,
+            df["genero"],
+            lambda row: [df["genero"].iat[row]],
+        )
+
+        facts = pd.DataFrame(
+            {
+                "id_OficinaRegistro": offices,
+                "id_NivelAcademico": levels,
+                "id_Especializacion": specializations,
+                "id_Genero": genders,
+                "edad": self.__to_integers(df["edad"]),
+                "estatura": self.__to_integers(df["estatura"]),
+                "cantidad_personas": pd.to_numeric(df["cantidad_personas"]),
+            }
+        )
+
+        fact_table = Variables.Sql.TABLES[TableReference.DESCRIPCION_DEMOGRAFICA]
+        if fact_table.is_compacted():
+            for values in facts.astype(object).itertuples(index=False):
+                fact_table.add_values([self.__to_value(value) for value in values])
+            return
+
+        first_id = fact_table.reserve_ids(len(facts))
+        facts.insert(0, "id", np.arange(first_id, first_id + len(facts)))
+        loader.add_columns(TableReference.DESCRIPCION_DEMOGRAFICA, facts)
@@ -1,13 +1,312 @@
-from typing import Any, Callable
+import copy
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from itertools import count
+from threading import Lock, Semaphore
+from time import monotonic
+from typing import Any, Callable, Hashable, Iterator
+from weakref import WeakKeyDictionary
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
+from modules.parsers import SqlParser
+from settings import Connection
+
+
+class ConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """
+    A pool of connections to a database, shared by the threads of a process.
+
+    Unlike psycopg2.pool.ThreadedConnectionPool, getting a connection when all of them
+    are in use waits until one is returned, and the returned connections are kept open
+    (up to the maximum size) instead of closing the ones beyond the minimum size,
+    so the concurrent queries reuse them. A connection that was idle for a while is checked
+    with a trivial query before it is used, and the ones that are closed or broken
+    are discarded and replaced by new ones.
+    """
+
+    def __init__(
+        self, min_size: int, max_size: int, check_after: float, **connection_args: Any
+    ) -> None:
+        """
+        Arguments:
+            min_size: int
+                The number of connections opened at first.
+            max_size: int
+                The maximum number of connections open at the same time.
+            check_after: float
+                The seconds that a connection can be idle before it is checked again.
+            connection_args: Any
+                The arguments of psycopg2.connect.
+
+        Private attributes:
+            min_size: int
+            slots: Semaphore
+                The connections that can still be taken.
+            lock: Lock
+                The lock of the statistics.
+            check_after: float
+            idle_since: dict[psycopg2.connection, float]
+                When each idle connection was returned.
+            prepared_statements: WeakKeyDictionary[psycopg2.connection, set[str]]
+                The names of the statements prepared in each connection.
+            stats: dict[str, int]
+                How many connections were opened, taken (and how many of them
+                were reused or had to wait), checked and discarded.
+        """
+
+        self.__min_size = min_size
+        self.__slots = Semaphore(max_size)
+        self.__lock = Lock()
+        self.__check_after = check_after
+        self.__idle_since: dict["psycopg2.connection", float] = {}
+        self.__prepared_statements: WeakKeyDictionary[
+            "psycopg2.connection", set[str]
+        ] = WeakKeyDictionary()
+        self.__stats = {
+            "opened": 0,
+            "checkouts": 0,
+            "reused": 0,
+            "waits": 0,
+            "health_checks": 0,
+            "discarded": 0,
+        }
+        super().__init__(min_size, max_size, **connection_args)
+        # psycopg2 only keeps a returned connection while fewer than minconn are idle
+        # and closes the others, so once the first ones are opened every connection is kept.
+        self.minconn = max_size
+
+    def _connect(self, key: Any = None) -> "psycopg2.connection":
+        self.__count("opened")
+        return super()._connect(key)
+
+    def __count(self, stat: str) -> None:
+        with self.__lock:
+            self.__stats[stat] += 1
+
+    def __is_healthy(self, conn: "psycopg2.connection") -> bool:
+        """
+        Run a trivial query in a connection.
+        """
+
+        self.__count("health_checks")
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def get_connection(self) -> "psycopg2.connection":
+        """
+        Take a healthy connection, waiting while all of them are in use.
+        It must be returned with put_connection.
+        """
+
+        if not self.__slots.acquire(blocking=False):
+            self.__count("waits")
+            self.__slots.acquire()
+        try:
+            while True:
+                conn = self.getconn()
+                idle_since = self.__idle_since.pop(conn, None)
+                if conn.closed or (
+                    idle_since is not None
+                    and monotonic() - idle_since > self.__check_after
+                    and not self.__is_healthy(conn)
+                ):
+                    self.__count("discarded")
+                    self.putconn(conn, close=True)
+                    continue
+                self.__count("checkouts")
+                if idle_since is not None:
+                    self.__count("reused")
+                return conn
+        except BaseException:
+            self.__slots.release()
+            raise
+
+    def put_connection(self, conn: "psycopg2.connection") -> None:
+        """
+        Return a connection taken with get_connection.
+        If it was in a transaction it is rolled back, and if it is broken it is discarded
+        along with the idle ones.
+        """
+
+        try:
+            if conn.closed:
+                self.__count("discarded")
+                self.putconn(conn, close=True)
+                self.__discard_idle_connections()
+                return
+            self.__idle_since[conn] = monotonic()
+            self.putconn(conn)
+            if conn.closed:
+                self.__idle_since.pop(conn, None)
+        finally:
+            self.__slots.release()
+
+    def __discard_idle_connections(self) -> None:
+        """
+        Close the idle connections, since after a connection is broken the others
+        were probably broken by the same cause, such as a restart of the server.
+        """
+
+        with self._lock:
+            while self._pool:
+                conn = self._pool.pop()
+                self.__idle_since.pop(conn, None)
+                conn.close()
+                self.__count("discarded")
+
+    def get_prepared_statements(self, conn: "psycopg2.connection") -> set[str]:
+        """
+        Get the names of the statements prepared in a connection of the pool,
+        to which the caller adds the ones it prepares.
+        """
+
+        with self.__lock:
+            return self.__prepared_statements.setdefault(conn, set())
+
+    @contextmanager
+    def connection(self) -> Iterator["psycopg2.connection"]:
+        conn = self.get_connection()
+        try:
+            yield conn
+        finally:
+            self.put_connection(conn)
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Get the size of the pool, how many connections are idle and in use,
+        and the counters since it was created.
+        """
+
+        with self.__lock:
+            return {
+                "min_size": self.__min_size,
+                "max_size": self.maxconn,
+                "idle": len(self._pool),
+                "in_use": len(self._used),
+                **self.__stats,
+            }
+
+
+class QueryCache:
+    """
+    A cache of query responses, shared by the threads of a process.
+
+    When it is full the least recently used response is evicted,
+    and a response older than its time to live is never returned.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        """
+        Arguments:
+            max_size: int
+                The maximum number of responses kept, where 0 disables the cache.
+            ttl: float
+                The seconds that a response is valid.
+
+        Private attributes:
+            lock: Lock
+            max_size: int
+            ttl: float
+            responses: OrderedDict[Hashable, tuple[float, Any]]
+                When each response expires and the response, from the least
+                to the most recently used.
+            stats: dict[str, int]
+                How many responses were found (hits), weren't found or had expired (misses),
+                and how many were evicted, expired or invalidated.
+        """
+
+        self.__lock = Lock()
+        self.__max_size = max_size
+        self.__ttl = ttl
+        self.__responses: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.__stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """
+        Get the response of a query, if it is in the cache and hasn't expired.
+        A copy is returned, so the caller can modify it.
+
+        Returns:
+            Whether the response was found, and the response.
+        """
+
+        with self.__lock:
+            if key in self.__responses:
+                expires_at, response = self.__responses[key]
+                if monotonic() < expires_at:
+                    self.__responses.move_to_end(key)
+                    self.__stats["hits"] += 1
+                    return True, copy.copy(response)
+                del self.__responses[key]
+                self.__stats["expirations"] += 1
+            self.__stats["misses"] += 1
+            return False, None
+
+    def put(self, key: Hashable, response: Any) -> None:
+        with self.__lock:
+            if self.__max_size <= 0:
+                return
+            self.__responses[key] = (monotonic() + self.__ttl, copy.copy(response))
+            self.__responses.move_to_end(key)
+            while len(self.__responses) > self.__max_size:
+                self.__responses.popitem(last=False)
+                self.__stats["evictions"] += 1
+
+    def invalidate(self) -> None:
+        """
+        Remove all the responses, for example after the tables are modified.
+        """
+
+        with self.__lock:
+            self.__responses.clear()
+            self.__stats["invalidations"] += 1
+
+    def get_stats(self) -> dict[str, int]:
+        with self.__lock:
+            return {
+                "max_size": self.__max_size,
+                "size": len(self.__responses),
+                **self.__stats,
+            }
 
 
 class SqlExecutor:
     """
     A sql query executor.
+
+    The connections are taken from a pool shared by all the executors of the process
+    that connect to the same database with the same user,
+    whose size is the one given to the first executor that uses it.
+    The queries submitted together run in threads shared by the executors of the process.
+    The responses of the cached queries are shared in the same way as the pools.
+
+    The queries that are run many times with different values, such as the ones of the views,
+    are registered as named statements, which are prepared once in each connection
+    and then executed with the values bound as parameters.
     """
 
+    __pools: dict[tuple, ConnectionPool] = {}
+    __caches: dict[tuple, QueryCache] = {}
+    __pools_lock = Lock()
+    __query_threads: dict[int, ThreadPoolExecutor] = {}
+    __cursor_ids = count()
+    __statements: dict[str, str] = {}
+
     def __init__(
         self,
         database: str,
@@ -15,6 +314,11 @@ class SqlExecutor:
         password: str | None,
         host: str = "127.0.0.1",
         port: str = "5432",
+        min_connections: int = Connection.POOL_MIN_SIZE,
+        max_connections: int = Connection.POOL_MAX_SIZE,
+        check_after: float = Connection.POOL_CHECK_AFTER,
+        cache_size: int = Connection.CACHE_SIZE,
+        cache_ttl: float = Connection.CACHE_TTL,
     ) -> None:
         """
         Arguments:
@@ -28,9 +332,24 @@ class SqlExecutor:
                 The IP Address. By default 127.0.0.1.
             port: str
                 The port. By default 5432.
+            min_connections: int
+                The number of idle connections kept open by the pool.
+                By default Connection.POOL_MIN_SIZE.
+            max_connections: int
+                The maximum number of connections of the pool.
+                By default Connection.POOL_MAX_SIZE.
+            check_after: float
+                The seconds that a connection of the pool can be idle before it is checked
+                again. By default Connection.POOL_CHECK_AFTER.
+            cache_size: int
+                The maximum number of responses of the cache, where 0 disables it.
+                By default Connection.CACHE_SIZE.
+            cache_ttl: float
+                The seconds that a response of the cache is valid. By default Connection.CACHE_TTL.
 
         Private attributes:
-            database, user, password.
+            database, user, password, host, port, min_connections, max_connections, check_after,
+            cache_size, cache_ttl.
         """
 
         self.__database = database
@@ -38,28 +357,157 @@ class SqlExecutor:
         self.__password = password
         self.__host = host
         self.__port = port
+        self.__min_connections = min_connections
+        self.__max_connections = max_connections
+        self.__check_after = check_after
+        self.__cache_size = cache_size
+        self.__cache_ttl = cache_ttl
+
+    def __get_key(self) -> tuple:
+        return (
+            os.getpid(),
+            self.__database,
+            self.__user,
+            self.__password,
+            self.__host,
+            self.__port,
+        )
+
+    def __get_pool(self) -> ConnectionPool:
+        """
+        Get the pool of the database, creating it if this process doesn't have one yet.
+        A child process never uses the connections of its parent.
+        """
+
+        key = self.__get_key()
+        with SqlExecutor.__pools_lock:
+            if key not in SqlExecutor.__pools:
+                SqlExecutor.__pools[key] = ConnectionPool(
+                    self.__min_connections,
+                    self.__max_connections,
+                    self.__check_after,
+                    database=self.__database,
+                    user=self.__user,
+                    password=self.__password,
+                    host=self.__host,
+                    port=self.__port,
+                )
+            return SqlExecutor.__pools[key]
+
+    def __get_query_threads(self) -> ThreadPoolExecutor:
+        """
+        Get the threads of this process that run the submitted queries,
+        as many as the connections of the pool.
+        """
+
+        with SqlExecutor.__pools_lock:
+            if os.getpid() not in SqlExecutor.__query_threads:
+                SqlExecutor.__query_threads[os.getpid()] = ThreadPoolExecutor(
+                    max_workers=self.__max_connections, thread_name_prefix="sql_query"
+                )
+            return SqlExecutor.__query_threads[os.getpid()]
+
+    def __get_cache(self) -> QueryCache:
+        key = self.__get_key()
+        with SqlExecutor.__pools_lock:
+            if key not in SqlExecutor.__caches:
+                SqlExecutor.__caches[key] = QueryCache(
+                    self.__cache_size, self.__cache_ttl
+                )
+            return SqlExecutor.__caches[key]
+
+    def get_pool_stats(self) -> dict[str, int]:
+        return self.__get_pool().get_stats()
+
+    def get_cache_stats(self) -> dict[str, int]:
+        return self.__get_cache().get_stats()
+
+    @classmethod
+    def invalidate_cache(cls) -> None:
+        """
+        Remove the cached responses of all the databases of this process.
+        It must be called after the tables are modified.
+        """
+
+        with cls.__pools_lock:
+            caches = [
+                cache for key, cache in cls.__caches.items() if key[0] == os.getpid()
+            ]
+        for cache in caches:
+            cache.invalidate()
+
+    @classmethod
+    def close_pools(cls) -> None:
+        """
+        Close all the connections of the pools of this process.
+        """
+
+        with cls.__pools_lock:
+            for key in [key for key in cls.__pools if key[0] == os.getpid()]:
+                cls.__pools.pop(key).closeall()
 
-    def __connect(self) -> "psycopg2.connection":
+    @classmethod
+    def register_statement(cls, name: str, query: str) -> str:
         """
-        Connect to the database.
+        Register a query that is prepared as a named statement.
+
+        Arguments:
+            name: str
+                The name of the statement, a lowercase sql identifier.
+            query: str
+                A sql query whose values are the parameters $1, $2, ...
 
         Returns:
-            A psycopg2.connection.
+            The name of the statement.
         """
 
-        return psycopg2.connect(
-            database=self.__database,
-            user=self.__user,
-            password=self.__password,
-            host=self.__host,
-            port=self.__port,
-        )
+        if re.fullmatch(r"[a-z_][a-z0-9_]*", name) is None:
+            raise ValueError(f"{name} isn't a valid statement name")
+        with cls.__pools_lock:
+            if cls.__statements.setdefault(name, query) != query:
+                raise ValueError(f"{name} is already registered with another query")
+        return name
+
+    def __cached(self, key: Hashable, get_response: Callable[[], Any]) -> Any:
+        found, res = self.__get_cache().get(key)
+        if not found:
+            res = get_response()
+            self.__get_cache().put(key, res)
+        return res
+
+    def __execute(
+        self,
+        conn: "psycopg2.connection",
+        query: str,
+        params: tuple | None,
+        handle_conn: Callable | None,
+    ) -> list[tuple] | Any:
+        res = None
+        if handle_conn is not None:
+            res = handle_conn(query, conn)
+        else:
+            with conn.cursor() as cursor:
+                if params is not None:
+                    res = psycopg2.extras.execute_values(
+                        cursor,
+                        query,
+                        params,
+                        template=None,
+                        page_size=100,
+                        fetch=True,
+                    )
+                else:
+                    cursor.execute(query)
+                    if cursor.pgresult_ptr is not None:
+                        res = cursor.fetchall()
+        return res
 
     def run_query(
         self,
         query: str,
         params: tuple | None = None,
         handle_conn: Callable | None = None,
+        cache: bool = False,
     ) -> list[tuple] | None:
         """
         Execute a query
@@ -69,29 +517,228 @@ class SqlExecutor:
                 A sql query.
             params: tuple
             handle_conn: (psycopg2.connection) -> Any
+            cache: bool
+                Whether the response is taken from the cache, or saved in it,
+                which only makes sense for queries that don't modify the tables.
 
         Returns:
             The query response.
         """
 
-        res = None
+        if cache:
+            return self.__cached(
+                (SqlParser.normalize_query(query), params, handle_conn),
+                lambda: self.run_query(query, params, handle_conn),
+            )
+
         conn: psycopg2.connection
-        with self.__connect() as conn:
-            if handle_conn is not None:
-                res = handle_conn(query, conn)
-            else:
-                with conn.cursor() as cursor:
-                    if params is not None:
-                        res = psycopg2.extras.execute_values(
-                            cursor,
-                            query,
-                            params,
-                            template=None,
-                            page_size=100,
-                            fetch=True,
-                        )
-                    else:
-                        cursor.execute(query)
-                        if cursor.pgresult_ptr is not None:
-                            res = cursor.fetchall()
-        return res
+        with self.__get_pool().connection() as conn, conn:
+            return self.__execute(conn, query, params, handle_conn)
+
+    def run_statement(
+        self,
+        name: str,
+        params: tuple = (),
+        handle_conn: Callable | None = None,
+        cache: bool = False,
+    ) -> list[tuple] | Any:
+        """
+        Execute a registered statement, preparing it first if the connection
+        taken from the pool hasn't prepared it yet.
+
+        Arguments:
+            name: str
+                The name given to register_statement.
+
+        Optional arguments:
+            params: tuple
+                The value of each parameter of the statement, which are quoted by psycopg2,
+                so they are never interpreted as sql. By default none.
+            handle_conn: (str, psycopg2.connection) -> Any
+                A function that runs the EXECUTE query, such as pd.read_sql_query.
+                By default the rows are fetched.
+            cache: bool
+                Whether the response is taken from the cache, or saved in it,
+                as with run_query. By default False.
+
+        Returns:
+            The query response.
+        """
+
+        if cache:
+            return self.__cached(
+                ("statement", name, params, handle_conn),
+                lambda: self.run_statement(name, params, handle_conn),
+            )
+
+        pool = self.__get_pool()
+        conn: psycopg2.connection
+        with pool.connection() as conn, conn:
+            prepared_statements = pool.get_prepared_statements(conn)
+            with conn.cursor() as cursor:
+                if name not in prepared_statements:
+                    cursor.execute(
+                        f"PREPARE {name} AS {SqlExecutor.__statements[name]}"
+                    )
+                    # A prepared statement lasts until the session ends,
+                    # even if the transaction is rolled back.
+                    prepared_statements.add(name)
+                query = cursor.mogrify(
+                    f"EXECUTE {name}"
+                    + (f" ({', '.join(['%s'] * len(params))})" if params else ""),
+                    params,
+                ).decode(psycopg2.extensions.encodings[conn.encoding])
+            return self.__execute(conn, query, None, handle_conn)
+
+    def submit_query(
+        self,
+        query: str,
+        params: tuple | None = None,
+        handle_conn: Callable | None = None,
+        cache: bool = False,
+    ) -> "Future[list[tuple] | Any]":
+        """
+        Execute a query in another thread, with its own connection.
+        It must not be called from the handle_conn of a submitted query,
+        which could wait for a thread that is never freed.
+
+        Arguments:
+            The same as run_query.
+
+        Returns:
+            A future of the query response.
+        """
+
+        return self.__get_query_threads().submit(
+            self.run_query, query, params, handle_conn, cache
+        )
+
+    def run_queries(
+        self,
+        queries: list[str | tuple[str, Callable | None] | None],
+        cache: bool = False,
+    ) -> list[list[tuple] | Any]:
+        """
+        Execute several independent queries at the same time,
+        so it takes as long as the slowest one instead of the sum of all of them.
+
+        Arguments:
+            queries: list[str | tuple[str, (str, psycopg2.connection) -> Any | None] | None]
+                Each query, alone or with the function that handles its connection,
+                or None where a query isn't needed.
+
+        Optional arguments:
+            cache: bool
+                Whether the responses are taken from the cache, or saved in it,
+                as with run_query. By default False.
+
+        Returns:
+            The response of each query, in the same order (None where there isn't a query).
+            If any of them fails, its error is raised once all of them have finished.
+        """
+
+        futures = [
+            None
+            if query is None
+            else self.submit_query(query, cache=cache)
+            if isinstance(query, str)
+            else self.submit_query(query[0], handle_conn=query[1], cache=cache)
+            for query in queries
+        ]
+        return self.__get_responses(futures)
+
+    def submit_statement(
+        self,
+        name: str,
+        params: tuple = (),
+        handle_conn: Callable | None = None,
+        cache: bool = False,
+    ) -> "Future[list[tuple] | Any]":
+        """
+        Execute a registered statement in another thread, as submit_query.
+
+        Arguments:
+            The same as run_statement.
+
+        Returns:
+            A future of the query response.
+        """
+
+        return self.__get_query_threads().submit(
+            self.run_statement, name, params, handle_conn, cache
+        )
+
+    def run_statements(
+        self,
+        statements: list[tuple[str, tuple] | tuple[str, tuple, Callable] | None],
+        cache: bool = False,
+    ) -> list[list[tuple] | Any]:
+        """
+        Execute several registered statements at the same time, as run_queries.
+
+        Arguments:
+            statements: list[tuple[str, tuple] | tuple[str, tuple, (str, psycopg2.connection) -> Any] | None]
+                The name and the parameters of each statement, with the function that
+                handles its connection if needed, or None where a statement isn't needed.
+
+        Optional arguments:
+            cache: bool
+                Whether the responses are taken from the cache, or saved in it,
+                as with run_query. By default False.
+
+        Returns:
+            The response of each statement, in the same order (None where there isn't one).
+            If any of them fails, its error is raised once all of them have finished.
+        """
+
+        return self.__get_responses(
+            [
+                self.submit_statement(*statement, cache=cache)
+                if statement is not None
+                else None
+                for statement in statements
+            ]
+        )
+
+    @staticmethod
+    def __get_responses(
+        futures: list["Future[list[tuple] | Any] | None"],
+    ) -> list[list[tuple] | Any]:
+        """
+        Wait until all the futures have finished, and then get their results
+        or raise the first error.
+        """
+
+        wait([future for future in futures if future is not None])
+        for future in futures:
+            if future is not None and (error := future.exception()) is not None:
+                raise error
+        return [future.result() if future is not None else None for future in futures]
+
+    def stream_query(
+        self, query: str, itersize: int = Connection.STREAM_ITERSIZE
+    ) -> Iterator[tuple]:
+        """
+        Execute a query whose response may not fit in memory, and iterate over its rows.
+        The iterator must be exhausted or closed so its connection returns to the pool.
+
+        Arguments:
+            query: str
+                A sql query that returns rows.
+
+        Optional arguments:
+            itersize: int
+                The number of rows read from the server at a time.
+                By default Connection.STREAM_ITERSIZE.
+
+        Returns:
+            An iterator of the rows.
+        """
+
+        # The rows of a named (server-side) cursor are sent to the client
+        # by batches of itersize as they are read.
+        with self.__get_pool().connection() as conn, conn:
+            with conn.cursor(name=f"stream_{next(SqlExecutor.__cursor_ids)}") as cursor:
+                cursor.itersize = itersize
+                cursor.execute(query)
+                yield from cursor
@@ -0,0 +1,960 @@
+from abc import ABC, abstractmethod
+import gzip
+import io
+import json
+import os
+import shutil
+from queue import Queue
+from threading import Thread
+from time import perf_counter
+from typing import Callable, Iterator
+import pandas as pd
+from modules.executors import SqlExecutor
+from modules.objects import CountryResolver, SqlTable
+from modules.parsers import SqlParser
+from settings import TableReference, Variables
+
+
+def normalize_row(
+    row: list[str], country_resolver: CountryResolver
+) -> Iterator[tuple[TableReference, list[str | int]]]:
+    """
+    Simulate the insertion of a CSV row in each table.
+
+    The insertions are sorted by how many relations each table has (from smallest to largest),
+    so that the ids referenced by a row were already assigned.
+
+    Arguments:
+        row: list[str]
+            The columns of a CSV row.
+        country_resolver: CountryResolver
+            The resolver of the code of the country and its continent.
+
+    Returns:
+        An iterator with the table and the values of each row that must be inserted.
+    """
+
+    (
+        nombre_pais,
+        codigo_iso_pais,
+        oficina_registro,
+        _,
+        edad,
+        area_conocimiento,
+        especializacion,
+        nivel_academico,
+        _,
+        genero,
+        _,
+        estatura,
+        _,
+        cantidad_personas,
+    ) = row
+
+    if edad == "-1":
+        edad = Variables.Sql.NULL_VALUE
+
+    if estatura == "-1":
+        estatura = Variables.Sql.NULL_VALUE
+
+    codigo_iso_pais, codigo_iso_continente = country_resolver.resolve(codigo_iso_pais)
+
+    def insert(reference: TableReference, values: list[str | int]):
+        if (values := Variables.Sql.TABLES[reference].add_values(values)) is not None:
+            yield reference, values
+
+    def get_id(reference: TableReference, identifier_value: str) -> int | str:
+        return Variables.Sql.TABLES[reference].get_id_by_identifier_value(
+            identifier_value
+        )
+
+    yield from insert(
+        TableReference.CONTINENTE,
+        [
+            codigo_iso_continente,
+            Variables.CONTINENTS.get(codigo_iso_continente, Variables.Sql.NULL_VALUE),
+        ],
+    )
+
+    yield from insert(
+        TableReference.PAIS,
+        [
+            get_id(TableReference.CONTINENTE, codigo_iso_continente),
+            codigo_iso_pais,
+            nombre_pais,
+        ],
+    )
+
+    yield from insert(
+        TableReference.OFICINA_REGISTRO,
+        [get_id(TableReference.PAIS, codigo_iso_pais), oficina_registro],
+    )
+
+    yield from insert(TableReference.NIVEL_ACADEMICO, [nivel_academico])
+
+    yield from insert(TableReference.AREA_CONOCIMIENTO, [area_conocimiento])
+
+    yield from insert(
+        TableReference.ESPECIALIZACION,
+        [
+            especializacion,
+            get_id(TableReference.AREA_CONOCIMIENTO, area_conocimiento),
+        ],
+    )
+
+    yield from insert(TableReference.GENERO, [genero])
+
+    yield from insert(
+        TableReference.DESCRIPCION_DEMOGRAFICA,
+        [
+            get_id(TableReference.OFICINA_REGISTRO, oficina_registro),
+            get_id(TableReference.NIVEL_ACADEMICO, nivel_academico),
+            get_id(TableReference.ESPECIALIZACION, especializacion),
+            get_id(TableReference.GENERO, genero),
+            edad,
+            estatura,
+            cantidad_personas,
+        ],
+    )
+
+
+class SqlLoader(ABC):
+    """
+    A loader of the normalized rows into the database.
+    The rows are kept in memory until they are flushed.
+    """
+
+    def __init__(
+        self,
+        sql_executor: SqlExecutor,
+        country_resolver: CountryResolver | None = None,
+    ) -> None:
+        """
+        Arguments:
+            sql_executor: SqlExecutor
+                The executor with which the rows will be sent to the database.
+
+        Optional arguments:
+            country_resolver: CountryResolver | None
+                The resolver of the code of each country and its continent,
+                only needed to add CSV rows with add_row. By default none.
+
+        Protected attributes:
+            sql_executor
+            country_resolver
+        """
+
+        self._sql_executor = sql_executor
+        self._country_resolver = country_resolver
+
+    def add_row(self, row: list[str]) -> None:
+        """
+        Queue the new rows of each table that a CSV row is normalized into.
+
+        Arguments:
+            row: list[str]
+                The columns of a CSV row.
+        """
+
+        assert self._country_resolver is not None, ValueError(
+            "A country resolver is needed to normalize the CSV rows"
+        )
+        for reference, values in normalize_row(row, self._country_resolver):
+            self.add_values(reference, values)
+
+    @abstractmethod
+    def add_values(self, reference: TableReference, values: list[str | int]) -> None:
+        """
+        Queue a row to be loaded.
+
+        Arguments:
+            reference: TableReference
+                The table of the row.
+            values: list[str | int]
+                The values of the row, along with its id if it is incrementable.
+        """
+
+    def add_columns(self, reference: TableReference, columns: "pd.DataFrame") -> None:
+        """
+        Queue several rows to be loaded, given by columns.
+
+        Arguments:
+            reference: TableReference
+                The table of the rows.
+            columns: pd.DataFrame
+                The values of the rows, along with their ids, with an integer column for each one
+                of the table and where the null values are missing values.
+        """
+
+        for values in columns.astype(object).itertuples(index=False):
+            self.add_values(
+                reference,
+                [Variables.Sql.NULL_VALUE if pd.isna(value) else value for value in values],
+            )
+
+    @abstractmethod
+    def flush(self) -> None:
+        """
+        Send all the queued rows to the database.
+        """
+
+    @abstractmethod
+    def detach(self) -> "SqlLoader":
+        """
+        Move the queued rows to a new loader of the same type, so they can be
+        flushed by another thread while this one keeps queuing rows.
+
+        Returns:
+            The loader with the rows that were queued.
+        """
+
+
+class QueryLoader(SqlLoader):
+    """
+    A loader that sends all the rows as a single query of inserts.
+    """
+
+    def __init__(
+        self,
+        sql_executor: SqlExecutor,
+        country_resolver: CountryResolver | None = None,
+    ) -> None:
+        """
+        Arguments:
+            sql_executor: SqlExecutor
+
+        Optional arguments:
+            country_resolver: CountryResolver | None
+
+        Private attributes:
+            queries: list[str]
+                The insert queries, in the same order in which the rows were added.
+        """
+
+        super().__init__(sql_executor, country_resolver)
+        self.__queries: list[str] = []
+
+    def add_values(self, reference: TableReference, values: list[str | int]) -> None:
+        self.__queries.append(
+            Variables.Sql.TABLES[reference].get_insert_query(values)
+        )
+
+    def flush(self) -> None:
+        if not self.__queries:
+            return
+        print("It's time to run that huge query!")
+        self._sql_executor.run_query("".join(self.__queries))
+        self.__queries.clear()
+
+    def detach(self) -> "QueryLoader":
+        loader = QueryLoader(self._sql_executor, self._country_resolver)
+        loader.__queries, self.__queries = self.__queries, []
+        return loader
+
+
+class CopyLoader(SqlLoader):
+    """
+    A loader that streams the rows of each table with a COPY ... FROM STDIN,
+    reporting how many rows per second were loaded in each table.
+    """
+
+    def __init__(
+        self,
+        sql_executor: SqlExecutor,
+        country_resolver: CountryResolver | None = None,
+    ) -> None:
+        """
+        Arguments:
+            sql_executor: SqlExecutor
+
+        Optional arguments:
+            country_resolver: CountryResolver | None
+
+        Private attributes:
+            buffers: dict[TableReference, io.StringIO]
+                The rows of each table, in the text format of the copy queries.
+            rows: dict[TableReference, int]
+                The number of rows in each buffer.
+        """
+
+        super().__init__(sql_executor, country_resolver)
+        self.__buffers: dict[TableReference, io.StringIO] = {}
+        self.__rows: dict[TableReference, int] = {}
+        self._reset()
+
+    def add_values(self, reference: TableReference, values: list[str | int]) -> None:
+        self.__buffers[reference].write(SqlParser.get_copy_row(values))
+        self.__rows[reference] += 1
+
+    def add_columns(self, reference: TableReference, columns: "pd.DataFrame") -> None:
+        lines = columns.to_csv(
+            sep="\t", na_rep=Variables.Sql.COPY_NULL_VALUE, header=False, index=False
+        )
+        self.__buffers[reference].write(lines.replace(os.linesep, "\n"))
+        self.__rows[reference] += len(columns)
+
+    def _write_tables(self, write: Callable[[SqlTable, io.StringIO], None]) -> None:
+        """
+        Write the buffer of each table, sorted by how many relations it has,
+        so that the rows referenced by a foreign key already exist.
+
+        Arguments:
+            write: (SqlTable, io.StringIO) -> None
+                A function that writes the rows of a table, given its buffer at the start.
+        """
+
+        for reference in Variables.Sql.INSERTION_ORDER:
+            rows = self.__rows[reference]
+            if rows == 0:
+                continue
+            table = Variables.Sql.TABLES[reference]
+            buffer = self.__buffers[reference]
+            buffer.seek(0)
+
+            start = perf_counter()
+            write(table, buffer)
+            elapsed = perf_counter() - start
+
+            print(
+                f"{table.get_name()}: {rows} rows in {elapsed:.2f}s "
+                f"({rows / max(elapsed, 1e-9):.0f} rows/s)"
+            )
+
+    def _get_rows(self, reference: TableReference) -> int:
+        return self.__rows[reference]
+
+    def __copy_tables(self, _: str, conn: "psycopg2.connection") -> None:
+        with conn.cursor() as cursor:
+            self._write_tables(
+                lambda table, buffer: cursor.copy_expert(
+                    table.get_copy_query(), buffer
+                )
+            )
+
+    def _is_empty(self) -> bool:
+        return not any(self.__rows.values())
+
+    def _reset(self) -> None:
+        for reference in Variables.Sql.INSERTION_ORDER:
+            self.__buffers[reference] = io.StringIO()
+            self.__rows[reference] = 0
+
+    def _move_to(self, loader: "CopyLoader") -> "CopyLoader":
+        """
+        Move the queued rows to another loader.
+
+        Arguments:
+            loader: CopyLoader
+                An empty loader.
+
+        Returns:
+            The given loader.
+        """
+
+        loader.__buffers, self.__buffers = self.__buffers, loader.__buffers
+        loader.__rows, self.__rows = self.__rows, loader.__rows
+        return loader
+
+    def flush(self) -> None:
+        if self._is_empty():
+            return
+        print("Copying the tables...")
+        self._sql_executor.run_query("", handle_conn=self.__copy_tables)
+        self._reset()
+
+    def detach(self) -> "CopyLoader":
+        return self._move_to(CopyLoader(self._sql_executor, self._country_resolver))
+
+
+class ExportLoader(CopyLoader):
+    """
+    A loader that, instead of sending the rows to the database, appends the rows of each table
+    to a gzip file in the text format of the copy queries, so any database can be loaded
+    with them later (see replay_export) without normalizing the CSV rows again.
+
+    Along with the files a manifest is saved, with the columns and the number of rows
+    of each table, and a psql script that copies them.
+    """
+
+    MANIFEST = "manifest.json"
+    PSQL_SCRIPT = "load.psql"
+
+    def __init__(
+        self,
+        sql_executor: SqlExecutor,
+        directory: str,
+        country_resolver: CountryResolver | None = None,
+        exported_rows: dict[TableReference, int] | None = None,
+    ) -> None:
+        """
+        Arguments:
+            sql_executor: SqlExecutor
+            directory: str
+                The path to the directory where the files are saved.
+
+        Optional arguments:
+            country_resolver: CountryResolver | None
+            exported_rows: dict[TableReference, int] | None
+                The number of rows already in the file of each table,
+                shared by the loaders detached from this one. By default none.
+
+        Private attributes:
+            directory: str
+            exported_rows: dict[TableReference, int]
+        """
+
+        super().__init__(sql_executor, country_resolver)
+        self.__directory = directory
+        self.__exported_rows = exported_rows or {
+            reference: 0 for reference in Variables.Sql.INSERTION_ORDER
+        }
+
+    @staticmethod
+    def get_file_name(table: SqlTable) -> str:
+        return f"{table.get_name()}.copy.gz"
+
+    @classmethod
+    def prepare(cls, directory: str) -> None:
+        """
+        Create the directory, removing the files of a previous export.
+
+        Arguments:
+            directory: str
+        """
+
+        os.makedirs(directory, exist_ok=True)
+        for file in [cls.MANIFEST, cls.PSQL_SCRIPT] + [
+            cls.get_file_name(table) for table in Variables.Sql.TABLES.values()
+        ]:
+            if os.path.exists(file := os.path.join(directory, file)):
+                os.remove(file)
+
+    def __export_table(self, table: SqlTable, buffer: io.StringIO) -> None:
+        with gzip.open(
+            os.path.join(self.__directory, self.get_file_name(table)),
+            "at",
+            encoding="utf-8",
+        ) as file:
+            shutil.copyfileobj(buffer, file)
+
+    def __save_manifest(self) -> None:
+        """
+        Save the manifest and the psql script, replacing the previous ones,
+        so they only list the rows already written to the files.
+        """
+
+        tables, commands = [], []
+        for reference in Variables.Sql.INSERTION_ORDER:
+            table = Variables.Sql.TABLES[reference]
+            file, rows = self.get_file_name(table), self.__exported_rows[reference]
+            tables.append(
+                {
+                    "name": table.get_name(),
+                    "file": file,
+                    "copy_query": table.get_copy_query(),
+                    "rows": rows,
+                }
+            )
+            if rows > 0:
+                commands.append(table.get_psql_copy_command(f"gzip -dc {file}"))
+
+        for file, content in [
+            (self.MANIFEST, json.dumps({"format": "text", "tables": tables}, indent=4)),
+            (
+                self.PSQL_SCRIPT,
+                "\n".join(["\\set ON_ERROR_STOP on", "BEGIN;", *commands, "COMMIT;", ""]),
+            ),
+        ]:
+            temporal_file = os.path.join(self.__directory, f"{file}.tmp")
+            with open(temporal_file, "w", encoding="utf-8") as output:
+                output.write(content)
+            os.replace(temporal_file, os.path.join(self.__directory, file))
+
+    def flush(self) -> None:
+        if self._is_empty():
+            return
+        print(f"Exporting the tables to {self.__directory}...")
+        self._write_tables(self.__export_table)
+        for reference in Variables.Sql.INSERTION_ORDER:
+            self.__exported_rows[reference] += self._get_rows(reference)
+        self.__save_manifest()
+        self._reset()
+
+    def detach(self) -> "ExportLoader":
+        return self._move_to(
+            ExportLoader(
+                self._sql_executor,
+                self.__directory,
+                self._country_resolver,
+                self.__exported_rows,
+            )
+        )
+
+
+class StagingLoader(SqlLoader):
+    """
+    A loader that copies the columns of the CSV rows, without normalizing them,
+    into an UNLOGGED staging table, from which each table is populated with
+    set-based INSERT ... SELECT queries, so the normalization runs in the database.
+
+    The ids are assigned in the order in which the values first appear in the CSV file,
+    continuing from the last id of each table, so they are the same as the ones of the other loaders.
+    """
+
+    STAGING_TABLE = "Staging"
+    STAGING_COUNTRIES_TABLE = "StagingPais"
+    STAGING_COLUMNS = [
+        "fila",
+        "nombre_pais",
+        "codigo_iso_pais",
+        "oficina_registro",
+        "edad",
+        "area_conocimiento",
+        "especializacion",
+        "nivel_academico",
+        "genero",
+        "estatura",
+        "cantidad_personas",
+    ]
+    STAGING_COUNTRIES_COLUMNS = [
+        "codigo_iso_pais",
+        "codigo",
+        "codigo_continente",
+        "nombre_continente",
+    ]
+
+    def __init__(
+        self, sql_executor: SqlExecutor, country_resolver: CountryResolver
+    ) -> None:
+        """
+        Arguments:
+            sql_executor: SqlExecutor
+            country_resolver: CountryResolver
+                The resolver of the code of each country and its continent,
+                which can't be resolved in the database.
+
+        Private attributes:
+            buffer: io.StringIO
+                The CSV rows, in the text format of the copy queries.
+            rows: int
+                The number of rows in the buffer, used as their position in it.
+        """
+
+        super().__init__(sql_executor, country_resolver)
+        self.__buffer = io.StringIO()
+        self.__rows = 0
+
+    def add_row(self, row: list[str]) -> None:
+        """
+        Queue a CSV row to be copied into the staging table.
+
+        Arguments:
+            row: list[str]
+                The columns of a CSV row.
+        """
+
+        (
+            nombre_pais,
+            codigo_iso_pais,
+            oficina_registro,
+            _,
+            edad,
+            area_conocimiento,
+            especializacion,
+            nivel_academico,
+            _,
+            genero,
+            _,
+            estatura,
+            _,
+            cantidad_personas,
+        ) = row
+
+        self.__buffer.write(
+            SqlParser.get_copy_row(
+                [
+                    self.__rows,
+                    nombre_pais,
+                    codigo_iso_pais,
+                    oficina_registro,
+                    edad,
+                    area_conocimiento,
+                    especializacion,
+                    nivel_academico,
+                    genero,
+                    estatura,
+                    cantidad_personas,
+                ]
+            )
+        )
+        self.__rows += 1
+
+    def add_values(self, reference: TableReference, values: list[str | int]) -> None:
+        """
+        The staging loader only takes the CSV rows, since the ids of the normalized rows
+        are assigned by the database when the staging table is normalized.
+        """
+
+        raise TypeError(
+            "The staging loader doesn't take normalized rows, only CSV rows (add_row)"
+        )
+
+    def __get_countries(self, codes: list[str]) -> io.StringIO:
+        """
+        Resolve the codes of the countries found in the staging table.
+        """
+
+        countries = io.StringIO()
+        for code in codes:
+            country_code, continent_code = self._country_resolver.resolve(code)
+            countries.write(
+                SqlParser.get_copy_row(
+                    [
+                        code,
+                        country_code,
+                        continent_code,
+                        Variables.CONTINENTS.get(
+                            continent_code, Variables.Sql.NULL_VALUE
+                        ),
+                    ]
+                )
+            )
+        countries.seek(0)
+        return countries
+
+    @staticmethod
+    def __get_dimension_query(
+        table_name: str,
+        columns: list[str],
+        values: list[str],
+        identifier: str,
+        key: str,
+        joins: str = "",
+    ) -> str:
+        """
+        Get the query that inserts the values of a table that don't exist yet,
+        taking the row in which each one first appears.
+
+        Arguments:
+            table_name: str
+            columns: list[str]
+                The columns of the table, except the id.
+            values: list[str]
+                The expressions of the values of each column.
+            identifier: str
+                The column that identifies each row of the table.
+            key: str
+                The expression of the identifier in the staging table.
+
+        Optional arguments:
+            joins: str
+                The joins of the staging table, named s, needed by the key and the values.
+        """
+
+        invalid_values = ",".join(
+            "'" + value.replace("'", "''") + "'" for value in Variables.Sql.INVALID_VALUES
+        )
+        return f"""
+            INSERT INTO "{table_name}"(id,{','.join(f'"{column}"' for column in columns)})
+            SELECT
+                (SELECT coalesce(max(id), -1) FROM "{table_name}") + row_number() OVER (ORDER BY s.fila),
+                {','.join(values)}
+            FROM
+                (
+                    SELECT
+                        {key} as key,
+                        min(s.fila) as fila
+                    FROM
+                        "{StagingLoader.STAGING_TABLE}" as s
+                        {joins}
+                    WHERE
+                        {key} NOT IN ({invalid_values})
+                    GROUP BY 1
+                ) as first
+                JOIN
+                "{StagingLoader.STAGING_TABLE}" as s
+                ON (s.fila = first.fila)
+                {joins}
+            WHERE
+                NOT EXISTS (
+                    SELECT 1 FROM "{table_name}" as t WHERE t."{identifier}" = first.key
+                );
+        """
+
+    def __get_normalization_queries(self) -> dict[TableReference, str]:
+        """
+        Get the query that populates each table from the staging table.
+        They must run in Variables.Sql.INSERTION_ORDER, so that the referenced rows already exist.
+        """
+
+        countries_join = f"""
+            JOIN
+            "{self.STAGING_COUNTRIES_TABLE}" as sp
+            ON (sp.codigo_iso_pais = s.codigo_iso_pais)
+        """
+
+        return {
+            TableReference.CONTINENTE: self.__get_dimension_query(
+                "Continente",
+                ["codigo", "nombre"],
+                ["sp.codigo_continente", "sp.nombre_continente"],
+                "codigo",
+                "sp.codigo_continente",
+                countries_join,
+            ),
+            TableReference.PAIS: self.__get_dimension_query(
+                "Pais",
+                ["id_Continente", "codigo", "nombre"],
+                ["c.id", "sp.codigo", "s.nombre_pais"],
+                "codigo",
+                "sp.codigo",
+                countries_join
+                + """
+                LEFT JOIN
+                "Continente" as c
+                ON (c.codigo = sp.codigo_continente)
+                """,
+            ),
+            TableReference.OFICINA_REGISTRO: self.__get_dimension_query(
+                "OficinaRegistro",
+                ["id_Pais", "nombre"],
+                ["ps.id", "s.oficina_registro"],
+                "nombre",
+                "s.oficina_registro",
+                countries_join
+                + """
+                LEFT JOIN
+                "Pais" as ps
+                ON (ps.codigo = sp.codigo)
+                """,
+            ),
+            TableReference.NIVEL_ACADEMICO: self.__get_dimension_query(
+                "NivelAcademico",
+                ["nombre"],
+                ["s.nivel_academico"],
+                "nombre",
+                "s.nivel_academico",
+            ),
+            TableReference.AREA_CONOCIMIENTO: self.__get_dimension_query(
+                "AreaConocimiento",
+                ["nombre"],
+                ["s.area_conocimiento"],
+                "nombre",
+                "s.area_conocimiento",
+            ),
+            TableReference.ESPECIALIZACION: self.__get_dimension_query(
+                "Especializacion",
+                ["nombre", "id_AreaConocimiento"],
+                ["s.especializacion", "ac.id"],
+                "nombre",
+                "s.especializacion",
+                """
+                LEFT JOIN
+                "AreaConocimiento" as ac
+                ON (ac.nombre = s.area_conocimiento)
+                """,
+            ),
+            TableReference.GENERO: self.__get_dimension_query(
+                "Genero",
+                ["nombre"],
+                ["s.genero"],
+                "nombre",
+                "s.genero",
+            ),
+            TableReference.DESCRIPCION_DEMOGRAFICA: f"""
+            INSERT INTO "DescripcionDemografica"(
+                id,
+                "id_OficinaRegistro",
+                "id_NivelAcademico",
+                "id_Especializacion",
+                "id_Genero",
+                edad,
+                estatura,
+                cantidad_personas
+            )
+            SELECT
+                (SELECT coalesce(max(id), -1) + 1 FROM "DescripcionDemografica") + s.fila,
+                ofr.id,
+                na.id,
+                esp.id,
+                g.id,
+                NULLIF(s.edad, '-1')::smallint,
+                NULLIF(s.estatura, '-1')::integer,
+                s.cantidad_personas::smallint
+            FROM
+                "{self.STAGING_TABLE}" as s
+                LEFT JOIN
+                "OficinaRegistro" as ofr
+                ON (ofr.nombre = s.oficina_registro)
+                LEFT JOIN
+                "NivelAcademico" as na
+                ON (na.nombre = s.nivel_academico)
+                LEFT JOIN
+                "Especializacion" as esp
+                ON (esp.nombre = s.especializacion)
+                LEFT JOIN
+                "Genero" as g
+                ON (g.nombre = s.genero);
+            """,
+        }
+
+    def __load_staging_table(self, _: str, conn: "psycopg2.connection") -> None:
+        """
+        Copy the buffer into the staging table and populate each table from it,
+        all in the same transaction.
+        """
+
+        staging_columns = ",".join(
+            f"{column} {'bigint' if column == 'fila' else 'text'}"
+            for column in self.STAGING_COLUMNS
+        )
+        staging_countries_columns = ",".join(
+            f"{column} text" for column in self.STAGING_COUNTRIES_COLUMNS
+        )
+
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"""
+                CREATE UNLOGGED TABLE IF NOT EXISTS "{self.STAGING_TABLE}"({staging_columns});
+                CREATE UNLOGGED TABLE IF NOT EXISTS "{self.STAGING_COUNTRIES_TABLE}"({staging_countries_columns});
+                TRUNCATE "{self.STAGING_TABLE}", "{self.STAGING_COUNTRIES_TABLE}";
+                """
+            )
+
+            start = perf_counter()
+            self.__buffer.seek(0)
+            cursor.copy_expert(
+                SqlParser.get_copy_query(self.STAGING_TABLE, self.STAGING_COLUMNS),
+                self.__buffer,
+            )
+            cursor.execute(f'ANALYZE "{self.STAGING_TABLE}";')
+            print(
+                f"{self.STAGING_TABLE}: {self.__rows} rows in {perf_counter() - start:.2f}s"
+            )
+
+            cursor.execute(
+                f'SELECT DISTINCT codigo_iso_pais FROM "{self.STAGING_TABLE}"'
+            )
+            cursor.copy_expert(
+                SqlParser.get_copy_query(
+                    self.STAGING_COUNTRIES_TABLE, self.STAGING_COUNTRIES_COLUMNS
+                ),
+                self.__get_countries([code for code, in cursor.fetchall()]),
+            )
+
+            queries = self.__get_normalization_queries()
+            for reference in Variables.Sql.INSERTION_ORDER:
+                start = perf_counter()
+                cursor.execute(queries[reference])
+                elapsed = perf_counter() - start
+                print(
+                    f"{Variables.Sql.TABLES[reference].get_name()}: {cursor.rowcount} rows in {elapsed:.2f}s "
+                    f"({cursor.rowcount / max(elapsed, 1e-9):.0f} rows/s)"
+                )
+
+            cursor.execute(
+                f'TRUNCATE "{self.STAGING_TABLE}", "{self.STAGING_COUNTRIES_TABLE}";'
+            )
+
+    def flush(self) -> None:
+        if self.__rows == 0:
+            return
+        print("Normalizing the staging table...")
+        self._sql_executor.run_query("", handle_conn=self.__load_staging_table)
+        self.__buffer = io.StringIO()
+        self.__rows = 0
+
+    def detach(self) -> "StagingLoader":
+        loader = StagingLoader(self._sql_executor, self._country_resolver)
+        loader.__buffer, self.__buffer = self.__buffer, loader.__buffer
+        loader.__rows, self.__rows = self.__rows, loader.__rows
+        return loader
+
+
+class LoadPipeline:
+    """
+    A writer thread that flushes the loaders sent to it, in the same order,
+    so the rows are sent to the database while the next ones are parsed.
+
+    The loaders wait in a bounded queue: when it is full, sending another one blocks
+    until the writer flushes one, so the memory used stays bounded.
+    """
+
+    def __init__(self, max_batches: int) -> None:
+        """
+        Arguments:
+            max_batches: int
+                The number of loaders that can wait to be flushed.
+
+        Private attributes:
+            queue: Queue[tuple[SqlLoader, Callable[[], None] | None] | None]
+                The loaders to flush, along with the function called once each one is flushed.
+                None stops the writer.
+            error: Exception | None
+                The first error raised while flushing a loader.
+            flush_time: float
+                The seconds spent by the writer flushing the loaders.
+            writer: Thread
+        """
+
+        self.__queue: Queue[tuple[SqlLoader, Callable[[], None] | None] | None] = (
+            Queue(maxsize=max_batches)
+        )
+        self.__error: Exception | None = None
+        self.__flush_time = 0.0
+        self.__writer = Thread(target=self.__write, name="LoadPipeline", daemon=True)
+        self.__writer.start()
+
+    def __write(self) -> None:
+        """
+        Flush each loader of the queue until it is stopped.
+        After an error the remaining loaders are discarded, so the sender never blocks.
+        """
+
+        while (batch := self.__queue.get()) is not None:
+            if self.__error is not None:
+                continue
+            loader, on_loaded = batch
+            try:
+                start = perf_counter()
+                loader.flush()
+                self.__flush_time += perf_counter() - start
+                if on_loaded is not None:
+                    on_loaded()
+            except Exception as error:
+                self.__error = error
+
+    def get_flush_time(self) -> float:
+        return self.__flush_time
+
+    def __raise_error(self) -> None:
+        if self.__error is not None:
+            raise self.__error
+
+    def submit(
+        self, loader: SqlLoader, on_loaded: Callable[[], None] | None = None
+    ) -> None:
+        """
+        Send a loader to be flushed, waiting while the queue is full.
+
+        Arguments:
+            loader: SqlLoader
+                A loader that isn't used anymore, such as one returned by SqlLoader.detach.
+
+        Optional arguments:
+            on_loaded: () -> None
+                A function called by the writer once the loader is flushed.
+        """
+
+        self.__raise_error()
+        self.__queue.put((loader, on_loaded))
+
+    def close(self) -> None:
+        """
+        Wait until all the loaders sent are flushed and stop the writer,
+        raising the error of the first one that failed, if any.
+        """
+
+        self.__queue.put(None)
+        self.__writer.join()
+        self.__raise_error()
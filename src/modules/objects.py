@@ -1,3 +1,15 @@
+import json
+import os
+import sys
+from typing import Any, ItemsView, Iterable, Iterator
+from pycountry_convert import (
+    country_alpha2_to_continent_code,
+    country_alpha3_to_country_alpha2,
+    map_country_alpha3_to_country_alpha2,
+)
+from pycountry_convert.convert_country_alpha2_to_continent_code import (
+    COUNTRY_ALPHA2_TO_CONTINENT_CODE,
+)
 from modules.executors import SqlExecutor
 from modules.parsers import SqlParser
 from rich.table import Table
@@ -7,6 +19,200 @@ import dash_bootstrap_components as dbc
 from dash import html
 
 
+class DimensionDictionary:
+    """
+    A dictionary between the values of an identifier and their ids.
+
+    The values themselves are used as keys, so the ids are the same in every process
+    and two different values are never merged, as could happen with their hashes.
+    The strings are interned, so a value repeated in several tables or dictionaries
+    is stored only once.
+
+    The dictionary is saved with the state of its table in each checkpoint,
+    grouping the values with consecutive ids, so a resumed insertion assigns the same ids.
+    The processes that parse the CSV file only split the fields of the rows,
+    which are normalized in the main process, so they don't need it.
+    """
+
+    def __init__(self, items: Iterable[tuple[str | int, int | str]] = ()) -> None:
+        """
+        Optional arguments:
+            items: Iterable[tuple[str | int, int | str]]
+                The initial values along with their ids.
+
+        Private attributes:
+            ids: dict[str | int, int | str]
+                A dictionary that as key has the value of the identifier and as value the id.
+        """
+
+        self.__ids: dict[str | int, int | str] = dict()
+        for value, id in items:
+            self.add(value, id)
+
+    def add(self, value: str | int, id: int | str) -> None:
+        if isinstance(value, str):
+            value = sys.intern(value)
+        self.__ids[value] = id
+
+    def get_id(self, value: str | int) -> int | str:
+        return self.__ids[value]
+
+    def contains(self, value: str | int) -> bool:
+        return value in self.__ids
+
+    def get_items(self) -> ItemsView[str | int, int | str]:
+        return self.__ids.items()
+
+    def get_size(self) -> int:
+        return len(self.__ids)
+
+    @staticmethod
+    def __get_run_id(first_id: int | str, position: int) -> int | str:
+        """
+        Get the id of a value within a run, where the integer ids are consecutive
+        and the other ones are the same for every value.
+        """
+
+        return first_id + position if isinstance(first_id, int) else first_id
+
+    def get_state(self) -> list[list]:
+        """
+        Get the values along with their ids, grouped in runs of consecutive ids
+        that only keep the first one, as the ids of a table are assigned one after the other.
+
+        Returns:
+            A list of [first id, values] runs that can be serialized as JSON.
+        """
+
+        runs: list[list] = []
+        for value, id in self.__ids.items():
+            if runs and self.__get_run_id(runs[-1][0], len(runs[-1][1])) == id:
+                runs[-1][1].append(value)
+            else:
+                runs.append([id, [value]])
+        return runs
+
+    def set_state(self, state: list[list]) -> None:
+        """
+        Add the values of the runs obtained with get_state.
+
+        Arguments:
+            state: list[list]
+        """
+
+        for first_id, values in state:
+            for position, value in enumerate(values):
+                self.add(value, self.__get_run_id(first_id, position))
+
+
+class CountryResolver:
+    """
+    A memoized resolver of the iso codes of the countries in the CSV file
+    to the code that is saved in the database and the code of its continent.
+
+    The codes of all the known countries are resolved once when it is built,
+    so the rows are resolved with a lookup instead of the pycountry_convert conversions.
+    """
+
+    UNKNOWN_COUNTRIES = ("DDD", *Variables.Sql.INVALID_VALUES)
+    RENAMED_COUNTRIES = {"SX": ("SXM", "NA")}
+
+    def __init__(self, countries: Iterable[tuple[str, str, str]] = ()) -> None:
+        """
+        Optional arguments:
+            countries: Iterable[tuple[str, str, str]]
+                The iso code of each country in the CSV file, along with
+                the code saved in the database and the code of its continent.
+
+        Private attributes:
+            countries: dict[str, tuple[str, str]]
+                A dictionary that as key has the iso code of the country in the CSV file
+                and as value the code of the country and the code of its continent.
+        """
+
+        self.__countries: dict[str, tuple[str, str]] = {
+            code: (code, Variables.Sql.NULL_VALUE) for code in self.UNKNOWN_COUNTRIES
+        }
+        self.__countries.update(self.RENAMED_COUNTRIES)
+        for code, country_code, continent_code in countries:
+            self.__countries[sys.intern(code)] = (
+                sys.intern(country_code),
+                sys.intern(continent_code),
+            )
+
+    @classmethod
+    def build(cls) -> "CountryResolver":
+        """
+        Build the resolver with every alpha-3 code known by pycountry_convert that has a continent.
+        """
+
+        return cls(
+            (alpha3, alpha3, COUNTRY_ALPHA2_TO_CONTINENT_CODE[alpha2])
+            for alpha3, alpha2 in map_country_alpha3_to_country_alpha2().items()
+            if alpha2 in COUNTRY_ALPHA2_TO_CONTINENT_CODE
+        )
+
+    def resolve(self, code: str) -> tuple[str, str]:
+        """
+        Get the code of a country and the code of its continent.
+        A code that wasn't resolved yet is converted with pycountry_convert and remembered,
+        which raises a KeyError if it isn't a known country.
+
+        Arguments:
+            code: str
+                The iso code of the country in the CSV file.
+
+        Returns:
+            The code of the country and the code of its continent.
+        """
+
+        if (country := self.__countries.get(code)) is None:
+            country = self.__countries[sys.intern(code)] = (
+                sys.intern(code),
+                country_alpha2_to_continent_code(
+                    country_alpha3_to_country_alpha2(code)
+                ),
+            )
+        return country
+
+    def get_size(self) -> int:
+        return len(self.__countries)
+
+    def save(self, file: str) -> None:
+        """
+        Save the resolver as a JSON list of [code, country code, continent code] triples.
+        It is written to a temporary file that then replaces the given one,
+        so an interruption never leaves it half written.
+
+        Arguments:
+            file: str
+                The path to the location of the .json file.
+        """
+
+        temporal_file = f"{file}.tmp"
+        with open(temporal_file, "w", encoding="utf-8") as output:
+            json.dump(
+                [[code, *country] for code, country in self.__countries.items()],
+                output,
+            )
+            output.flush()
+            os.fsync(output.fileno())
+        os.replace(temporal_file, file)
+
+    @classmethod
+    def load(cls, file: str) -> "CountryResolver":
+        """
+        Load a resolver saved with CountryResolver.save.
+
+        Arguments:
+            file: str
+                The path to the location of the .json file.
+        """
+
+        with open(file, encoding="utf-8") as input_file:
+            return cls(tuple(country) for country in json.load(input_file))
+
+
 class SqlTable:
     """
     A simple implementation of a SQL table
@@ -18,6 +224,9 @@ class SqlTable:
         columns: list[str],
         identifier: str | int,
         has_incrementable_id: bool,
+        is_fact_table: bool = False,
+        indexed_columns: list[str] = [],
+        referenced_tables: list[str] = [],
     ) -> None:
         """
         Arguments:
@@ -33,6 +242,18 @@ class SqlTable:
                 The id is assumed to be the primary key, and it is inquired whether it
                 is incrementable to take it into account in each insertion.
 
+        Optional arguments:
+            is_fact_table: bool
+                Whether the table stores facts, whose rows are never referenced by their identifier.
+                The uniqueness isn't checked for them and their records aren't kept,
+                only the id is incremented in each insertion. By default False.
+            indexed_columns: list[str]
+                The columns, besides the primary key, that are indexed after the rows are loaded,
+                such as the foreign keys and the columns by which the views filter. By default none.
+            referenced_tables: list[str]
+                The names of the tables referenced by a foreign key, named "<table>_fk",
+                of the "id_<table>" column. By default none.
+
         Private attributes:
             name: str
                 The table name.
@@ -40,24 +261,33 @@ class SqlTable:
                 The table columns, joined by commas and quotation marks.
             columns: list[str]
                 The table columns.
-            records: dict[str, int]
-                A dictionary that as key has the identifier and as value the id.
+            records: DimensionDictionary
+                A dictionary that as key has the value of the identifier and as value the id.
             id: int | None
                 The id of the table.
                 If it is specified that it is not incrementable it will not be taken into account in the insertions,
                 otherwise, it will start counting from 0 (initializing to -1).
             identifier_index: int
                 Instead of storing the name of the identifier, its index is stored in relation to the column.
+            is_fact_table: bool
+            indexed_columns: list[str]
+            referenced_tables: list[str]
+            facts: dict[tuple, int] | None
+                When the rows of a fact table are compacted, a dictionary that as key has
+                all the values of a row except the last one, which is the quantity
+                that is summed, and as value that sum. Otherwise None.
+            full_facts: list[list[str | int]]
+                The compacted rows whose quantity can't be increased without overflowing.
         """
 
         self.__name = name
         self.__joined_columns = ",".join([f'"{column}"' for column in columns])
         self.__columns = self.__joined_columns.split(",")
 
-        self.__records: dict[int, str | int] = dict()
+        self.__records = DimensionDictionary()
         for invalid_value in Variables.Sql.INVALID_VALUES:
-            self.__records[hash(invalid_value)] = Variables.Sql.NULL_VALUE
-        self.__records[hash(Variables.Sql.NULL_VALUE)] = Variables.Sql.NULL_VALUE
+            self.__records.add(invalid_value, Variables.Sql.NULL_VALUE)
+        self.__records.add(Variables.Sql.NULL_VALUE, Variables.Sql.NULL_VALUE)
 
         match identifier:
             case int():
@@ -69,22 +299,31 @@ class SqlTable:
         if has_incrementable_id:
             self.__id = -1
 
-    def __find_and_hash_identifier(self, values: list[str | int]) -> int:
+        assert not is_fact_table or has_incrementable_id, ValueError(
+            "A fact table must have an incrementable id"
+        )
+        self.__is_fact_table = is_fact_table
+        self.__indexed_columns = indexed_columns
+        self.__referenced_tables = referenced_tables
+        self.__facts: dict[tuple, int] | None = None
+        self.__full_facts: list[list[str | int]] = []
+
+    def __find_identifier(self, values: list[str | int]) -> str | int:
         """
-        Get the hash value of the identifier within the given values.
+        Get the value of the identifier within the given values.
 
         Arguments:
             values: list[str]
                 The values of a row.
 
         Returns:
-            An integer, obtained by hashing the value of the identifier.
+            The value of the identifier.
         """
 
-        return hash(values[self.__identifier_index])
+        return values[self.__identifier_index]
 
     def get_id_by_identifier_value(self, identifier_value: str) -> int | str:
-        return self.__records[hash(identifier_value)]
+        return self.__records.get_id(identifier_value)
 
     def record_already_exists(self, values: list[str | int]) -> bool:
         """
@@ -98,9 +337,9 @@ class SqlTable:
             A value obtained by searching the key of the registers for the identifier.
         """
 
-        return self.__find_and_hash_identifier(values) in self.__records
+        return self.__records.contains(self.__find_identifier(values))
 
-    def insert_values(self, values: list[str | int]) -> str:
+    def add_values(self, values: list[str | int]) -> list[str | int] | None:
         """
         Simulate the insertion of a row, taking into account the uniqueness of the identifier.
 
@@ -109,12 +348,18 @@ class SqlTable:
                 The values of a row.
 
         Returns:
-            A text string equivalent to a SQL insert. If repeated, an empty string is returned.
+            The values of the row, along with its id if it is incrementable. If repeated, None is returned.
+            The rows of a compacted fact table aren't returned until pop_compacted_values is called.
         """
+        if self.__is_fact_table:
+            if self.__facts is not None:
+                self.__compact(values)
+                return None
+            self.__id += 1
+            return [self.__id, *values]
+
         if self.__id is None and not self.record_already_exists(values):
-            return SqlParser.get_insert_query(
-                self.__name, self.__joined_columns, values
-            )
+            return values
 
         assert self.__id is not None, ValueError(
             "Attempting to insert a value when its id index is null"
@@ -122,16 +367,235 @@ class SqlTable:
         values = [self.__id + 1, *values]
         if not self.record_already_exists(values):
             self.__id += 1
-            self.__records[self.__find_and_hash_identifier(values)] = self.__id
-            return SqlParser.get_insert_query(
-                self.__name, self.__joined_columns, values
+            self.__records.add(self.__find_identifier(values), self.__id)
+            return values
+        return None
+
+    def set_compaction(self, compact: bool) -> None:
+        """
+        Set whether the rows of the fact table that only differ in their last value,
+        the quantity, are folded into a single row whose quantity is their sum.
+
+        Arguments:
+            compact: bool
+        """
+
+        assert self.__is_fact_table, ValueError(
+            "Attempting to compact the rows of a table that doesn't store facts"
+        )
+        self.__facts = {} if compact else None
+        self.__full_facts.clear()
+
+    def is_compacted(self) -> bool:
+        return self.__facts is not None
+
+    def reserve_ids(self, count: int) -> int:
+        """
+        Assign the ids of several rows of the fact table at once,
+        as if each one were added with add_values.
+
+        Arguments:
+            count: int
+                The number of rows.
+
+        Returns:
+            The id of the first row, the next ones are consecutive.
+        """
+
+        assert self.__is_fact_table, ValueError(
+            "Attempting to reserve the ids of a table that doesn't store facts"
+        )
+        first_id = self.__id + 1
+        self.__id += count
+        return first_id
+
+    def __compact(self, values: list[str | int]) -> None:
+        """
+        Add the quantity of a row to the one of the rows with the same values.
+        If the sum would overflow a smallint, the folded row is closed and a new one is started.
+        """
+
+        *key, quantity = values
+        key, quantity = tuple(key), int(quantity)
+        total = self.__facts.get(key, 0)
+        if total > 0 and total + quantity > Variables.Sql.SMALLINT_MAX:
+            self.__full_facts.append([*key, total])
+            total = 0
+        self.__facts[key] = total + quantity
+
+    def pop_compacted_values(self) -> list[list[str | int]]:
+        """
+        Get the rows folded since the last call, assigning their ids.
+
+        Returns:
+            The values of each row, along with its id.
+        """
+
+        if not self.__facts and not self.__full_facts:
+            return []
+
+        rows = self.__full_facts + [
+            [*key, total] for key, total in self.__facts.items()
+        ]
+        self.__facts.clear()
+        self.__full_facts = []
+
+        for row in rows:
+            self.__id += 1
+            row.insert(0, self.__id)
+        return rows
+
+    def insert_values(self, values: list[str | int]) -> str:
+        """
+        Simulate the insertion of a row, taking into account the uniqueness of the identifier.
+
+        Arguments:
+            values: list[str | int]
+                The values of a row.
+
+        Returns:
+            A text string equivalent to a SQL insert. If repeated, an empty string is returned.
+        """
+
+        row = self.add_values(values)
+        if row is None:
+            return ""
+        return self.get_insert_query(row)
+
+    def get_state(self) -> dict[str, Any]:
+        """
+        Get the id and the records of the table, so that the insertions can be resumed later.
+        A fact table doesn't keep its records, so only the id is returned.
+
+        Returns:
+            A dictionary that can be serialized as JSON.
+        """
+
+        records = [] if self.__is_fact_table else self.__records.get_state()
+        return {"id": self.__id, "records": records}
+
+    def set_state(self, state: dict[str, Any]) -> None:
+        """
+        Restore the id and the records of the table.
+
+        Arguments:
+            state: dict[str, Any]
+                A dictionary obtained with get_state.
+        """
+
+        self.__id = state["id"]
+        self.__records.set_state(state["records"])
+
+    def load_records(self) -> None:
+        """
+        Restore the id and the records of the table from the rows already in the database,
+        with a single query. A fact table only needs the last id.
+        """
+
+        assert self.__id is not None, ValueError(
+            "Attempting to load the records of a table whose id isn't incrementable"
+        )
+
+        if self.__is_fact_table:
+            (last_id,), *_ = self.__get_values(
+                f'"{self.__name}"', f"max({self.__columns[0]})", []
+            ) or [(None,)]
+            self.__id = last_id if last_id is not None else -1
+            return
+
+        for id, identifier_value in (
+            self.__get_values(
+                f'"{self.__name}"',
+                f"{self.__columns[0]},{self.__columns[self.__identifier_index]}",
+                [],
             )
-        return ""
+            or []
+        ):
+            self.__id = max(self.__id, id)
+            if identifier_value is not None:
+                self.__records.add(identifier_value, id)
 
-    def __get_values(
-        self, from_statement: str, columns: str, filters: list[str]
-    ) -> list[tuple] | None:
-        sql_executor = SqlExecutor(
+    def get_name(self) -> str:
+        return self.__name
+
+    def get_insert_query(self, values: list[str | int]) -> str:
+        """
+        Get the insert query of a row, without checking the uniqueness of the identifier.
+
+        Arguments:
+            values: list[str | int]
+                The values of a row, along with its id if it is incrementable.
+        """
+
+        return SqlParser.get_insert_query(self.__name, self.__joined_columns, values)
+
+    def get_copy_query(self) -> str:
+        """
+        Get the copy query that loads all the columns of the table from the standard input.
+        """
+
+        return SqlParser.get_copy_query(self.__name, self.__joined_columns)
+
+    def get_psql_copy_command(self, program: str) -> str:
+        """
+        Get the psql command that loads all the columns of the table from the output of a program.
+        """
+
+        return SqlParser.get_psql_copy_command(
+            self.__name, self.__joined_columns, program
+        )
+
+    def get_index_queries(self) -> list[str]:
+        """
+        Get the queries that create the indexes of the indexed columns.
+        """
+
+        return [
+            SqlParser.get_create_index_query(self.__name, column)
+            for column in self.__indexed_columns
+        ]
+
+    def get_drop_index_queries(self) -> list[str]:
+        """
+        Get the queries that drop the indexes of the indexed columns.
+        """
+
+        return [
+            SqlParser.get_drop_index_query(self.__name, column)
+            for column in self.__indexed_columns
+        ]
+
+    def get_add_foreign_keys_query(self) -> str:
+        """
+        Get the query that adds all the foreign keys of the table, or an empty one if it has none.
+        """
+
+        if not self.__referenced_tables:
+            return ""
+        return SqlParser.get_add_foreign_keys_query(
+            self.__name, self.__referenced_tables
+        )
+
+    def get_drop_foreign_keys_query(self) -> str:
+        """
+        Get the query that drops all the foreign keys of the table, or an empty one if it has none.
+        """
+
+        if not self.__referenced_tables:
+            return ""
+        return SqlParser.get_drop_foreign_keys_query(
+            self.__name, self.__referenced_tables
+        )
+
+    def get_analyze_query(self) -> str:
+        """
+        Get the query that updates the statistics used by the query planner for the table.
+        """
+
+        return f'ANALYZE "{self.__name}";'
+
+    def __get_sql_executor(self) -> SqlExecutor:
+        return SqlExecutor(
             Connection.DATABASE,
             Connection.USER,
             Connection.PASSWORD,
@@ -139,14 +603,34 @@ class SqlTable:
             Connection.PORT,
         )
 
-        return sql_executor.run_query(
-            f"""
+    def __get_select_query(
+        self, from_statement: str, columns: str, filters: list[str]
+    ) -> str:
+        return f"""
             SELECT
                 {columns}
             FROM
                 {from_statement}
             {' '.join(filters)}
             """
+
+    def __get_values(
+        self, from_statement: str, columns: str, filters: list[str]
+    ) -> list[tuple] | None:
+        return self.__get_sql_executor().run_query(
+            self.__get_select_query(from_statement, columns, filters)
+        )
+
+    def __stream_values(
+        self, from_statement: str, columns: str, filters: list[str], itersize: int
+    ) -> Iterator[tuple]:
+        """
+        Iterate over the values with a server-side cursor,
+        so only itersize rows are in memory at a time.
+        """
+
+        return self.__get_sql_executor().stream_query(
+            self.__get_select_query(from_statement, columns, filters), itersize
         )
 
     def get_values(self, filters: list[str] = []) -> list[tuple] | None:
@@ -207,9 +691,12 @@ class SqlTable:
         filters: list[str] = ["limit 15"],
         columns: list[str | int] | slice = slice(0, None),
         tables_to_join: list["SqlTable"] = [],
+        page_size: int = Connection.STREAM_ITERSIZE,
     ) -> None:
         """
         Print in console the tuples of the table.
+        They are read from the database and printed by pages, so all of them
+        can be displayed without keeping them in memory.
 
         Optional arguments:
             filters: list[str]
@@ -223,6 +710,9 @@ class SqlTable:
                 It is important to remember that we only consider the following conditional
                 (which goes in the ON): A.id_B = B.id, where A is the name of the root table
                 and B the name of the tables passed in this argument.
+            page_size: int
+                The maximum number of tuples of each printed table.
+                By default Connection.STREAM_ITERSIZE.
         """
 
         if not isinstance(tables_to_join, list):
@@ -252,25 +742,31 @@ class SqlTable:
             case _:
                 raise ValueError("The columns aren't a list or a slice")
 
-        output_table = Table(title=self.__name, show_lines=True)
-        for column in columns_with_table_name:
-            output_table.add_column(
-                column.replace('"', "").replace(".", "\n"),
-                vertical="middle",
-                justify="center",
-            )
-        for row in (
-            self.__get_values(
-                columns=",".join(columns_with_table_name),
-                from_statement=from_statement,
-                filters=filters,
-            )
-            or []
+        def get_output_table(title: str | None) -> Table:
+            output_table = Table(title=title, show_lines=True)
+            for column in columns_with_table_name:
+                output_table.add_column(
+                    column.replace('"', "").replace(".", "\n"),
+                    vertical="middle",
+                    justify="center",
+                )
+            return output_table
+
+        console = Console()
+        output_table = get_output_table(self.__name)
+        for row in self.__stream_values(
+            columns=",".join(columns_with_table_name),
+            from_statement=from_statement,
+            filters=filters,
+            itersize=page_size,
         ):
             output_table.add_row(*[str(data) for data in row])
+            if output_table.row_count == page_size:
+                console.print(output_table)
+                output_table = get_output_table(None)
 
-        console = Console()
-        console.print(output_table)
+        if output_table.row_count > 0 or output_table.title is not None:
+            console.print(output_table)
 
 
 class HtmlSidebar:
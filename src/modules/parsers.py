@@ -1,3 +1,4 @@
+import re
 from settings import Variables
 
 
@@ -27,7 +28,7 @@ class SqlParser:
             ):
                 sql_values += str(value) + ","
             else:
-                sql_values += "'" + value + "',"
+                sql_values += "'" + value.replace("'", "''") + "',"
         sql_values = sql_values[:-1:]
         match columns:
             case list():
@@ -39,3 +40,169 @@ class SqlParser:
                 return (
                     f"""INSERT INTO "{table_name}"({columns}) VALUES ({sql_values});"""
                 )
+
+    @staticmethod
+    def get_copy_query(table_name: str, columns: list[str] | str) -> str:
+        """
+        Get a copy query that reads the rows from the standard input.
+
+        Arguments:
+            table_name: str
+            columns: list[str] | str
+
+        Returns:
+            A sql copy query, in text format.
+        """
+
+        match columns:
+            case list():
+                return f"""COPY "{table_name}"({','.join(f'"{header}"' for header in columns)}) FROM STDIN;"""
+            case str():
+                return f"""COPY "{table_name}"({columns}) FROM STDIN;"""
+
+    @staticmethod
+    def get_psql_copy_command(table_name: str, columns: str, program: str) -> str:
+        """
+        Get a psql meta-command that reads the rows, in the text format of the copy queries,
+        from the output of a program run by the client.
+
+        Arguments:
+            table_name: str
+            columns: str
+                The columns, joined by commas and quotation marks.
+            program: str
+
+        Returns:
+            A psql \\copy command.
+        """
+
+        return f"""\\copy "{table_name}"({columns}) FROM PROGRAM '{program}'"""
+
+    @staticmethod
+    def get_copy_row(values: list[str | int]) -> str:
+        """
+        Get a row in the text format used by the copy queries.
+
+        Arguments:
+            values: list[str | int]
+
+        Returns:
+            A line with the values separated by tabs, escaping the special characters.
+        """
+
+        copy_values = []
+        for value in values:
+            if value == Variables.Sql.NULL_VALUE:
+                copy_values.append(Variables.Sql.COPY_NULL_VALUE)
+            else:
+                copy_values.append(
+                    str(value)
+                    .replace("\\", "\\\\")
+                    .replace("\t", "\\t")
+                    .replace("\n", "\\n")
+                    .replace("\r", "\\r")
+                )
+        return "\t".join(copy_values) + "\n"
+
+    @staticmethod
+    def get_index_name(table_name: str, column: str) -> str:
+        return f"{table_name}_{column}_idx"
+
+    @staticmethod
+    def get_create_index_query(table_name: str, column: str) -> str:
+        """
+        Get a query that creates an index on a column, if it doesn't exist yet.
+
+        Arguments:
+            table_name: str
+            column: str
+
+        Returns:
+            A sql create index query.
+        """
+
+        return f"""CREATE INDEX IF NOT EXISTS "{SqlParser.get_index_name(table_name, column)}" ON "{table_name}"("{column}");"""
+
+    @staticmethod
+    def get_drop_index_query(table_name: str, column: str) -> str:
+        """
+        Get a query that drops the index of a column, if it exists.
+
+        Arguments:
+            table_name: str
+            column: str
+
+        Returns:
+            A sql drop index query.
+        """
+
+        return f"""DROP INDEX IF EXISTS "{SqlParser.get_index_name(table_name, column)}";"""
+
+    @staticmethod
+    def get_foreign_key_name(referenced_table_name: str) -> str:
+        return f"{referenced_table_name}_fk"
+
+    @staticmethod
+    def get_add_foreign_keys_query(
+        table_name: str, referenced_table_names: list[str]
+    ) -> str:
+        """
+        Get a query that adds, in a single statement, the foreign keys
+        of the "id_<referenced table>" columns, as they are defined in the database schema.
+
+        Arguments:
+            table_name: str
+            referenced_table_names: list[str]
+
+        Returns:
+            A sql alter table query.
+        """
+
+        constraints = ",".join(
+            f"""ADD CONSTRAINT "{SqlParser.get_foreign_key_name(referenced_table_name)}" """
+            f"""FOREIGN KEY ("id_{referenced_table_name}") REFERENCES "{referenced_table_name}"(id) """
+            "MATCH FULL ON DELETE SET NULL ON UPDATE CASCADE"
+            for referenced_table_name in referenced_table_names
+        )
+        return f"""ALTER TABLE "{table_name}" {constraints};"""
+
+    @staticmethod
+    def get_drop_foreign_keys_query(
+        table_name: str, referenced_table_names: list[str]
+    ) -> str:
+        """
+        Get a query that drops, in a single statement, the foreign keys
+        of the "id_<referenced table>" columns, if they exist.
+
+        Arguments:
+            table_name: str
+            referenced_table_names: list[str]
+
+        Returns:
+            A sql alter table query.
+        """
+
+        constraints = ",".join(
+            f'DROP CONSTRAINT IF EXISTS "{SqlParser.get_foreign_key_name(referenced_table_name)}"'
+            for referenced_table_name in referenced_table_names
+        )
+        return f"""ALTER TABLE "{table_name}" {constraints};"""
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Get a query without the whitespace that doesn't change its meaning,
+        so the same query written with another indentation is equal to it.
+        The quoted literals and identifiers are kept as they are.
+
+        Arguments:
+            query: str
+
+        Returns:
+            The sql query, with each run of whitespace outside quotes replaced by a space.
+        """
+
+        return "".join(
+            part if part[:1] in ("'", '"') else re.sub(r"\s+", " ", part)
+            for part in re.split(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")", query)
+        ).strip()
@@ -0,0 +1,181 @@
+import json
+import os
+import sys
+from time import perf_counter
+from typing import Any, Callable
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class IngestProfiler:
+    """
+    A profiler of the stages of an insertion, measured with laps: the time since the last lap
+    is added to the stage that has just finished, so the stages don't overlap and their sum
+    is the time elapsed since the profiler started.
+    """
+
+    STAGES = (
+        "csv read",
+        "field split",
+        "continent resolution",
+        "dimension lookup",
+        "sql generation",
+        "db execution",
+    )
+
+    def __init__(self) -> None:
+        """
+        Private attributes:
+            seconds: dict[str, float]
+                The time spent in each stage.
+            start: float
+                When the profiler started.
+            last_lap: float
+                When the last lap ended.
+            rows: int
+                The number of CSV rows processed.
+        """
+
+        self.__seconds = {stage: 0.0 for stage in self.STAGES}
+        self.__start = self.__last_lap = perf_counter()
+        self.__rows = 0
+
+    def start(self) -> None:
+        self.__start = self.__last_lap = perf_counter()
+
+    def lap(self, stage: str) -> None:
+        """
+        Add the time elapsed since the last lap to a stage.
+
+        Arguments:
+            stage: str
+                One of IngestProfiler.STAGES.
+        """
+
+        now = perf_counter()
+        self.__seconds[stage] += now - self.__last_lap
+        self.__last_lap = now
+
+    def move(self, seconds: float, from_stage: str, to_stage: str) -> None:
+        """
+        Move time from a stage to another one, for a stage measured within another one.
+        """
+
+        self.__seconds[from_stage] -= seconds
+        self.__seconds[to_stage] += seconds
+
+    def timed(
+        self, stage: str, function: Callable[..., Any], within: str
+    ) -> Callable[..., Any]:
+        """
+        Wrap a function so the time spent in it is added to a stage.
+
+        Arguments:
+            stage: str
+            function: (...) -> Any
+            within: str
+                The stage during which the function is called,
+                to which the time until the call is added.
+
+        Returns:
+            A function with the same arguments and result.
+        """
+
+        def timed_function(*args, **kwargs) -> Any:
+            self.lap(within)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.lap(stage)
+
+        return timed_function
+
+    def add_rows(self, rows: int) -> None:
+        self.__rows += rows
+
+    @staticmethod
+    def get_peak_rss() -> int | None:
+        """
+        Get the maximum resident set size, in bytes, of this process or
+        any of its finished child processes (such as the CSV reader workers),
+        or None if it can't be known in this platform.
+        """
+
+        if resource is None:
+            return None
+        peak_rss = max(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        )
+        return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+    def get_summary(self, **details: Any) -> dict[str, Any]:
+        """
+        Get the time spent in each stage and how many rows per second were processed.
+
+        Optional arguments:
+            details: Any
+                Other values added to the summary, such as the settings of the insertion.
+
+        Returns:
+            A dictionary that can be serialized as JSON.
+        """
+
+        elapsed = self.__last_lap - self.__start
+        return {
+            **details,
+            "rows": self.__rows,
+            "seconds": elapsed,
+            "rows_per_second": self.__rows / max(elapsed, 1e-9),
+            "peak_rss_bytes": self.get_peak_rss(),
+            "stages": {
+                stage: {
+                    "seconds": seconds,
+                    "share": seconds / max(elapsed, 1e-9),
+                    "rows_per_second": self.__rows / seconds if seconds > 0 else None,
+                }
+                for stage, seconds in self.__seconds.items()
+            },
+        }
+
+    @staticmethod
+    def print_summary(summary: dict[str, Any]) -> None:
+        """
+        Print in console a summary obtained with get_summary.
+        """
+
+        peak_rss = summary["peak_rss_bytes"]
+        print(
+            f"ingest summary: {summary['rows']} rows in {summary['seconds']:.2f}s "
+            f"({summary['rows_per_second']:.0f} rows/s)"
+            + (f", peak RSS {peak_rss / 2**20:.1f} MiB" if peak_rss is not None else "")
+        )
+        for stage, stats in summary["stages"].items():
+            print(
+                f"  {stage}: {stats['seconds']:.2f}s ({stats['share']:.1%}"
+                + (
+                    f", {stats['rows_per_second']:.0f} rows/s)"
+                    if stats["rows_per_second"] is not None
+                    else ")"
+                )
+            )
+        if summary.get("writer_seconds") is not None:
+            print(f"  writer thread: {summary['writer_seconds']:.2f}s (in parallel)")
+        if summary.get("phases"):
+            print(
+                "phases: "
+                + ", ".join(
+                    f"{phase} {elapsed:.2f}s"
+                    for phase, elapsed in summary["phases"].items()
+                )
+            )
+
+    @staticmethod
+    def save_summary(summary: dict[str, Any], file: str) -> None:
+        temporal_file = f"{file}.tmp"
+        with open(temporal_file, "w", encoding="utf-8") as output:
+            json.dump(summary, output, indent=4)
+        os.replace(temporal_file, file)
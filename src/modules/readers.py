@@ -1,4 +1,15 @@
-from typing import Iterator
+import csv
+import gzip
+import io
+import os
+import zipfile
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import accumulate, islice
+from time import perf_counter
+from typing import IO, Iterable, Iterator
+from settings import CsvBackend
 
 
 class SqlReader:
@@ -53,27 +64,50 @@ class CsvReader:
     regardless of whether there are column values with characters equal to the delimiter.
     """
 
-    def __init__(self, file: str, delimiter: str = ",") -> None:
+    def __init__(
+        self, file: str, delimiter: str = ",", backend: CsvBackend = CsvBackend.PYTHON
+    ) -> None:
         """
         Arguments:
             file: str
-                The path to the location of .csv file
+                The path to the location of .csv file, which can also be compressed
+                in a .csv.zip or .csv.gz file. In that case it is decompressed while it is read,
+                without extracting it.
 
         Public attributes:
             delimiter: str
                 The delimiter with which the CSV file will be evaluated.
+            backend: CsvBackend
+                How the rows are split in columns. CsvBackend.PYTHON evaluates each character,
+                CsvBackend.CSV uses the csv module and CsvBackend.PANDAS uses pandas.read_csv.
+            pandas_chunk_size: int
+                The number of rows read by pandas at a time.
+            block_size: int
+                The approximate number of bytes read at a time when reading a range of bytes.
 
         Private attributes:
             file
+            compression: str
+                The format of the compressed file, or an empty string if it isn't compressed.
+            read_time: float
+                The seconds spent reading (and decompressing) blocks of lines in this process,
+                without splitting them in columns.
         """
 
         format = "csv"
         file_splitted = file.split(".")
+        self.__compression = ""
+        if file_splitted[-1] in ("zip", "gz"):
+            self.__compression = file_splitted.pop()
         assert file_splitted[-1] == format, ValueError(
-            f'Error. The file must be in ".{format}" format'
+            f'Error. The file must be in ".{format}", ".{format}.zip" or ".{format}.gz" format'
         )
         self.delimiter = delimiter
+        self.backend = backend
+        self.pandas_chunk_size = 1 << 16
+        self.block_size = 1 << 20
         self.__file = file
+        self.__read_time = 0.0
         self.__headers = self.get_headers() or []
         if self.__headers is None:
             assert "The file hasn't headers"
@@ -110,6 +144,23 @@ class CsvReader:
                 columns.append(last_line)
                 last_line = ""
         columns.append(last_line)
+        return self.__filter_columns(columns, filtered_columns)
+
+    def __filter_columns(
+        self, columns: list[str], filtered_columns: list[str | int] | slice
+    ) -> list[str]:
+        """
+        Get the filtered columns of a row.
+
+        Arguments:
+            columns: list[str]
+                All the columns of the row.
+            filtered_columns: list[str | int] | slice
+
+        Returns:
+            A list with the value of each filtered column.
+        """
+
         match filtered_columns:
             case slice():
                 return columns[filtered_columns]
@@ -129,6 +180,151 @@ class CsvReader:
                     f"The data type {type(filtered_columns)} of filtered columns isn't valid"
                 )
 
+    def __parse_python(
+        self, lines: Iterable[str], filtered_columns: list[str | int] | slice
+    ) -> Iterator[list[str]]:
+        for line in lines:
+            columns = self.__get_columns(line, filtered_columns)
+            if columns is None:
+                continue
+            yield columns
+
+    def __parse_csv(
+        self, lines: Iterable[str], filtered_columns: list[str | int] | slice
+    ) -> Iterator[list[str]]:
+        for columns in csv.reader(lines, delimiter=self.delimiter):
+            if len(columns) == 0 or (len(columns) == 1 and not columns[0].strip()):
+                continue
+            yield self.__filter_columns(columns, filtered_columns)
+
+    def __parse_pandas(
+        self, file: IO, filtered_columns: list[str | int] | slice
+    ) -> Iterator[list[str]]:
+        import pandas as pd
+
+        try:
+            chunks = pd.read_csv(
+                file,
+                sep=self.delimiter,
+                header=None,
+                dtype=str,
+                keep_default_na=False,
+                chunksize=self.pandas_chunk_size,
+            )
+        except pd.errors.EmptyDataError:
+            return
+        for chunk in chunks:
+            yield from chunk.iloc[:, filtered_columns].to_numpy().tolist()
+
+    def __parse(
+        self, file: IO, filtered_columns: list[str | int] | slice
+    ) -> Iterator[list[str]]:
+        """
+        Get the rows of an opened CSV file, from its current position, using the backend of the reader.
+
+        Arguments:
+            file: IO
+                A CSV file opened in text mode.
+            filtered_columns: list[int] | slice
+
+        Returns:
+            A csv row iterator, which skips the blank lines, like every backend.
+        """
+
+        match self.backend:
+            case CsvBackend.PYTHON:
+                return self.__parse_python(file, filtered_columns)
+            case CsvBackend.CSV:
+                return self.__parse_csv(file, filtered_columns)
+            case CsvBackend.PANDAS:
+                return self.__parse_pandas(file, filtered_columns)
+            case _:
+                raise ValueError(f"{self.backend} isn't a valid backend")
+
+    def __check_filtered_columns(
+        self, filtered_columns: slice | list[int | str]
+    ) -> None:
+        """
+        Check that the filtered columns exist, replacing the names of the headers by their index.
+
+        Arguments:
+            filtered_columns: slice | list[int | str]
+        """
+
+        if isinstance(filtered_columns, list):
+            for index, column in enumerate(filtered_columns):
+                match column:
+                    case int():
+                        assert 0 <= column < len(self.__headers), ValueError(
+                            f"{column} isn't in the columns size range"
+                        )
+                    case str():
+                        filtered_columns[index] = self.__headers.index(column)
+                    case _:
+                        raise ValueError(f"{column} isn't a valid value")
+
+    def __open(self) -> IO[bytes]:
+        """
+        Open the CSV file in binary mode, decompressing it while it is read if it is compressed.
+        A .zip file must contain the .csv file with the same name or, otherwise, a single .csv file.
+        """
+
+        match self.__compression:
+            case "zip":
+                with zipfile.ZipFile(self.__file) as zip_file:
+                    names = [name for name in zip_file.namelist() if name.endswith(".csv")]
+                    name = os.path.basename(self.__file)[: -len(".zip")]
+                    if name not in names:
+                        assert len(names) == 1, ValueError(
+                            f"{self.__file} must contain a single .csv file"
+                        )
+                        name = names[0]
+                    return zip_file.open(name)
+            case "gz":
+                return gzip.open(self.__file)
+            case _:
+                return open(self.__file, "rb")
+
+    def __open_text(self) -> IO[str]:
+        return io.TextIOWrapper(self.__open(), encoding="utf-8", newline="")
+
+    def __parse_lines(
+        self,
+        lines: list[bytes],
+        start: int,
+        filtered_columns: list[str | int] | slice,
+        with_offsets: bool,
+    ) -> Iterator[list[str]] | Iterator[tuple[list[str], int]]:
+        """
+        Parse complete lines of the CSV file.
+
+        Arguments:
+            lines: list[bytes]
+            start: int
+                The byte where the first line begins.
+            filtered_columns: list[int] | slice
+            with_offsets: bool
+                Whether each row is returned along with the byte where the next row begins.
+        """
+
+        rows = self.__parse(
+            io.StringIO(b"".join(lines).decode("utf-8"), newline=""), filtered_columns
+        )
+        if with_offsets:
+            ends = (
+                start + end
+                for line, end in zip(lines, accumulate(map(len, lines)))
+                if line.strip()
+            )
+            return zip(rows, ends, strict=True)
+        return rows
+
+    def get_read_time(self) -> float:
+        return self.__read_time
+
+    def is_compressed(self) -> bool:
+        return self.__compression != ""
+
     def get_headers(
         self, filtered_headers: slice | list[int | str] = slice(0, None)
     ) -> list[str] | None:
@@ -143,11 +339,8 @@ class CsvReader:
             A list with the name of each header.
         """
 
-        return list(
-            self.get_rows(
-                row_limit=1, filtered_columns=filtered_headers, with_headers=True
-            )
-        )[0]
+        with self.__open_text() as file:
+            return next(self.__parse_python(file, filtered_headers), None)
 
     def get_rows(
         self,
@@ -168,25 +361,288 @@ class CsvReader:
         Returns:
             A csv row iterator.
         """
-        if isinstance(filtered_columns, list):
-            for index, column in enumerate(filtered_columns):
-                match column:
-                    case int():
-                        assert 0 <= column < len(self.__headers), ValueError(
-                            f"{column} isn't in the columns size range"
-                        )
-                    case str():
-                        filtered_columns[index] = self.__headers.index(column)
-                    case _:
-                        raise ValueError(f"{column} isn't a valid value")
+        self.__check_filtered_columns(filtered_columns)
 
-        with open(self.__file, encoding="utf-8") as file:
+        with self.__open_text() as file:
             if not with_headers:
                 file.readline()
-            num_row = 0
-            while num_row != row_limit:
-                line = self.__get_columns(file.readline(), filtered_columns)
-                if line is None:
+            yield from islice(
+                self.__parse(file, filtered_columns),
+                row_limit if row_limit >= 0 else None,
+            )
+
+    def get_rows_in_range(
+        self,
+        start: int = -1,
+        end: int = -1,
+        filtered_columns: slice | list[int | str] = slice(0, None),
+        with_offsets: bool = False,
+    ) -> Iterator[list[str]] | Iterator[tuple[list[str], int]]:
+        """
+        Get the rows that begin within a range of bytes of the CSV file.
+        Each row is assumed to be in a single line.
+
+        Optional arguments:
+            start: int
+                The byte where the range begins. It must be the beginning of a row.
+                By default the first row after the headers.
+            end: int
+                The byte where the range ends, not included. By default the end of the file.
+            filtered_columns: slice | list[int | str]
+                Columns for each row. By default they are all.
+            with_offsets: bool
+                Whether each row is returned along with the byte where the next row begins.
+
+        Returns:
+            A csv row iterator.
+        """
+
+        self.__check_filtered_columns(filtered_columns)
+
+        with self.__open() as file:
+            if start < 0:
+                file.readline()
+                start = file.tell()
+            file.seek(start)
+            position = start
+            while end < 0 or position < end:
+                start_time = perf_counter()
+                lines = file.readlines(
+                    self.block_size if end < 0 else min(self.block_size, end - position)
+                )
+                self.__read_time += perf_counter() - start_time
+                if not lines:
+                    break
+                offsets = list(accumulate(map(len, lines), initial=position))
+                if end >= 0 and offsets[-1] > end:
+                    lines = lines[: bisect_left(offsets, end)]
+                    offsets = offsets[: len(lines) + 1]
+                yield from self.__parse_lines(
+                    lines, position, filtered_columns, with_offsets
+                )
+                position = offsets[-1]
+
+    def get_rows_in_block(
+        self,
+        content: bytes,
+        start: int,
+        filtered_columns: slice | list[int | str] = slice(0, None),
+        with_offsets: bool = False,
+    ) -> Iterator[list[str]] | Iterator[tuple[list[str], int]]:
+        """
+        Get the rows of a block of complete lines already read from the CSV file.
+
+        Arguments:
+            content: bytes
+                The lines of the block.
+            start: int
+                The byte of the CSV file where the block begins.
+
+        Optional arguments:
+            filtered_columns: slice | list[int | str]
+                Columns for each row. By default they are all.
+            with_offsets: bool
+                Whether each row is returned along with the byte where the next row begins.
+
+        Returns:
+            A csv row iterator.
+        """
+
+        self.__check_filtered_columns(filtered_columns)
+        if not content:
+            return iter(())
+        return self.__parse_lines(
+            content.splitlines(keepends=True), start, filtered_columns, with_offsets
+        )
+
+    def get_blocks(self, batch_size: int, start: int = -1) -> Iterator[tuple[int, bytes]]:
+        """
+        Read the rows of the CSV file in blocks of complete lines.
+
+        Arguments:
+            batch_size: int
+                The approximate number of bytes of each block.
+
+        Optional arguments:
+            start: int
+                The byte where the first block begins. By default the first row after the headers.
+
+        Returns:
+            An iterator of tuples with the byte where each block begins and its lines.
+        """
+
+        with self.__open() as file:
+            if start < 0:
+                file.readline()
+                start = file.tell()
+            file.seek(start)
+            while True:
+                start_time = perf_counter()
+                lines = file.readlines(batch_size)
+                self.__read_time += perf_counter() - start_time
+                if not lines:
                     break
-                yield line
-                num_row += 1
+                content = b"".join(lines)
+                yield start, content
+                start += len(content)
+
+    def get_byte_ranges(
+        self, batch_size: int, start: int = -1
+    ) -> list[tuple[int, int]]:
+        """
+        Split the rows of the CSV file in ranges of bytes.
+
+        Arguments:
+            batch_size: int
+                The approximate number of bytes of each range.
+
+        Optional arguments:
+            start: int
+                The byte where the first range begins. By default the first row after the headers.
+
+        Returns:
+            A list of (start, end) tuples, where each one begins and ends on a new line.
+        """
+
+        assert not self.is_compressed(), ValueError(
+            f"{self.__file} is compressed, so it can't be read from an arbitrary byte"
+        )
+        size = os.path.getsize(self.__file)
+        with open(self.__file, "rb") as file:
+            if start < 0:
+                file.readline()
+                start = file.tell()
+            boundaries = [start]
+            while boundaries[-1] < size:
+                file.seek(max(boundaries[-1] + batch_size - 1, boundaries[-1]))
+                file.readline()
+                boundaries.append(min(file.tell(), size))
+        return list(zip(boundaries[:-1], boundaries[1:]))
+
+    def get_row_batches(
+        self,
+        row_limit: int = -1,
+        filtered_columns: slice | list[int | str] = slice(0, None),
+        workers: int | None = None,
+        batch_size: int = 1 << 23,
+        ordered: bool = True,
+        start: int = -1,
+        with_offsets: bool = False,
+    ) -> Iterator[list[list[str]]] | Iterator[list[tuple[list[str], int]]]:
+        """
+        Get the rows from the CSV file in batches, parsing them in several processes.
+
+        The file is split in ranges of bytes aligned to the new lines
+        and each one is parsed by a process of the pool. Only twice as many
+        ranges as workers are parsed at the same time, so the memory used
+        does not depend on the size of the file. A compressed file is decompressed
+        in this process, which sends each block of lines to the pool instead.
+
+        Optional arguments:
+            row_limit: int
+                The number of rows. By default they are all.
+            filtered_columns: slice | list[int | str]
+                Columns for each row. By default they are all.
+            workers: int | None
+                The number of processes. By default the number of CPUs.
+            batch_size: int
+                The approximate number of bytes parsed in each batch. By default 8 MiB.
+            ordered: bool
+                Whether the batches are returned in the same order as in the file.
+                Otherwise they are returned as soon as they are parsed, which is faster.
+            start: int
+                The byte where the first row begins. By default the first row after the headers.
+            with_offsets: bool
+                Whether each row is returned along with the byte where the next row begins.
+
+        Returns:
+            An iterator of lists of csv rows.
+        """
+
+        self.__check_filtered_columns(filtered_columns)
+        workers = workers or os.cpu_count() or 1
+        if self.is_compressed():
+            function, batches = _parse_block, self.get_blocks(batch_size, start)
+        else:
+            function = _parse_byte_range
+            batches = iter(self.get_byte_ranges(batch_size, start))
+        num_row = 0
+
+        with ProcessPoolExecutor(workers) as executor:
+
+            def submit() -> Future | None:
+                if (batch := next(batches, None)) is None:
+                    return None
+                return executor.submit(
+                    function,
+                    self.__file,
+                    self.delimiter,
+                    self.backend,
+                    *batch,
+                    filtered_columns,
+                    with_offsets,
+                )
+
+            pending = deque(
+                future for _ in range(workers * 2) if (future := submit()) is not None
+            )
+            try:
+                while pending and num_row != row_limit:
+                    if ordered:
+                        batch = pending.popleft().result()
+                    else:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        future = done.pop()
+                        pending.remove(future)
+                        batch = future.result()
+
+                    if (future := submit()) is not None:
+                        pending.append(future)
+
+                    if row_limit >= 0:
+                        batch = batch[: row_limit - num_row]
+                    num_row += len(batch)
+                    yield batch
+            finally:
+                for future in pending:
+                    future.cancel()
+
+
+def _parse_byte_range(
+    file: str,
+    delimiter: str,
+    backend: CsvBackend,
+    start: int,
+    end: int,
+    filtered_columns: slice | list[int | str],
+    with_offsets: bool,
+) -> list[list[str]] | list[tuple[list[str], int]]:
+    """
+    Parse a range of bytes of a CSV file in a worker process.
+    """
+
+    return list(
+        CsvReader(file, delimiter, backend).get_rows_in_range(
+            start, end, filtered_columns, with_offsets
+        )
+    )
+
+
+def _parse_block(
+    file: str,
+    delimiter: str,
+    backend: CsvBackend,
+    start: int,
+    content: bytes,
+    filtered_columns: slice | list[int | str],
+    with_offsets: bool,
+) -> list[list[str]] | list[tuple[list[str], int]]:
+    """
+    Parse a block of lines of a CSV file in a worker process.
+    """
+
+    return list(
+        CsvReader(file, delimiter, backend).get_rows_in_block(
+            content, start, filtered_columns, with_offsets
+        )
+    )
@@ -1,13 +1,33 @@
-import zipfile
+import gzip
+import json
+import os
+from copy import copy
 from os import path
-from pycountry_convert import (
-    country_alpha2_to_continent_code,
-    country_alpha3_to_country_alpha2,
-)
+from time import perf_counter
+from typing import Any, Iterator
+from modules.encoders import ColumnarEncoder
 from modules.executors import SqlExecutor
-from modules.objects import SqlTable
+from modules.loaders import (
+    CopyLoader,
+    ExportLoader,
+    LoadPipeline,
+    QueryLoader,
+    SqlLoader,
+    StagingLoader,
+)
+from modules.objects import CountryResolver, SqlTable
+from modules.profilers import IngestProfiler
 from modules.readers import CsvReader
-from settings import Connection, Files, TableReference, Variables
+from settings import (
+    Connection,
+    CsvBackend,
+    Encoding,
+    Files,
+    Ingest,
+    LoadMode,
+    TableReference,
+    Variables,
+)
 
 
 def initialize_tables() -> None:
@@ -30,42 +50,64 @@ def initialize_tables() -> None:
             ],
             identifier="id",
             has_incrementable_id=True,
+            is_fact_table=True,
+            indexed_columns=[
+                "id_OficinaRegistro",
+                "id_NivelAcademico",
+                "id_Especializacion",
+                "id_Genero",
+            ],
+            referenced_tables=[
+                "OficinaRegistro",
+                "NivelAcademico",
+                "Especializacion",
+                "Genero",
+            ],
         ),
         TableReference.ESPECIALIZACION: SqlTable(
             name="Especializacion",
             columns=["id", "nombre", "id_AreaConocimiento"],
             identifier="nombre",
             has_incrementable_id=True,
+            indexed_columns=["id_AreaConocimiento", "nombre"],
+            referenced_tables=["AreaConocimiento"],
         ),
         TableReference.AREA_CONOCIMIENTO: SqlTable(
             name="AreaConocimiento",
             columns=["id", "nombre"],
             identifier="nombre",
             has_incrementable_id=True,
+            indexed_columns=["nombre"],
         ),
         TableReference.NIVEL_ACADEMICO: SqlTable(
             name="NivelAcademico",
             columns=["id", "nombre"],
             identifier="nombre",
             has_incrementable_id=True,
+            indexed_columns=["nombre"],
         ),
         TableReference.PAIS: SqlTable(
             name="Pais",
             columns=["id", "id_Continente", "codigo", "nombre"],
             identifier="codigo",
             has_incrementable_id=True,
+            indexed_columns=["id_Continente"],
+            referenced_tables=["Continente"],
         ),
         TableReference.CONTINENTE: SqlTable(
             name="Continente",
             columns=["id", "codigo", "nombre"],
             identifier="codigo",
             has_incrementable_id=True,
+            indexed_columns=["nombre"],
         ),
         TableReference.OFICINA_REGISTRO: SqlTable(
             name="OficinaRegistro",
             columns=["id", "id_Pais", "nombre"],
             identifier="nombre",
             has_incrementable_id=True,
+            indexed_columns=["id_Pais"],
+            referenced_tables=["Pais"],
         ),
         TableReference.GENERO: SqlTable(
             name="Genero",
@@ -76,36 +118,89 @@ def initialize_tables() -> None:
     }
 
 
-def data_insertion() -> None:
+def data_insertion(
+    load_mode: LoadMode = Ingest.LOAD_MODE,
+    chunk_size: int = Ingest.CHUNK_SIZE,
+    reader_workers: int = Ingest.READER_WORKERS,
+    csv_backend: CsvBackend = Ingest.CSV_BACKEND,
+    resume: bool = Ingest.RESUME,
+    append: bool = Ingest.APPEND,
+    build_indexes: bool = Ingest.BUILD_INDEXES,
+    fast_load: bool = Ingest.FAST_LOAD,
+    compact: bool = Ingest.COMPACT,
+    pipeline_batches: int = Ingest.PIPELINE_BATCHES,
+    encoding: Encoding = Ingest.ENCODING,
+    profile: bool = Ingest.PROFILE,
+    file: str = Files.CSV,
+    export_directory: str = Files.EXPORT,
+) -> dict[str, Any]:
     """
     Insert the CSV rows to the database.
 
-    First we verify that all tables are empty
-    and then initialize the CSV reader, the SQL executor and the continents,
-    which are not in the CSV file.
+    First we verify that all tables are empty, unless the insertion is resumed
+    from its checkpoint or the rows are appended, and then initialize
+    the CSV reader, the SQL executor and the loader.
 
-    Then we read and select the columns that we will use for each row,
-    we obtain the continent using the iso code of the country and we
-    perform the insertion in each table sorted by how many relations
-    it has (from smallest to largest), saving each query in a queue
-    (which is being simulated with a simple string).
+    Then we read each row, resolve the continent of its country and normalize it
+    into each table, sorted by how many relations it has (from smallest to largest),
+    queuing the new rows in the loader, which is flushed after each chunk.
 
-    At the end we connect to the database and execute the queue.
+    At the end the indexes and the summary are built and a profile of the stages is printed.
+    The load modes and options are explained in the README.
 
     --------------------------------------------
 
     Insertar las filas del CSV a la base de datos.
 
-    Primero verificamos que todas las tablas estén vacías
-    para luego inicializar el lector de CSV, el ejecutor SQL y los continentes,
-    los cuales no están en el archivo CSV.
+    Primero verificamos que todas las tablas estén vacías, a menos que se reanude
+    la inserción desde su punto de control o que se agreguen las filas, para luego
+    inicializar el lector de CSV, el ejecutor SQL y el cargador.
+
+    Luego se lee cada fila, se resuelve el continente de su país y se normaliza
+    en cada tabla, ordenadas según cuántas relaciones tenga (de menor a mayor),
+    guardando las filas nuevas en el cargador, el cual se vacía después de cada bloque.
 
-    Luego se leen y se seleccionan las columnas que usaremos por cada fila,
-    obtenemos el continente mediante el código iso del país y realizamos
-    la inserción en cada tabla ordenadas según cuántas relaciones tenga (de menor a mayor),
-    guardando cada consulta en una cola (la cual está siendo simulada con un simple string)
+    Al final se construyen los índices y el resumen, y se muestra el perfil de cada etapa.
+    Los modos de carga y las opciones se explican en el README.
 
-    Al final se conecta a la base de datos y se ejecuta la cola.
+    Optional arguments:
+        load_mode: LoadMode
+            How the rows are sent to the database. By default Ingest.LOAD_MODE.
+        chunk_size: int
+            The CSV rows sent in each transaction, where 0 sends all of them in one.
+            By default Ingest.CHUNK_SIZE.
+        reader_workers: int
+            The processes that parse the CSV file. By default Ingest.READER_WORKERS.
+        csv_backend: CsvBackend
+            How the CSV rows are split in columns. By default Ingest.CSV_BACKEND.
+        resume: bool
+            Whether the insertion continues from the last checkpoint. By default Ingest.RESUME.
+        append: bool
+            Whether the rows are added to the ones in the database. By default Ingest.APPEND.
+        build_indexes: bool
+            Whether the indexes are built and the tables analyzed. By default Ingest.BUILD_INDEXES.
+        fast_load: bool
+            Whether the foreign keys and indexes are dropped during the load.
+            By default Ingest.FAST_LOAD.
+        compact: bool
+            Whether the rows with the same demographic description are folded into one.
+            By default Ingest.COMPACT.
+        pipeline_batches: int
+            The chunks that can wait for the writer thread, where 0 disables it.
+            By default Ingest.PIPELINE_BATCHES.
+        encoding: Encoding
+            How the CSV rows are normalized. By default Ingest.ENCODING.
+        profile: bool
+            Whether every stage is timed apart and the summary saved in Files.PROFILE.
+            By default Ingest.PROFILE.
+        file: str
+            The path to the location of the .csv file. By default Files.CSV.
+        export_directory: str
+            The directory where the tables are saved with LoadMode.EXPORT.
+            By default Files.EXPORT.
+
+    Returns:
+        The summary of the insertion, as printed at the end.
     """
 
     def check_data(reference: TableReference) -> None:
@@ -113,9 +208,6 @@ def data_insertion() -> None:
             len(Variables.Sql.TABLES[reference].get_values(["limit 1"]) or []) == 0
         ), "The tables in the database aren't empty."
 
-    TableReference.for_each(check_data)
-
-    csv_reader = CsvReader(Files.CSV)
     sql_executor = SqlExecutor(
         database=Connection.DATABASE,
         user=Connection.USER,
@@ -123,126 +215,560 @@ def data_insertion() -> None:
         host=Connection.HOST,
         port=Connection.PORT,
     )
-    continents = {
-        "NA": "North America",
-        "SA": "South America",
-        "AS": "Asia",
-        "OC": "Australia",
-        "AF": "Africa",
-        "EU": "Europe",
-    }
-    query = ""
-    print("reading and parsing the csv file...")
-    for row in csv_reader.get_rows():
-
-        (
-            nombre_pais,
-            codigo_iso_pais,
-            oficina_registro,
-            _,
-            edad,
-            area_conocimiento,
-            especializacion,
-            nivel_academico,
-            _,
-            genero,
-            _,
-            estatura,
-            _,
-            cantidad_personas,
-        ) = row
-
-        if edad == "-1":
-            edad = Variables.Sql.NULL_VALUE
-
-        if estatura == "-1":
-            estatura = Variables.Sql.NULL_VALUE
-
-        if (
-            codigo_iso_pais in ["DDD"]
-            or codigo_iso_pais in Variables.Sql.INVALID_VALUES
-        ):
-            codigo_iso_continente = Variables.Sql.NULL_VALUE
-        elif codigo_iso_pais in ["SX"]:
-            codigo_iso_continente = "NA"
-            codigo_iso_pais = "SXM"
-        else:
-            codigo_iso_continente = country_alpha2_to_continent_code(
-                country_alpha3_to_country_alpha2(codigo_iso_pais)
-            )
 
-        query += Variables.Sql.TABLES[TableReference.CONTINENTE].insert_values(
-            [
-                codigo_iso_continente,
-                continents.get(codigo_iso_continente, Variables.Sql.NULL_VALUE),
-            ]
-        )
+    exporting = load_mode == LoadMode.EXPORT
+    assert not (exporting and append), (
+        "The rows can't be appended with LoadMode.EXPORT, "
+        "since the rows already in the database wouldn't be exported."
+    )
+    offset, num_rows = -1, 0
+    if (
+        resume
+        and not exporting
+        and (checkpoint := restore_checkpoint(sql_executor)) is not None
+    ):
+        file, offset, num_rows = checkpoint
+        print(f"resuming from the row {num_rows}...")
+    elif append:
+        print("loading the records already in the database...")
+        for reference in TableReference:
+            Variables.Sql.TABLES[reference].load_records()
+    elif not exporting:
+        TableReference.for_each(check_data)
 
-        query += Variables.Sql.TABLES[TableReference.PAIS].insert_values(
-            [
-                Variables.Sql.TABLES[
-                    TableReference.CONTINENTE
-                ].get_id_by_identifier_value(codigo_iso_continente),
-                codigo_iso_pais,
-                nombre_pais,
-            ]
-        )
+    phases: dict[str, float] = {}
+    fast_load = fast_load and not exporting
+    if fast_load:
+        start = perf_counter()
+        drop_constraints(sql_executor)
+        phases["drop constraints"] = perf_counter() - start
 
-        query += Variables.Sql.TABLES[TableReference.OFICINA_REGISTRO].insert_values(
-            [
-                Variables.Sql.TABLES[TableReference.PAIS].get_id_by_identifier_value(
-                    codigo_iso_pais
-                ),
-                oficina_registro,
-            ]
-        )
+    try:
+        start = perf_counter()
+        csv_reader = CsvReader(file, backend=csv_backend)
+        country_resolver = get_country_resolver()
+        known_countries = country_resolver.get_size()
 
-        query += Variables.Sql.TABLES[TableReference.NIVEL_ACADEMICO].insert_values(
-            [nivel_academico]
+        profiler = IngestProfiler()
+        # The time spent resolving the countries and queuing the rows of each table
+        # is only split from the dimension lookup when the insertion is profiled,
+        # since it adds a call per value. The wrapper is set on a copy of the resolver,
+        # so the original one isn't modified.
+        profiled = profile and load_mode != LoadMode.STAGING
+        resolver = country_resolver
+        if profiled:
+            resolver = copy(country_resolver)
+            resolver.resolve = profiler.timed(
+                "continent resolution",
+                country_resolver.resolve,
+                within="dimension lookup",
+            )
+        loader = get_loader(load_mode, sql_executor, resolver, export_directory)
+        if profiled:
+            loader.add_values = profiler.timed(
+                "sql generation", loader.add_values, within="dimension lookup"
+            )
+        # Without the wrappers, normalizing a row is counted as a dimension lookup.
+        row_stage = (
+            "sql generation" if load_mode == LoadMode.STAGING else "dimension lookup"
         )
 
-        query += Variables.Sql.TABLES[TableReference.AREA_CONOCIMIENTO].insert_values(
-            [area_conocimiento]
+        fact_table = Variables.Sql.TABLES[TableReference.DESCRIPCION_DEMOGRAFICA]
+        compact = compact and load_mode != LoadMode.STAGING
+        fact_table.set_compaction(compact)
+        read_rows, compacted_rows = num_rows, 0
+
+        encoder = None
+        if encoding == Encoding.COLUMNAR and load_mode != LoadMode.STAGING:
+            encoder = ColumnarEncoder(resolver)
+
+        pipeline = None
+        if chunk_size > 0 and pipeline_batches > 0:
+            pipeline = LoadPipeline(pipeline_batches)
+
+        def flush_loader(offset: int | None = None) -> None:
+            nonlocal compacted_rows
+            profiler.lap("db execution")
+            if encoder is not None:
+                encoder.encode(loader)
+                profiler.lap("dimension lookup")
+            for values in fact_table.pop_compacted_values():
+                loader.add_values(TableReference.DESCRIPCION_DEMOGRAFICA, values)
+                compacted_rows += 1
+            profiler.lap("sql generation")
+
+            # The state is taken once every row of the chunk is queued, so it includes
+            # the ids assigned when the rows are encoded or compacted.
+            checkpoint = None
+            if offset is not None and load_mode not in (
+                LoadMode.STAGING,
+                LoadMode.EXPORT,
+            ):
+                checkpoint = get_checkpoint(file, offset, num_rows)
+
+            def on_loaded(rows: int = num_rows) -> None:
+                if checkpoint is not None:
+                    save_checkpoint(checkpoint)
+                print(f"{rows} rows loaded")
+
+            if pipeline is None:
+                loader.flush()
+                on_loaded()
+            else:
+                pipeline.submit(loader.detach(), on_loaded)
+            profiler.lap("db execution")
+
+        print("reading and parsing the csv file...")
+        profiler.start()
+        try:
+            for row, offset in get_csv_rows(csv_reader, reader_workers, offset):
+                profiler.lap("field split")
+                if encoder is not None:
+                    if encoder.add_row(row):
+                        encoder.encode(loader)
+                    profiler.lap("dimension lookup")
+                else:
+                    loader.add_row(row)
+                    profiler.lap(row_stage)
+                num_rows += 1
+                if chunk_size > 0 and num_rows % chunk_size == 0:
+                    flush_loader(offset)
+
+            profiler.lap("field split")
+            flush_loader()
+        except BaseException as error:
+            if pipeline is not None:
+                # The writer is still stopped, but its error is only reported,
+                # so it doesn't hide the one that stopped the load.
+                try:
+                    pipeline.close()
+                except Exception as writer_error:
+                    if writer_error is not error:
+                        print(f"the writer thread also failed: {writer_error!r}")
+            raise
+        if pipeline is not None:
+            pipeline.close()
+            profiler.lap("db execution")
+        profiler.move(csv_reader.get_read_time(), "field split", "csv read")
+
+        if not exporting and path.exists(Files.CHECKPOINT):
+            os.remove(Files.CHECKPOINT)
+        if country_resolver.get_size() > known_countries:
+            # The countries that weren't known when the resolver was built
+            # are kept for the next insertions.
+            country_resolver.save(Files.COUNTRIES)
+        read_rows = num_rows - read_rows
+        profiler.add_rows(read_rows)
+        if compact:
+            print(
+                f"{read_rows} rows compacted into {compacted_rows} "
+                f"({read_rows / max(compacted_rows, 1):.2f}x)"
+            )
+        phases["load"] = perf_counter() - start
+    except Exception:
+        if fast_load:
+            # The chunks already committed are kept, so the tables must not be left
+            # without their foreign keys and indexes. A failure while restoring them
+            # is only reported, so the error of the load is the one raised.
+            print("the load failed, restoring the foreign keys and indexes...")
+            try:
+                index_tables(sql_executor)
+                add_foreign_keys(sql_executor)
+            except Exception as error:
+                print(f"the foreign keys and indexes couldn't be restored: {error!r}")
+        raise
+    except BaseException:
+        if fast_load:
+            # An interruption must stop the process right away, instead of building
+            # the indexes and validating the foreign keys of every loaded row.
+            print(
+                "the load was interrupted, the foreign keys and indexes weren't restored; "
+                "resuming it with a fast load creates them again."
+            )
+        raise
+
+    if exporting:
+        print(f"tables exported to {export_directory}")
+    else:
+        if build_indexes or fast_load:
+            start = perf_counter()
+            index_tables(sql_executor)
+            phases["indexes and analyze"] = perf_counter() - start
+
+        if fast_load:
+            start = perf_counter()
+            add_foreign_keys(sql_executor)
+            phases["foreign keys"] = perf_counter() - start
+
+        start = perf_counter()
+        summarize_tables(sql_executor)
+        phases["summary"] = perf_counter() - start
+        SqlExecutor.invalidate_cache()
+
+    summary = profiler.get_summary(
+        file=file,
+        load_mode=load_mode.name.lower(),
+        encoding=encoding.name.lower(),
+        csv_backend=csv_backend.name.lower(),
+        reader_workers=reader_workers,
+        chunk_size=chunk_size,
+        writer_seconds=pipeline.get_flush_time() if pipeline is not None else None,
+        phases=phases,
+    )
+    IngestProfiler.print_summary(summary)
+    if profile:
+        IngestProfiler.save_summary(summary, Files.PROFILE)
+    return summary
+
+
+def index_tables(sql_executor: SqlExecutor, rebuild: bool = False) -> None:
+    """
+    Create the indexes of each table that don't exist yet and run ANALYZE on it,
+    so the query planner knows the distribution of the loaded rows.
+    Building the indexes after the rows are loaded is faster than updating them in each insertion.
+
+    Arguments:
+        sql_executor: SqlExecutor
+
+    Optional arguments:
+        rebuild: bool
+            Whether the existing indexes are dropped and created again. By default False.
+    """
+
+    print("building the indexes...")
+    for reference in Variables.Sql.INSERTION_ORDER:
+        table = Variables.Sql.TABLES[reference]
+        queries = table.get_index_queries()
+        if rebuild:
+            queries = table.get_drop_index_queries() + queries
+
+        start = perf_counter()
+        sql_executor.run_query("".join(queries + [table.get_analyze_query()]))
+        elapsed = perf_counter() - start
+
+        print(
+            f"{table.get_name()}: {len(table.get_index_queries())} indexes "
+            f"and analyze in {elapsed:.2f}s"
         )
 
-        query += Variables.Sql.TABLES[TableReference.ESPECIALIZACION].insert_values(
-            [
-                especializacion,
-                Variables.Sql.TABLES[
-                    TableReference.AREA_CONOCIMIENTO
-                ].get_id_by_identifier_value(area_conocimiento),
-            ]
+
+def summarize_tables(sql_executor: SqlExecutor, refresh: bool = True) -> None:
+    """
+    Build the summary of the demographic descriptions, a materialized view with
+    the number of people and of rows of each combination of country, continent,
+    registry office, gender, knowledge area, specialization, academic level and age,
+    from which the views read instead of joining and aggregating all the rows.
+
+    The dimensions are joined with LEFT JOIN, so a row whose foreign key is null is kept
+    with a null name, and the views that need that dimension filter those rows out.
+
+    Arguments:
+        sql_executor: SqlExecutor
+
+    Optional arguments:
+        refresh: bool
+            Whether the summary is computed again if it already exists. By default True.
+    """
+
+    print("building the summary...")
+    sql_executor.run_query(
+        f"""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS "{Variables.Sql.SUMMARY_TABLE}" AS
+        SELECT
+            c.codigo as codigo_continente,
+            c.nombre as continente,
+            ps.codigo as codigo_pais,
+            ps.nombre as pais,
+            ofr.nombre as oficina_registro,
+            g.nombre as genero,
+            ac.nombre as area_conocimiento,
+            esp.nombre as especializacion,
+            na.nombre as nivel_academico,
+            dd.edad,
+            SUM(dd.cantidad_personas)::bigint as cantidad_personas,
+            COUNT(*) as filas
+        FROM
+            "DescripcionDemografica" as dd
+            LEFT JOIN
+            "OficinaRegistro" as ofr
+            ON (ofr.id = dd."id_OficinaRegistro")
+            LEFT JOIN
+            "Pais" as ps
+            ON (ps.id = ofr."id_Pais")
+            LEFT JOIN
+            "Continente" as c
+            ON (c.id = ps."id_Continente")
+            LEFT JOIN
+            "Genero" as g
+            ON (g.id = dd."id_Genero")
+            LEFT JOIN
+            "Especializacion" as esp
+            ON (esp.id = dd."id_Especializacion")
+            LEFT JOIN
+            "AreaConocimiento" as ac
+            ON (ac.id = esp."id_AreaConocimiento")
+            LEFT JOIN
+            "NivelAcademico" as na
+            ON (na.id = dd."id_NivelAcademico")
+        GROUP BY 1, 2, 3, 4, 5, 6, 7, 8, 9, 10
+        {'WITH NO DATA' if refresh else ''};
+        {f'REFRESH MATERIALIZED VIEW "{Variables.Sql.SUMMARY_TABLE}";' if refresh else ''}
+        """
+    )
+
+
+def drop_constraints(sql_executor: SqlExecutor) -> None:
+    """
+    Drop, in a single transaction, the foreign keys and the indexes of all the tables
+    (except their primary keys), if they exist.
+
+    Arguments:
+        sql_executor: SqlExecutor
+    """
+
+    print("dropping the foreign keys and indexes...")
+    queries = []
+    for reference in reversed(Variables.Sql.INSERTION_ORDER):
+        table = Variables.Sql.TABLES[reference]
+        queries.append(table.get_drop_foreign_keys_query())
+        queries += table.get_drop_index_queries()
+    sql_executor.run_query("".join(queries))
+
+
+def add_foreign_keys(sql_executor: SqlExecutor) -> None:
+    """
+    Add the foreign keys of all the tables in a single transaction, with one statement per table,
+    so each one is validated once against all the loaded rows.
+
+    Arguments:
+        sql_executor: SqlExecutor
+    """
+
+    print("adding and validating the foreign keys...")
+    sql_executor.run_query(
+        "".join(
+            Variables.Sql.TABLES[reference].get_add_foreign_keys_query()
+            for reference in Variables.Sql.INSERTION_ORDER
         )
+    )
+
+
+def replay_export(sql_executor: SqlExecutor, directory: str = Files.EXPORT) -> None:
+    """
+    Load the tables exported with LoadMode.EXPORT, in a single transaction,
+    and then build the indexes and the summary as after an insertion.
+    The tables must be empty, as for an insertion, since the ids of the exported rows
+    start from the first one.
+
+    Arguments:
+        sql_executor: SqlExecutor
+
+    Optional arguments:
+        directory: str
+            The path to the directory with the manifest and the files of the tables.
+            By default Files.EXPORT.
+    """
+
+    with open(path.join(directory, ExportLoader.MANIFEST), encoding="utf-8") as file:
+        manifest = json.load(file)
+
+    def copy_tables(_: str, conn: "psycopg2.connection") -> None:
+        with conn.cursor() as cursor:
+            for table in manifest["tables"]:
+                cursor.execute(f'SELECT 1 FROM "{table["name"]}" LIMIT 1')
+                assert cursor.fetchone() is None, "The tables in the database aren't empty."
+            for table in manifest["tables"]:
+                if table["rows"] == 0:
+                    continue
+                start = perf_counter()
+                with gzip.open(
+                    path.join(directory, table["file"]), "rt", encoding="utf-8"
+                ) as rows:
+                    cursor.copy_expert(table["copy_query"], rows)
+                assert cursor.rowcount == table["rows"], (
+                    f"{table['file']} has {cursor.rowcount} rows, "
+                    f"but the manifest lists {table['rows']}."
+                )
+                print(
+                    f"{table['name']}: {table['rows']} rows in {perf_counter() - start:.2f}s"
+                )
+
+    print(f"loading the tables exported to {directory}...")
+    sql_executor.run_query("", handle_conn=copy_tables)
+    index_tables(sql_executor)
+    summarize_tables(sql_executor)
+    SqlExecutor.invalidate_cache()
+
+
+def get_csv_fingerprint(file: str) -> dict[str, Any]:
+    """
+    Get the path, size and modification date of a CSV file,
+    to know if it changed after a checkpoint was saved while reading it.
+    """
+
+    return {
+        "file": path.abspath(file),
+        "size": path.getsize(file),
+        "modified": path.getmtime(file),
+    }
+
+
+def get_checkpoint(file: str, offset: int, num_rows: int) -> dict[str, Any]:
+    """
+    Get the state of an insertion after the rows of a chunk were normalized,
+    which must be saved once that chunk is committed.
+
+    Arguments:
+        file: str
+            The path to the location of the .csv file being read.
+        offset: int
+            The byte of the CSV file where the next row begins.
+        num_rows: int
+            The number of CSV rows already normalized.
+
+    Returns:
+        A dictionary that can be serialized as JSON.
+    """
+
+    return {
+        "csv": get_csv_fingerprint(file),
+        "offset": offset,
+        "rows": num_rows,
+        "tables": {
+            reference.name: Variables.Sql.TABLES[reference].get_state()
+            for reference in TableReference
+        },
+    }
+
+
+def save_checkpoint(checkpoint: dict[str, Any]) -> None:
+    """
+    Save the state of an insertion after a chunk was committed.
+
+    The checkpoint is written to a temporary file that then replaces the previous one,
+    so an interruption never leaves it half written.
 
-        query += Variables.Sql.TABLES[TableReference.GENERO].insert_values([genero])
-
-        query += Variables.Sql.TABLES[
-            TableReference.DESCRIPCION_DEMOGRAFICA
-        ].insert_values(
-            [
-                Variables.Sql.TABLES[
-                    TableReference.OFICINA_REGISTRO
-                ].get_id_by_identifier_value(oficina_registro),
-                Variables.Sql.TABLES[
-                    TableReference.NIVEL_ACADEMICO
-                ].get_id_by_identifier_value(nivel_academico),
-                Variables.Sql.TABLES[
-                    TableReference.ESPECIALIZACION
-                ].get_id_by_identifier_value(especializacion),
-                Variables.Sql.TABLES[TableReference.GENERO].get_id_by_identifier_value(
-                    genero
-                ),
-                edad,
-                estatura,
-                cantidad_personas,
-            ]
+    Arguments:
+        checkpoint: dict[str, Any]
+            A dictionary obtained with get_checkpoint.
+    """
+
+    temporal_file = f"{Files.CHECKPOINT}.tmp"
+    with open(temporal_file, "w", encoding="utf-8") as file:
+        json.dump(checkpoint, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporal_file, Files.CHECKPOINT)
+
+
+def restore_checkpoint(sql_executor: SqlExecutor) -> tuple[str, int, int] | None:
+    """
+    Restore the state of the tables from the last checkpoint.
+
+    The last id of each table in the database must be the one saved in the checkpoint,
+    otherwise a chunk was committed after the checkpoint was saved (or the tables were modified)
+    and the insertion can't be resumed.
+
+    Arguments:
+        sql_executor: SqlExecutor
+
+    Returns:
+        The path to the CSV file, the byte where the next row begins and the number of CSV rows
+        already inserted, or None if there is no checkpoint.
+    """
+
+    if not path.exists(Files.CHECKPOINT):
+        return None
+
+    with open(Files.CHECKPOINT, encoding="utf-8") as file:
+        checkpoint = json.load(file)
+
+    file = checkpoint["csv"]["file"]
+    assert checkpoint["csv"] == get_csv_fingerprint(
+        file
+    ), f"{file} changed after the checkpoint {Files.CHECKPOINT} was saved."
+
+    for reference in TableReference:
+        table = Variables.Sql.TABLES[reference]
+        state = checkpoint["tables"][reference.name]
+        (last_id,), *_ = sql_executor.run_query(
+            f'SELECT max(id) FROM "{table.get_name()}"'
+        ) or [(None,)]
+        assert (last_id if last_id is not None else -1) == state["id"], (
+            f"The last id of {table.get_name()} doesn't match the checkpoint {Files.CHECKPOINT}. "
+            "Remove it and empty the tables to insert the data again."
         )
+        table.set_state(state)
+
+    return file, checkpoint["offset"], checkpoint["rows"]
 
-    print("It's time to run that huge query!")
-    sql_executor.run_query(query)
+
+def get_csv_rows(
+    csv_reader: CsvReader, reader_workers: int, start: int = -1
+) -> Iterator[tuple[list[str], int]]:
+    """
+    Get the rows from the CSV file, parsing them in several processes if more than one worker is given.
+    The rows are always returned in the same order as in the file, so the ids do not depend on the workers.
+
+    Arguments:
+        csv_reader: CsvReader
+        reader_workers: int
+
+    Optional arguments:
+        start: int
+            The byte where the first row begins. By default the first row after the headers.
+
+    Returns:
+        An iterator with each row and the byte where the next one begins.
+    """
+
+    if reader_workers <= 1:
+        yield from csv_reader.get_rows_in_range(start, with_offsets=True)
+        return
+    for batch in csv_reader.get_row_batches(
+        workers=reader_workers, start=start, with_offsets=True
+    ):
+        yield from batch
+
+
+def get_country_resolver() -> CountryResolver:
+    """
+    Load the country resolver saved in Files.COUNTRIES,
+    or build it and save it there if it doesn't exist yet.
+    The countries it resolves during an insertion are saved at the end of it.
+    """
+
+    if path.exists(Files.COUNTRIES):
+        return CountryResolver.load(Files.COUNTRIES)
+    country_resolver = CountryResolver.build()
+    country_resolver.save(Files.COUNTRIES)
+    return country_resolver
+
+
+def get_loader(
+    load_mode: LoadMode,
+    sql_executor: SqlExecutor,
+    country_resolver: CountryResolver,
+    export_directory: str = Files.EXPORT,
+) -> SqlLoader:
+    match load_mode:
+        case LoadMode.QUERY:
+            return QueryLoader(sql_executor, country_resolver)
+        case LoadMode.COPY:
+            return CopyLoader(sql_executor, country_resolver)
+        case LoadMode.STAGING:
+            return StagingLoader(sql_executor, country_resolver)
+        case LoadMode.EXPORT:
+            ExportLoader.prepare(export_directory)
+            return ExportLoader(sql_executor, export_directory, country_resolver)
+        case _:
+            raise ValueError(f"{load_mode} isn't a valid load mode")
 
 
 def prepare_files() -> None:
-    if not path.exists(Files.CSV):
-        with zipfile.ZipFile(f"{Files.CSV}.zip") as zip_file:
-            zip_file.extractall(Files.PATH)
+    """
+    Verify that the CSV file exists.
+    A compressed CSV file isn't extracted, since the CsvReader decompresses it while reading it.
+    """
+
+    assert path.exists(Files.CSV), f"{Files.CSV} doesn't exist"
@@ -2,10 +2,12 @@ import plotly.express as px
 import plotly.graph_objects
 import pandas as pd
 import dash_bootstrap_components as dbc
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil, floor
 from typing import Any
 from dash import html, dcc
 from modules.objects import HtmlTable
-from settings import Connection
+from settings import Connection, Variables
 from modules.executors import SqlExecutor
 
 
@@ -89,6 +91,17 @@ class View:
             self._children.clear()
         self._load_all()
 
+    @staticmethod
+    def load_concurrently(*views: "View") -> None:
+        """
+        Load several views at the same time, each one in its own thread,
+        so it takes as long as the slowest one instead of the sum of all of them.
+        """
+
+        with ThreadPoolExecutor(max_workers=len(views) or 1) as executor:
+            for _ in executor.map(View.update_all, views):
+                pass
+
 
 class Introduction(View):
     def __init__(self, id: str, load_all: bool = True) -> None:
@@ -146,37 +159,60 @@ class Introduction(View):
 
 class NumberPeopleView(View):
     NUMBER_CITIES = 10
+    COUNTRY_COLUMNS = ["cantidad personas", "codigo pais", "nombre pais"]
+    CITY_COLUMNS = ["cantidad personas", "nombre ciudad"]
 
-    def __init__(self, title: str, id: str, load_all: bool = True) -> None:
-        super().__init__(title, id, load_all)
-
-    def _load_all(self) -> None:
-        self.add_map_by_country()
-        self.add_plot_by_city()
-
-    def add_map_by_country(self) -> None:
-
-        columns = ["cantidad personas", "codigo pais", "nombre pais"]
-
-        res = self._sql_executor.run_query(
-            f"""
+    COUNTRY_STATEMENT = SqlExecutor.register_statement(
+        "number_people_country",
+        f"""
             SELECT
-                SUM(dd."cantidad_personas") AS "{columns[0]}",
-                ps.codigo as "{columns[1]}",
-                ps.nombre as "{columns[2]}"
+                SUM(rd.cantidad_personas)::bigint AS "{COUNTRY_COLUMNS[0]}",
+                rd.codigo_pais as "{COUNTRY_COLUMNS[1]}",
+                rd.pais as "{COUNTRY_COLUMNS[2]}"
             FROM
-                "DescripcionDemografica" AS dd
-                JOIN
-                "OficinaRegistro" AS ofr
-                ON (ofr.id = dd."id_OficinaRegistro")
-                JOIN
-                "Pais" as ps
-                ON (ps.id = ofr."id_Pais")
+                "{Variables.Sql.SUMMARY_TABLE}" AS rd
+            WHERE
+                rd.codigo_pais IS NOT NULL
             GROUP BY 2, 3
             """,
-            handle_conn=pd.read_sql_query,
+    )
+
+    CITY_STATEMENT = SqlExecutor.register_statement(
+        "number_people_city",
+        f"""
+                SELECT
+                    SUM(rd.cantidad_personas)::bigint AS "{CITY_COLUMNS[0]}",
+                    rd.oficina_registro as "{CITY_COLUMNS[1]}"
+                FROM
+                    "{Variables.Sql.SUMMARY_TABLE}" AS rd
+                WHERE
+                    rd.oficina_registro IS NOT NULL
+                GROUP BY 2
+                ORDER BY 1 DESC
+                LIMIT $1
+                """,
+    )
+
+    def __init__(self, title: str, id: str, load_all: bool = True) -> None:
+        super().__init__(title, id, load_all)
+
+    def _load_all(self) -> None:
+        by_country, by_city = self._sql_executor.run_statements(
+            [
+                (NumberPeopleView.COUNTRY_STATEMENT, (), pd.read_sql_query),
+                (
+                    NumberPeopleView.CITY_STATEMENT,
+                    (int(NumberPeopleView.NUMBER_CITIES),),
+                    pd.read_sql_query,
+                ),
+            ],
+            cache=True,
         )
+        self.add_map_by_country(by_country)
+        self.add_plot_by_city(by_city)
 
+    def add_map_by_country(self, res: "pd.DataFrame") -> None:
+        columns = NumberPeopleView.COUNTRY_COLUMNS
         df = pd.DataFrame(res, columns=columns)
 
         figure = px.choropleth(
@@ -197,26 +233,8 @@ class NumberPeopleView(View):
             ]
         )
 
-    def add_plot_by_city(self) -> None:
-        columns = ["cantidad personas", "nombre ciudad"]
-
-        res = self._sql_executor.run_query(
-            f"""
-                SELECT
-                    SUM(dd."cantidad_personas") AS "{columns[0]}",
-                    ofr.nombre as "{columns[1]}"
-                FROM
-                    "DescripcionDemografica" AS dd
-                    JOIN
-                    "OficinaRegistro" AS ofr
-                    ON (ofr.id = dd."id_OficinaRegistro")
-                GROUP BY 2
-                ORDER BY 1 DESC
-                LIMIT {NumberPeopleView.NUMBER_CITIES}
-                """,
-            handle_conn=pd.read_sql_query,
-        )
-
+    def add_plot_by_city(self, res: "pd.DataFrame") -> None:
+        columns = NumberPeopleView.CITY_COLUMNS
         df = pd.DataFrame(res, columns=columns)
 
         bar = px.bar(df, x=columns[1], y=columns[0])
@@ -246,17 +264,12 @@ class NumberPeopleView(View):
 
 class SpecializationView(View):
     ACTUAL_SPECIALIZATION = ""
+    KNOWLEDGE_COLUMNS = ["cantidad personas", "especialización", "género"]
+    MAP_COLUMNS = ["numero personas", "pais", "codigo pais", "género"]
 
-    def __init__(self, title: str, id: str, load_all: bool = True) -> None:
-        super().__init__(title, id, load_all)
-
-    def _load_all(self) -> None:
-        self.add_plots_by_knowledge()
-        self.add_map()
-
-    def __custom_selector(self, text: str | tuple[str, str]) -> "html.Div":
-        res = self._sql_executor.run_query(
-            f"""
+    SPECIALIZATIONS_STATEMENT = SqlExecutor.register_statement(
+        "specialization_specializations",
+        """
             SELECT
                 DISTINCT(esp.nombre)
             FROM
@@ -265,43 +278,79 @@ class SpecializationView(View):
                 "AreaConocimiento" as ac
                 ON (esp."id_AreaConocimiento" = ac.id)
             WHERE
-                ac.nombre = '{KnowledgeAreaView.ACTUAL_KNOWLEDGE}'
-            """
-        )
-
-        return self._get_selector(
-            text,
-            "specialization_selector",
-            [{"label": name, "value": name} for name in res or []],
-            SpecializationView.ACTUAL_SPECIALIZATION,
-        )
+                ac.nombre = $1
+            """,
+    )
 
-    def add_plots_by_knowledge(self) -> None:
-        columns = ["cantidad personas", "especialización", "género"]
-        res = self._sql_executor.run_query(
-            f"""
+    KNOWLEDGE_STATEMENT = SqlExecutor.register_statement(
+        "specialization_knowledge",
+        f"""
             SELECT
-                SUM(dd.cantidad_personas) as "{columns[0]}",
-                esp.nombre as "{columns[1]}",
-                g.nombre as "{columns[2]}"
+                SUM(rd.cantidad_personas)::bigint as "{KNOWLEDGE_COLUMNS[0]}",
+                rd.especializacion as "{KNOWLEDGE_COLUMNS[1]}",
+                rd.genero as "{KNOWLEDGE_COLUMNS[2]}"
             FROM
-                "DescripcionDemografica" as dd
-                JOIN
-                "Especializacion" as esp
-                ON (dd."id_Especializacion" = esp.id)
-                JOIN
-                "AreaConocimiento" as ac
-                ON (esp."id_AreaConocimiento" = ac.id)
-                JOIN
-                "Genero" as g
-                ON (g.id = dd."id_Genero")
+                "{Variables.Sql.SUMMARY_TABLE}" as rd
             WHERE
-                ac.nombre = '{KnowledgeAreaView.ACTUAL_KNOWLEDGE}'
+                rd.area_conocimiento = $1
+                AND rd.genero IS NOT NULL
             GROUP BY 2, 3
             ORDER BY 3 DESC
-            """
+            """,
+    )
+
+    MAP_STATEMENT = SqlExecutor.register_statement(
+        "specialization_map",
+        f"""
+            SELECT
+                SUM(rd.cantidad_personas)::bigint as "{MAP_COLUMNS[0]}",
+                rd.pais as "{MAP_COLUMNS[1]}",
+                rd.codigo_pais as "{MAP_COLUMNS[2]}",
+                rd.genero as "{MAP_COLUMNS[3]}"
+            FROM
+                "{Variables.Sql.SUMMARY_TABLE}" as rd
+            WHERE
+                rd.especializacion = $1
+                AND rd.codigo_pais IS NOT NULL
+                AND rd.genero IS NOT NULL
+            GROUP BY 2, 3, 4
+            ORDER BY 4 DESC, 1 DESC
+            """,
+    )
+
+    def __init__(self, title: str, id: str, load_all: bool = True) -> None:
+        super().__init__(title, id, load_all)
+
+    def _load_all(self) -> None:
+        knowledge = (KnowledgeAreaView.ACTUAL_KNOWLEDGE,)
+        by_knowledge, specializations, by_country = self._sql_executor.run_statements(
+            [
+                (SpecializationView.KNOWLEDGE_STATEMENT, knowledge),
+                (SpecializationView.SPECIALIZATIONS_STATEMENT, knowledge),
+                (
+                    SpecializationView.MAP_STATEMENT,
+                    (SpecializationView.ACTUAL_SPECIALIZATION,),
+                )
+                if SpecializationView.ACTUAL_SPECIALIZATION != ""
+                else None,
+            ],
+            cache=True,
         )
+        self.add_plots_by_knowledge(by_knowledge)
+        self.add_map(specializations, by_country)
 
+    def __custom_selector(
+        self, text: str | tuple[str, str], specializations: list[tuple] | None
+    ) -> "html.Div":
+        return self._get_selector(
+            text,
+            "specialization_selector",
+            [{"label": name, "value": name} for name in specializations or []],
+            SpecializationView.ACTUAL_SPECIALIZATION,
+        )
+
+    def add_plots_by_knowledge(self, res: list[tuple] | None) -> None:
+        columns = SpecializationView.KNOWLEDGE_COLUMNS
         df = pd.DataFrame(res, columns=columns)
 
         barplot = px.bar(
@@ -329,41 +378,19 @@ class SpecializationView(View):
             ]
         )
 
-    def add_map(self) -> None:
+    def add_map(
+        self, specializations: list[tuple] | None, res: list[tuple] | None = None
+    ) -> None:
         if SpecializationView.ACTUAL_SPECIALIZATION == "":
             self._add_child(
-                [self.__custom_selector("Selecciona una especialización: ")]
+                [
+                    self.__custom_selector(
+                        "Selecciona una especialización: ", specializations
+                    )
+                ]
             )
             return
-        columns = ["numero personas", "pais", "codigo pais", "género"]
-        res = self._sql_executor.run_query(
-            f"""
-            SELECT
-                SUM(dd.cantidad_personas) as "{columns[0]}",
-                ps.nombre as "{columns[1]}",
-                ps.codigo as "{columns[2]}",
-                g.nombre as "{columns[3]}"
-            FROM
-                "DescripcionDemografica" as dd
-                JOIN
-                "OficinaRegistro" as ofr
-                ON (dd."id_OficinaRegistro" = ofr.id)
-                JOIN
-                "Pais" as ps
-                ON (ofr."id_Pais" = ps.id)
-                JOIN
-                "Especializacion" as esp
-                ON (dd."id_Especializacion" = esp.id)
-                JOIN
-                "Genero" as g
-                ON (g.id = dd."id_Genero")
-            WHERE
-                esp.nombre = '{SpecializationView.ACTUAL_SPECIALIZATION}'
-            GROUP BY 2, 3, 4
-            ORDER BY 4 DESC, 1 DESC
-            """
-        )
-
+        columns = SpecializationView.MAP_COLUMNS
         df = pd.DataFrame(res, columns=columns)
 
         print(len(df.groupby(columns[3])))
@@ -392,7 +419,9 @@ class SpecializationView(View):
 
         self._add_child(
             [
-                self.__custom_selector("Popularidad especialización "),
+                self.__custom_selector(
+                    "Popularidad especialización ", specializations
+                ),
                 html.Div(
                     [
                         html.Div([html.H4(key), dcc.Graph(figure=value)])
@@ -406,58 +435,106 @@ class SpecializationView(View):
 
 class KnowledgeAreaView(View):
     ACTUAL_KNOWLEDGE = ""
+    BARPLOT_COLUMNS = ["cantidad personas", "área de conocimiento", "género"]
+    COUNTRY_COLUMNS = ["cantidad personas", "pais", "código pais"]
+    CONTINENT_COLUMNS = ["cantidad personas", "continente", "género"]
 
-    def __init__(self, title: str, id: str, load_all: bool = True) -> None:
-        super().__init__(title, id, load_all)
-        self.__esp_view = SpecializationView("", "specialization", False)
-
-    def _load_all(self) -> None:
-        self.add_barplot()
-        self.add_plots_by_knowledge()
-
-    def __custom_selector(self, text: str | tuple[str, str]) -> "html.Div":
-        res = self._sql_executor.run_query(
-            f"""
+    AREAS_STATEMENT = SqlExecutor.register_statement(
+        "knowledge_area_areas",
+        """
             SELECT
                 distinct(nombre)
             FROM
                 "AreaConocimiento"
-        """
-        )
+        """,
+    )
 
-        return self._get_selector(
-            text,
-            "knowledge_name_selector",
-            [{"label": name, "value": name} for name in res or []],
-            KnowledgeAreaView.ACTUAL_KNOWLEDGE,
-        )
+    BARPLOT_STATEMENT = SqlExecutor.register_statement(
+        "knowledge_area_barplot",
+        f"""
+            SELECT
+                SUM(rd.cantidad_personas)::bigint as "{BARPLOT_COLUMNS[0]}",
+                rd.area_conocimiento as "{BARPLOT_COLUMNS[1]}",
+                rd.genero as "{BARPLOT_COLUMNS[2]}"
+            FROM
+                "{Variables.Sql.SUMMARY_TABLE}" as rd
+            WHERE
+                rd.area_conocimiento IS NOT NULL
+                AND rd.genero IS NOT NULL
+            GROUP BY 2, 3
+            ORDER BY 3 DESC, 1 DESC
+            """,
+    )
 
-    def add_barplot(self) -> None:
-        columns = ["cantidad personas", "área de conocimiento", "género"]
+    COUNTRY_STATEMENT = SqlExecutor.register_statement(
+        "knowledge_area_country",
+        f"""
+            SELECT
+                SUM(rd.cantidad_personas)::bigint as "{COUNTRY_COLUMNS[0]}",
+                rd.pais as "{COUNTRY_COLUMNS[1]}",
+                rd.codigo_pais as "{COUNTRY_COLUMNS[2]}"
+            FROM
+                "{Variables.Sql.SUMMARY_TABLE}" as rd
+            WHERE
+                rd.area_conocimiento = $1
+                AND rd.codigo_pais IS NOT NULL
+            GROUP BY 2, 3
+            """,
+    )
 
-        res = self._sql_executor.run_query(
-            f"""
+    CONTINENT_STATEMENT = SqlExecutor.register_statement(
+        "knowledge_area_continent",
+        f"""
             SELECT
-                SUM(dd.cantidad_personas) as "{columns[0]}",
-                ac.nombre as "{columns[1]}",
-                g.nombre as "{columns[2]}"
+                SUM(rd.cantidad_personas)::bigint as "{CONTINENT_COLUMNS[0]}",
+                rd.continente as "{CONTINENT_COLUMNS[1]}",
+                rd.genero as "{CONTINENT_COLUMNS[2]}"
             FROM
-                "AreaConocimiento" as ac
-                JOIN
-                "Especializacion" as esp
-                ON (ac.id = esp."id_AreaConocimiento")
-                JOIN
-                "DescripcionDemografica" as dd
-                ON (dd."id_Especializacion" = esp.id)
-                JOIN
-                "Genero" as g
-                ON (g.id = dd."id_Genero")
+                "{Variables.Sql.SUMMARY_TABLE}" as rd
+            WHERE
+                rd.area_conocimiento = $1
+                AND rd.codigo_continente IS NOT NULL
+                AND rd.genero IS NOT NULL
             GROUP BY 2, 3
-            ORDER BY 3 DESC, 1 DESC
+            ORDER BY 3 DESC
             """,
-            handle_conn=pd.read_sql_query,
+    )
+
+    def __init__(self, title: str, id: str, load_all: bool = True) -> None:
+        super().__init__(title, id, load_all)
+        self.__esp_view = SpecializationView("", "specialization", False)
+
+    def _load_all(self) -> None:
+        selected = KnowledgeAreaView.ACTUAL_KNOWLEDGE != ""
+        knowledge = (KnowledgeAreaView.ACTUAL_KNOWLEDGE,)
+        by_area, areas, by_country, by_continent = self._sql_executor.run_statements(
+            [
+                (KnowledgeAreaView.BARPLOT_STATEMENT, (), pd.read_sql_query),
+                (KnowledgeAreaView.AREAS_STATEMENT, ()),
+                (KnowledgeAreaView.COUNTRY_STATEMENT, knowledge, pd.read_sql_query)
+                if selected
+                else None,
+                (KnowledgeAreaView.CONTINENT_STATEMENT, knowledge)
+                if selected
+                else None,
+            ],
+            cache=True,
         )
+        self.add_barplot(by_area)
+        self.add_plots_by_knowledge(areas, by_country, by_continent)
 
+    def __custom_selector(
+        self, text: str | tuple[str, str], areas: list[tuple] | None
+    ) -> "html.Div":
+        return self._get_selector(
+            text,
+            "knowledge_name_selector",
+            [{"label": name, "value": name} for name in areas or []],
+            KnowledgeAreaView.ACTUAL_KNOWLEDGE,
+        )
+
+    def add_barplot(self, res: "pd.DataFrame") -> None:
+        columns = KnowledgeAreaView.BARPLOT_COLUMNS
         df = pd.DataFrame(res, columns=columns)
 
         figure = px.bar(
@@ -475,46 +552,25 @@ class KnowledgeAreaView(View):
             ]
         )
 
-    def add_plots_by_knowledge(self) -> None:
+    def add_plots_by_knowledge(
+        self,
+        areas: list[tuple] | None,
+        by_country: "pd.DataFrame | None" = None,
+        by_continent: list[tuple] | None = None,
+    ) -> None:
         if KnowledgeAreaView.ACTUAL_KNOWLEDGE == "":
             self._add_child(
                 [
-                    self.__custom_selector("Seleccione un área de conocimiento: "),
+                    self.__custom_selector(
+                        "Seleccione un área de conocimiento: ", areas
+                    ),
                     self._get_selector("", "specialization_selector", [], "", "hide"),
                 ]
             )
             return
 
-        columns = ["cantidad personas", "pais", "código pais"]
-
-        res = self._sql_executor.run_query(
-            f"""
-            SELECT
-                SUM(dd.cantidad_personas) as "{columns[0]}",
-                ps.nombre as "{columns[1]}",
-                ps.codigo as "{columns[2]}"
-            FROM
-                "AreaConocimiento" as ac
-                JOIN
-                "Especializacion" as esp
-                ON (ac.id = esp."id_AreaConocimiento")
-                JOIN
-                "DescripcionDemografica" as dd
-                ON (dd."id_Especializacion" = esp.id)
-                JOIN
-                "OficinaRegistro" as ofr
-                ON (ofr.id = dd."id_OficinaRegistro")
-                JOIN
-                "Pais" as ps
-                ON (ps.id = ofr."id_Pais")
-            WHERE
-                ac.nombre = '{KnowledgeAreaView.ACTUAL_KNOWLEDGE}'
-            GROUP BY 2, 3
-            """,
-            handle_conn=pd.read_sql_query,
-        )
-
-        df = pd.DataFrame(res, columns=columns)
+        columns = KnowledgeAreaView.COUNTRY_COLUMNS
+        df = pd.DataFrame(by_country, columns=columns)
 
         map = px.choropleth(
             df,
@@ -526,43 +582,8 @@ class KnowledgeAreaView(View):
         )
         self._remove_background(map)
 
-        columns = ["cantidad personas", "continente", "género"]
-
-        res = self._sql_executor.run_query(
-            f"""
-            SELECT
-                SUM(dd.cantidad_personas) as "{columns[0]}",
-                c.nombre as "{columns[1]}",
-                g.nombre as "{columns[2]}"
-            FROM
-                "DescripcionDemografica" as dd
-                JOIN
-                "OficinaRegistro" as ofr
-                ON (ofr.id = dd."id_OficinaRegistro")
-                JOIN
-                "Pais" as ps
-                ON (ps.id = ofr."id_Pais")
-                JOIN
-                "Continente" as c
-                ON (c.id = ps."id_Continente")
-                JOIN
-                "Especializacion" as esp
-                ON (dd."id_Especializacion" = esp.id)
-                JOIN
-                "AreaConocimiento" as ac
-                ON (esp."id_AreaConocimiento" = ac.id)
-                JOIN
-                "Genero" as g
-                ON (g.id = dd."id_Genero")
-            WHERE
-                ac.nombre = '{KnowledgeAreaView.ACTUAL_KNOWLEDGE}'
-
-            GROUP BY 2, 3
-            ORDER BY 3 DESC
-            """
-        )
-
-        df = pd.DataFrame(res, columns=columns)
+        columns = KnowledgeAreaView.CONTINENT_COLUMNS
+        df = pd.DataFrame(by_continent, columns=columns)
 
         barplot = px.bar(
             df, x=columns[1], y=columns[0], color=columns[2], barmode="group"
@@ -574,7 +595,7 @@ class KnowledgeAreaView(View):
 
         self._add_child(
             [
-                self.__custom_selector("Popularidad área de conocimiento"),
+                self.__custom_selector("Popularidad área de conocimiento", areas),
                 html.Div(
                     [
                         html.Div(
@@ -603,29 +624,108 @@ class KnowledgeAreaView(View):
 
 
 class AgeView(View):
-    def __init__(self, title: str, id: str, load_all: bool = True) -> None:
-        super().__init__(title, id, load_all)
-
-    def _load_all(self) -> None:
-        self.add_boxplot()
-        self.add_barplot()
+    BOXPLOT_COLUMNS = ["años persona"]
+    BARPLOT_COLUMNS = ["personas", "edad"]
 
-    def add_boxplot(self) -> None:
-        columns = ["años persona"]
+    BOXPLOT_STATEMENT = SqlExecutor.register_statement(
+        "age_boxplot",
+        f"""
+            SELECT
+                rd.edad as "{BOXPLOT_COLUMNS[0]}",
+                SUM(rd.filas)::bigint as filas
+            FROM
+                "{Variables.Sql.SUMMARY_TABLE}" as rd
+            GROUP BY 1
+            """,
+    )
 
-        res = self._sql_executor.run_query(
-            f"""
+    BARPLOT_STATEMENT = SqlExecutor.register_statement(
+        "age_barplot",
+        f"""
             SELECT
-                dd.edad as "{columns[0]}"
+                SUM(rd.cantidad_personas)::bigint as "{BARPLOT_COLUMNS[0]}",
+                rd.edad as "{BARPLOT_COLUMNS[1]}"
             FROM
-                "DescripcionDemografica" as dd
+                "{Variables.Sql.SUMMARY_TABLE}" as rd
+            GROUP BY 2
             """,
-            handle_conn=pd.read_sql_query,
+    )
+
+    def __init__(self, title: str, id: str, load_all: bool = True) -> None:
+        super().__init__(title, id, load_all)
+
+    def _load_all(self) -> None:
+        ages, by_age = self._sql_executor.run_statements(
+            [
+                (AgeView.BOXPLOT_STATEMENT, (), pd.read_sql_query),
+                (AgeView.BARPLOT_STATEMENT, (), pd.read_sql_query),
+            ],
+            cache=True,
         )
+        self.add_boxplot(ages)
+        self.add_barplot(by_age)
 
-        df = pd.DataFrame(res, columns=columns)
+    @staticmethod
+    def __get_box_statistics(res: "pd.DataFrame", column: str) -> dict[str, Any]:
+        """
+        Compute the statistics of a box plot from the number of rows of each value,
+        the same as plotly would from the rows one by one, without repeating the values.
 
-        figure = px.box(df, y=columns[0])
+        Arguments:
+            res: pd.DataFrame
+                The distinct values of the column, with their number of rows in "filas".
+            column: str
+
+        Returns:
+            The arguments of a box with precomputed quartiles and fences,
+            whose sample points are only the values outside the fences.
+        """
+
+        res = res.dropna(subset=[column]).sort_values(column)
+        if res.empty:
+            return {}
+        values = res[column].astype(float).reset_index(drop=True)
+        last_rows = res["filas"].cumsum().reset_index(drop=True)
+
+        def get_value(position: int) -> float:
+            return values[last_rows.searchsorted(position, side="right")]
+
+        def get_quantile(fraction: float) -> float:
+            # The linear method of plotly, which interpolates at fraction * n - 0.5.
+            position = fraction * last_rows.iloc[-1] - 0.5
+            position = min(max(position, 0), last_rows.iloc[-1] - 1)
+            weight = position % 1
+            return weight * get_value(ceil(position)) + (1 - weight) * get_value(
+                floor(position)
+            )
+
+        q1, median, q3 = get_quantile(0.25), get_quantile(0.5), get_quantile(0.75)
+        lower_fence = min(q1, values[values >= q1 - 1.5 * (q3 - q1)].min())
+        upper_fence = max(q3, values[values <= q3 + 1.5 * (q3 - q1)].max())
+        return {
+            "q1": [q1],
+            "median": [median],
+            "q3": [q3],
+            "lowerfence": [lower_fence],
+            "upperfence": [upper_fence],
+            "y": [values[(values < lower_fence) | (values > upper_fence)].tolist()],
+        }
+
+    def add_boxplot(self, res: "pd.DataFrame") -> None:
+        columns = AgeView.BOXPLOT_COLUMNS
+
+        # The quartiles are computed from the rows of each age, so the figure doesn't
+        # carry a point for every row of the table.
+        figure = plotly.graph_objects.Figure(
+            plotly.graph_objects.Box(
+                name="",
+                x0=" ",
+                showlegend=False,
+                boxpoints="outliers",
+                **AgeView.__get_box_statistics(res, columns[0]),
+            )
+        )
+        figure.update_layout(yaxis_title=columns[0])
         self._remove_background(figure)
 
         self._add_child(
@@ -635,21 +735,8 @@ class AgeView(View):
             ]
         )
 
-    def add_barplot(self) -> None:
-        columns = ["personas", "edad"]
-
-        res = self._sql_executor.run_query(
-            f"""
-            SELECT
-                SUM(dd.cantidad_personas) as "{columns[0]}",
-                dd.edad as "{columns[1]}"
-            FROM
-                "DescripcionDemografica" as dd
-            GROUP BY 2
-            """,
-            handle_conn=pd.read_sql_query,
-        )
-
+    def add_barplot(self, res: "pd.DataFrame") -> None:
+        columns = AgeView.BARPLOT_COLUMNS
         df = pd.DataFrame(res, columns=columns)
 
         figure = px.bar(df, x=columns[1], y=columns[0])
@@ -669,33 +756,102 @@ class AgeView(View):
 class EducationLevelView(View):
     ACTUAL_CONTINENT = ""
     ACTUAL_EDUCATION = ""
+    MAP_COLUMNS = ["código país", "nombre país", "cantidad personas"]
+    FREQUENCY_COLUMNS = ["nivel académico", "frecuencia"]
 
-    def __init__(self, title: str, id: str, load_all: bool = True) -> None:
-        super().__init__(title, id, load_all)
-
-    def _load_all(self) -> None:
-        self.add_map()
-        self.add_frequency_table()
-
-    def add_map(self) -> None:
-        res = (
-            self._sql_executor.run_query(
-                """
+    LEVELS_STATEMENT = SqlExecutor.register_statement(
+        "education_level_levels",
+        """
             SELECT
                 DISTINCT(na.nombre)
             FROM
                 "NivelAcademico" as na
-            """
-            )
-            or []
+            """,
+    )
+
+    CONTINENTS_STATEMENT = SqlExecutor.register_statement(
+        "education_level_continents",
+        """
+            SELECT
+                DISTINCT(c.nombre) 
+            FROM
+                "Continente" as c
+            """,
+    )
+
+    MAP_STATEMENT = SqlExecutor.register_statement(
+        "education_level_map",
+        f"""
+            SELECT
+                rd.codigo_pais as "{MAP_COLUMNS[0]}",
+                rd.pais as "{MAP_COLUMNS[1]}",
+                SUM(rd.cantidad_personas)::bigint as "{MAP_COLUMNS[2]}"
+            FROM
+                "{Variables.Sql.SUMMARY_TABLE}" as rd
+            WHERE
+                rd.nivel_academico = $1
+                AND rd.codigo_pais IS NOT NULL
+            GROUP BY
+                1, 2
+            """,
+    )
+
+    FREQUENCY_STATEMENT = SqlExecutor.register_statement(
+        "education_level_frequency",
+        f"""
+            SELECT
+                rd.nivel_academico as "{FREQUENCY_COLUMNS[1]}",
+                SUM(rd.cantidad_personas)::bigint as "{FREQUENCY_COLUMNS[0]}"
+            FROM
+                "{Variables.Sql.SUMMARY_TABLE}" as rd
+            WHERE
+                rd.continente = $1
+                AND rd.nivel_academico IS NOT NULL
+            GROUP BY
+                1
+            ORDER BY
+                2 DESC
+            """,
+    )
+
+    def __init__(self, title: str, id: str, load_all: bool = True) -> None:
+        super().__init__(title, id, load_all)
+
+    def _load_all(self) -> None:
+        levels, continents, by_country, frequencies = self._sql_executor.run_statements(
+            [
+                (EducationLevelView.LEVELS_STATEMENT, ()),
+                (EducationLevelView.CONTINENTS_STATEMENT, ()),
+                (
+                    EducationLevelView.MAP_STATEMENT,
+                    (EducationLevelView.ACTUAL_EDUCATION,),
+                )
+                if EducationLevelView.ACTUAL_EDUCATION != ""
+                else None,
+                (
+                    EducationLevelView.FREQUENCY_STATEMENT,
+                    (EducationLevelView.ACTUAL_CONTINENT,),
+                )
+                if EducationLevelView.ACTUAL_CONTINENT != ""
+                else None,
+            ],
+            cache=True,
         )
+        self.add_map(levels, by_country)
+        self.add_frequency_table(continents, frequencies)
 
+    def add_map(
+        self, levels: list[tuple] | None, res: list[tuple] | None = None
+    ) -> None:
         self._add_child(
             [
                 self._get_selector(
                     "Seleccione un nivel académico: ",
                     "education_selector",
-                    [{"label": name.capitalize(), "value": name} for name, *_ in res],
+                    [
+                        {"label": name.capitalize(), "value": name}
+                        for name, *_ in levels or []
+                    ],
                     EducationLevelView.ACTUAL_EDUCATION,
                 )
             ]
@@ -704,31 +860,7 @@ class EducationLevelView(View):
         if EducationLevelView.ACTUAL_EDUCATION == "":
             return
 
-        columns = ["código país", "nombre país", "cantidad personas"]
-        res = self._sql_executor.run_query(
-            f"""
-            SELECT
-                ps.codigo as "{columns[0]}",
-                ps.nombre as "{columns[1]}",
-                SUM(dd.cantidad_personas) as "{columns[2]}"
-            FROM
-                "DescripcionDemografica" as dd
-                JOIN
-                "OficinaRegistro" as ofr
-                ON (dd."id_OficinaRegistro" = ofr.id)
-                JOIN
-                "Pais" as ps
-                ON (ps.id = ofr."id_Pais")
-                JOIN
-                "NivelAcademico" as na
-                ON (na.id = dd."id_NivelAcademico")
-            WHERE
-                na.nombre = '{EducationLevelView.ACTUAL_EDUCATION}'
-            GROUP BY
-                1, 2
-            """
-        )
-
+        columns = EducationLevelView.MAP_COLUMNS
         df = pd.DataFrame(res, columns=columns)
 
         map = px.choropleth(
@@ -751,15 +883,9 @@ class EducationLevelView(View):
             ]
         )
 
-    def add_frequency_table(self) -> None:
-        res = self._sql_executor.run_query(
-            """
-            SELECT
-                DISTINCT(c.nombre) 
-            FROM
-                "Continente" as c
-            """
-        )
+    def add_frequency_table(
+        self, continents: list[tuple] | None, res: list[tuple] | None = None
+    ) -> None:
         self._add_child(
             [
                 self._get_selector(
@@ -767,7 +893,7 @@ class EducationLevelView(View):
                     "continent_selector",
                     [
                         {"label": nombre.capitalize(), "value": nombre}
-                        for nombre, *_ in res or []
+                        for nombre, *_ in continents or []
                     ],
                     EducationLevelView.ACTUAL_CONTINENT,
                 )
@@ -776,39 +902,8 @@ class EducationLevelView(View):
 
         if EducationLevelView.ACTUAL_CONTINENT == "":
             return
-        columns = ["nivel académico", "frecuencia"]
-        res = (
-            self._sql_executor.run_query(
-                f"""
-            SELECT
-                na.nombre as "{columns[1]}",
-                SUM(dd.cantidad_personas) as "{columns[0]}"
-            FROM
-                "DescripcionDemografica" as dd
-                JOIN
-                "NivelAcademico" as na
-                ON (na.id = dd."id_NivelAcademico")
-                JOIN
-                "OficinaRegistro" as ofr
-                ON (ofr.id = dd."id_OficinaRegistro")
-                JOIN
-                "Pais" as ps
-                ON (ps.id = ofr."id_Pais")
-                JOIN 
-                "Continente" as c
-                ON (c.id = ps."id_Continente")
-            WHERE
-                c.nombre = '{EducationLevelView.ACTUAL_CONTINENT}'
-            GROUP BY
-                1
-            ORDER BY
-                2 DESC
-            """
-            )
-            or []
-        )
-
-        res = [[name.capitalize(), int(frequency)] for name, frequency in res]
+        columns = EducationLevelView.FREQUENCY_COLUMNS
+        res = [[name.capitalize(), int(frequency)] for name, frequency in res or []]
         df = pd.DataFrame(res, columns=columns)
 
         bar = px.bar(df, x=columns[0], y=columns[1])
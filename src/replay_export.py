@@ -0,0 +1,27 @@
+#!/usr/bin/env python3.10
+"""
+Load into the database the tables exported with LoadMode.EXPORT,
+without reading and normalizing the CSV file again.
+
+Usage (from the src folder):
+    python replay_export.py [directory]
+"""
+
+import sys
+from modules.executors import SqlExecutor
+from modules.utils import initialize_tables, replay_export
+from settings import Connection, Files
+
+
+if __name__ == "__main__":
+    initialize_tables()
+    replay_export(
+        SqlExecutor(
+            database=Connection.DATABASE,
+            user=Connection.USER,
+            password=Connection.PASSWORD,
+            host=Connection.HOST,
+            port=Connection.PORT,
+        ),
+        sys.argv[1] if len(sys.argv) > 1 else Files.EXPORT,
+    )
@@ -16,6 +16,12 @@ class Connection:
     PASSWORD = str(os.getenv("pg_password"))
     HOST = str(os.getenv("pg_host"))
     PORT = str(os.getenv("pg_port"))
+    POOL_MIN_SIZE = int(os.getenv("pg_pool_min_size") or 1)
+    POOL_MAX_SIZE = int(os.getenv("pg_pool_max_size") or 10)
+    POOL_CHECK_AFTER = float(os.getenv("pg_pool_check_after") or 30)
+    STREAM_ITERSIZE = int(os.getenv("pg_stream_itersize") or 2000)
+    CACHE_SIZE = int(os.getenv("pg_cache_size") or 128)
+    CACHE_TTL = float(os.getenv("pg_cache_ttl") or 300)
 
 
 class Server:
@@ -25,8 +31,23 @@ class Server:
 
 class Files:
     PATH = actual_dir + "/assets"
-    CSV = PATH + "/colombianos_registrados_exterior.csv"
+    CSV = next(
+        (
+            file
+            for file in (
+                PATH + "/colombianos_registrados_exterior.csv",
+                PATH + "/colombianos_registrados_exterior.csv.zip",
+                PATH + "/colombianos_registrados_exterior.csv.gz",
+            )
+            if os.path.exists(file)
+        ),
+        PATH + "/colombianos_registrados_exterior.csv.zip",
+    )
     SQL_DATABASE = PATH + "/colombianos_registrados_exterior.sql"
+    CHECKPOINT = PATH + "/ingest_checkpoint.json"
+    COUNTRIES = PATH + "/countries.json"
+    EXPORT = PATH + "/export"
+    PROFILE = PATH + "/ingest_profile.json"
 
 
 class TableReference(Enum):
@@ -45,11 +66,66 @@ class TableReference(Enum):
             function(const)
 
 
+class LoadMode(Enum):
+    QUERY = 1
+    COPY = 2
+    STAGING = 3
+    EXPORT = 4
+
+
+class CsvBackend(Enum):
+    PYTHON = 1
+    CSV = 2
+    PANDAS = 3
+
+
+class Encoding(Enum):
+    ROW = 1
+    COLUMNAR = 2
+
+
+class Ingest:
+    LOAD_MODE = LoadMode[str(os.getenv("ingest_load_mode") or "query").upper()]
+    CHUNK_SIZE = int(os.getenv("ingest_chunk_size") or 0)
+    READER_WORKERS = int(os.getenv("ingest_reader_workers") or 1)
+    CSV_BACKEND = CsvBackend[str(os.getenv("ingest_csv_backend") or "python").upper()]
+    RESUME = str(os.getenv("ingest_resume") or "true").lower() == "true"
+    APPEND = str(os.getenv("ingest_append") or "false").lower() == "true"
+    BUILD_INDEXES = str(os.getenv("ingest_build_indexes") or "true").lower() == "true"
+    FAST_LOAD = str(os.getenv("ingest_fast_load") or "false").lower() == "true"
+    COMPACT = str(os.getenv("ingest_compact") or "false").lower() == "true"
+    PIPELINE_BATCHES = int(os.getenv("ingest_pipeline_batches") or 2)
+    ENCODING = Encoding[str(os.getenv("ingest_encoding") or "row").upper()]
+    PROFILE = str(os.getenv("ingest_profile") or "false").lower() == "true"
+
+
 class Variables:
+    CONTINENTS = {
+        "NA": "North America",
+        "SA": "South America",
+        "AS": "Asia",
+        "OC": "Australia",
+        "AF": "Africa",
+        "EU": "Europe",
+    }
+
     class Sql:
         NULL_VALUE = "null"
+        COPY_NULL_VALUE = "\\N"
+        SMALLINT_MAX = 32767
         INVALID_VALUES = (
             "NO INDICA",
             "(NO REGISTRA)",
         )
         TABLES = {}
+        SUMMARY_TABLE = "ResumenDemografico"
+        INSERTION_ORDER = (
+            TableReference.CONTINENTE,
+            TableReference.PAIS,
+            TableReference.OFICINA_REGISTRO,
+            TableReference.NIVEL_ACADEMICO,
+            TableReference.AREA_CONOCIMIENTO,
+            TableReference.ESPECIALIZACION,
+            TableReference.GENERO,
+            TableReference.DESCRIPCION_DEMOGRAFICA,
+        )
@@ -0,0 +1,267 @@
+import json
+import pandas as pd
+import pytest
+from modules import utils
+from modules.loaders import SqlLoader
+from modules.objects import CountryResolver, SqlTable
+from settings import Encoding, Files, LoadMode, TableReference
+
+HEADERS = [
+    "País",
+    "Código ISO país",
+    "Oficina de registro",
+    "Grupo edad",
+    "Edad (años)",
+    "Área Conocimiento",
+    "Sub Área Conocimiento",
+    "Nivel Académico",
+    "Estado civil",
+    "Género",
+    "Etnia de la persona",
+    "Estatura (CM)",
+    "Localización",
+    "Cantidad de personas",
+]
+
+COUNTRIES = [
+    ("COLOMBIA", "COL", "BOGOTA"),
+    ("ESPAÑA", "ESP", "MADRID"),
+    ("ESTADOS UNIDOS", "USA", "MIAMI"),
+    ("NO INDICA", "NO INDICA", "(NO REGISTRA)"),
+]
+
+
+class RecordingLoader(SqlLoader):
+    """
+    A loader that, instead of sending the rows to the database,
+    keeps the ids of the rows of each table that were flushed.
+    """
+
+    def __init__(
+        self,
+        country_resolver: CountryResolver,
+        loaded: dict[TableReference, list[int]],
+    ) -> None:
+        super().__init__(None, country_resolver)
+        self.__ids: dict[TableReference, list[int]] = {
+            reference: [] for reference in TableReference
+        }
+        self.__loaded = loaded
+
+    def add_values(self, reference: TableReference, values: list[str | int]) -> None:
+        self.__ids[reference].append(values[0])
+
+    def add_columns(self, reference: TableReference, columns: "pd.DataFrame") -> None:
+        self.__ids[reference] += columns.iloc[:, 0].tolist()
+
+    def flush(self) -> None:
+        for reference, ids in self.__ids.items():
+            self.__loaded[reference] += ids
+            ids.clear()
+
+    def detach(self) -> "RecordingLoader":
+        loader = RecordingLoader(self._country_resolver, self.__loaded)
+        loader.__ids, self.__ids = self.__ids, loader.__ids
+        return loader
+
+
+def write_csv(file: str, num_rows: int) -> None:
+    """
+    Write a CSV file whose rows repeat the same few members of each dimension,
+    so the new members appear in different chunks and the facts can be compacted.
+    """
+
+    with open(file, "w", encoding="utf-8") as output:
+        output.write(",".join(HEADERS) + "\n")
+        for row in range(num_rows):
+            country, code, office = COUNTRIES[row % len(COUNTRIES)]
+            output.write(
+                ",".join(
+                    [
+                        country,
+                        code,
+                        office,
+                        "X",
+                        str(-1 if row % 5 == 0 else 20 + row % 3),
+                        f"AREA {row % 2}",
+                        f"AREA {row % 2} ESP {row % 7}",
+                        "PREGRADO" if row % 3 else "MAESTRIA",
+                        "SOLTERO",
+                        "FEMENINO" if row % 2 else "MASCULINO",
+                        "NINGUNA",
+                        str(-1 if row % 4 == 0 else 160),
+                        '"(0, 0)"',
+                        "1",
+                    ]
+                )
+                + "\n"
+            )
+
+
+@pytest.mark.parametrize("pipeline_batches", [0, 2])
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("encoding", [Encoding.ROW, Encoding.COLUMNAR])
+def test_checkpoint_matches_the_queued_rows(
+    tmp_path, monkeypatch, encoding, compact, pipeline_batches
+):
+    """
+    The last id of each table saved in each checkpoint must be the last one
+    of the rows loaded until then, as restore_checkpoint checks against the database.
+    """
+
+    file = str(tmp_path / "rows.csv")
+    write_csv(file, 100)
+
+    loaded: dict[TableReference, list[int]] = {
+        reference: [] for reference in TableReference
+    }
+    checkpoints = []
+
+    def save_checkpoint(checkpoint):
+        checkpoints.append(
+            (
+                checkpoint,
+                {reference: max(ids, default=-1) for reference, ids in loaded.items()},
+            )
+        )
+
+    monkeypatch.setattr(Files, "COUNTRIES", str(tmp_path / "countries.json"))
+    monkeypatch.setattr(Files, "CHECKPOINT", str(tmp_path / "checkpoint.json"))
+    monkeypatch.setattr(SqlTable, "get_values", lambda *args, **kwargs: [])
+    monkeypatch.setattr(utils, "summarize_tables", lambda *args, **kwargs: None)
+    monkeypatch.setattr(utils, "save_checkpoint", save_checkpoint)
+    monkeypatch.setattr(
+        utils,
+        "get_loader",
+        lambda load_mode, sql_executor, country_resolver, export_directory: (
+            RecordingLoader(country_resolver, loaded)
+        ),
+    )
+
+    utils.initialize_tables()
+    utils.data_insertion(
+        load_mode=LoadMode.COPY,
+        chunk_size=7,
+        reader_workers=1,
+        resume=False,
+        append=False,
+        build_indexes=False,
+        fast_load=False,
+        compact=compact,
+        pipeline_batches=pipeline_batches,
+        encoding=encoding,
+        profile=False,
+        file=file,
+    )
+
+    assert len(checkpoints) == 100 // 7
+    for checkpoint, last_ids in checkpoints:
+        for reference in TableReference:
+            assert (
+                checkpoint["tables"][reference.name]["id"] == last_ids[reference]
+            ), f"{reference.name} after {checkpoint['rows']} rows"
+
+
+class FailingLoader(RecordingLoader):
+    """
+    A loader whose rows can never be flushed.
+    """
+
+    def flush(self) -> None:
+        raise RuntimeError("the database is gone")
+
+    def detach(self) -> "FailingLoader":
+        return self
+
+
+def test_writer_error_doesnt_hide_the_load_error(tmp_path, monkeypatch, capsys):
+    """
+    When the load fails while a chunk is being written, the error of the load
+    must be raised, and the one of the writer only reported.
+    """
+
+    file = str(tmp_path / "rows.csv")
+    write_csv(file, 10)
+    with open(file, "a", encoding="utf-8") as output:
+        output.write("broken,row\n")
+
+    monkeypatch.setattr(Files, "COUNTRIES", str(tmp_path / "countries.json"))
+    monkeypatch.setattr(Files, "CHECKPOINT", str(tmp_path / "checkpoint.json"))
+    monkeypatch.setattr(SqlTable, "get_values", lambda *args, **kwargs: [])
+    monkeypatch.setattr(
+        utils,
+        "get_loader",
+        lambda load_mode, sql_executor, country_resolver, export_directory: (
+            FailingLoader(country_resolver, {})
+        ),
+    )
+
+    utils.initialize_tables()
+    with pytest.raises(ValueError):
+        utils.data_insertion(
+            load_mode=LoadMode.COPY,
+            chunk_size=7,
+            reader_workers=1,
+            resume=False,
+            append=False,
+            build_indexes=False,
+            fast_load=False,
+            compact=False,
+            pipeline_batches=2,
+            encoding=Encoding.ROW,
+            profile=False,
+            file=file,
+        )
+    assert "the database is gone" in capsys.readouterr().out
+
+
+def test_new_countries_are_saved(tmp_path, monkeypatch):
+    """
+    The countries resolved during the load that weren't in Files.COUNTRIES
+    must be saved in it, so the next loads don't convert them again.
+    """
+
+    file = str(tmp_path / "rows.csv")
+    write_csv(file, 20)
+    countries = str(tmp_path / "countries.json")
+    CountryResolver([("COL", "COL", "SA")]).save(countries)
+
+    monkeypatch.setattr(Files, "COUNTRIES", countries)
+    monkeypatch.setattr(Files, "CHECKPOINT", str(tmp_path / "checkpoint.json"))
+    monkeypatch.setattr(Files, "PROFILE", str(tmp_path / "profile.json"))
+    monkeypatch.setattr(SqlTable, "get_values", lambda *args, **kwargs: [])
+    monkeypatch.setattr(utils, "summarize_tables", lambda *args, **kwargs: None)
+    monkeypatch.setattr(
+        utils,
+        "get_loader",
+        lambda load_mode, sql_executor, country_resolver, export_directory: (
+            RecordingLoader(
+                country_resolver, {reference: [] for reference in TableReference}
+            )
+        ),
+    )
+
+    utils.initialize_tables()
+    utils.data_insertion(
+        load_mode=LoadMode.COPY,
+        chunk_size=0,
+        reader_workers=1,
+        resume=False,
+        append=False,
+        build_indexes=False,
+        fast_load=False,
+        compact=False,
+        pipeline_batches=0,
+        encoding=Encoding.ROW,
+        profile=True,
+        file=file,
+    )
+
+    with open(countries, encoding="utf-8") as input_file:
+        saved = {
+            code: (country, continent)
+            for code, country, continent in json.load(input_file)
+        }
+    assert saved["COL"] == ("COL", "SA")
+    assert saved["ESP"] == ("ESP", "EU")
+    assert saved["USA"] == ("USA", "NA")
@@ -0,0 +1,105 @@
+from contextlib import contextmanager, nullcontext
+from modules import executors
+from modules.executors import QueryCache, SqlExecutor
+
+
+class Clock:
+    """
+    A monotonic clock that only moves when it is told to.
+    """
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakePool:
+    """
+    A pool whose connections don't connect to any database.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        pass
+
+    @contextmanager
+    def connection(self):
+        yield nullcontext()
+
+
+def test_query_cache_evicts_the_least_recently_used():
+    cache = QueryCache(max_size=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == (True, 1)
+
+    cache.put("c", 3)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 1)
+    assert cache.get("c") == (True, 3)
+    assert cache.get_stats() == {
+        "max_size": 2,
+        "size": 2,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 1,
+        "expirations": 0,
+        "invalidations": 0,
+    }
+
+
+def test_query_cache_expires_the_responses(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(executors, "monotonic", clock)
+    cache = QueryCache(max_size=2, ttl=10)
+    cache.put("a", 1)
+
+    clock.now = 9.9
+    assert cache.get("a") == (True, 1)
+    clock.now = 10
+    assert cache.get("a") == (False, None)
+    assert cache.get_stats()["expirations"] == 1
+    assert cache.get_stats()["size"] == 0
+
+
+def test_query_cache_returns_copies():
+    cache = QueryCache(max_size=2, ttl=60)
+    response = [(1, "a")]
+    cache.put("a", response)
+    response.append((2, "b"))
+
+    _, cached = cache.get("a")
+    cached.append((3, "c"))
+    assert cache.get("a") == (True, [(1, "a")])
+
+
+def test_query_cache_of_size_zero_is_disabled():
+    cache = QueryCache(max_size=0, ttl=60)
+    cache.put("a", 1)
+    assert cache.get("a") == (False, None)
+    assert cache.get_stats()["size"] == 0
+
+
+def test_invalidate_cache_discards_the_cached_responses(monkeypatch):
+    executed = []
+
+    def execute(self, conn, query, params, handle_conn):
+        executed.append(query)
+        return [(len(executed),)]
+
+    monkeypatch.setattr(executors, "ConnectionPool", FakePool)
+    monkeypatch.setattr(SqlExecutor, "_SqlExecutor__execute", execute)
+    sql_executor = SqlExecutor(
+        database="test_invalidate_cache", user="test", password=None
+    )
+
+    assert sql_executor.run_query("SELECT 1", cache=True) == [(1,)]
+    # The same query written with another indentation is found in the cache.
+    assert sql_executor.run_query("SELECT\n    1", cache=True) == [(1,)]
+    assert len(executed) == 1
+
+    SqlExecutor.invalidate_cache()
+    assert sql_executor.run_query("SELECT 1", cache=True) == [(2,)]
+    assert len(executed) == 2
+    assert sql_executor.get_cache_stats()["invalidations"] == 1
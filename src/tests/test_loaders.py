@@ -0,0 +1,50 @@
+from modules import utils
+from modules.loaders import QueryLoader
+from modules.objects import CountryResolver, SqlTable
+
+
+class RecordingExecutor:
+    """
+    An executor that, instead of running the queries, keeps them.
+    """
+
+    def __init__(self) -> None:
+        self.queries: list[str] = []
+
+    def run_query(self, query: str) -> None:
+        self.queries.append(query)
+
+
+def test_query_loader_escapes_single_quotes(monkeypatch):
+    """
+    A value with a single quote must be inserted as a literal, instead of ending it.
+    """
+
+    monkeypatch.setattr(SqlTable, "get_values", lambda *args, **kwargs: [])
+    utils.initialize_tables()
+
+    executor = RecordingExecutor()
+    loader = QueryLoader(executor, CountryResolver.build())
+    loader.add_row(
+        [
+            "COTE D'IVOIRE",
+            "CIV",
+            "ABIDJAN",
+            "X",
+            "30",
+            "INGENIERIA",
+            "INGENIERIA DE SISTEMAS",
+            "PREGRADO",
+            "SOLTERO",
+            "FEMENINO",
+            "NINGUNA",
+            "160",
+            "(0, 0)",
+            "1",
+        ]
+    )
+    loader.flush()
+
+    assert len(executor.queries) == 1
+    assert "'COTE D''IVOIRE'" in executor.queries[0]
+    assert "'COTE D'IVOIRE'" not in executor.queries[0]
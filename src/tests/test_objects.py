@@ -0,0 +1,116 @@
+import json
+import pandas as pd
+from modules import utils
+from modules.objects import DimensionDictionary, SqlTable
+from settings import Encoding, Files, LoadMode, TableReference, Variables
+from tests.test_checkpoints import HEADERS, RecordingLoader, write_csv
+
+FIRST = ["1", "2", "3", "1", "30", "160"]
+SECOND = ["1", "2", "3", "2", "30", "160"]
+
+
+def get_fact_table() -> SqlTable:
+    utils.initialize_tables()
+    fact_table = Variables.Sql.TABLES[TableReference.DESCRIPCION_DEMOGRAFICA]
+    fact_table.set_compaction(True)
+    return fact_table
+
+
+def test_compaction_folds_the_repeated_rows():
+    fact_table = get_fact_table()
+    for values, quantity in [(FIRST, 1), (SECOND, 2), (FIRST, 3), (FIRST, 4)]:
+        assert fact_table.add_values([*values, str(quantity)]) is None
+
+    assert fact_table.pop_compacted_values() == [[0, *FIRST, 8], [1, *SECOND, 2]]
+    assert fact_table.pop_compacted_values() == []
+
+    # The ids of the next rows continue after the ones already popped.
+    fact_table.add_values([*FIRST, "5"])
+    assert fact_table.pop_compacted_values() == [[2, *FIRST, 5]]
+
+
+def test_compaction_splits_the_rows_that_would_overflow():
+    fact_table = get_fact_table()
+    # The first sum reaches the maximum, so the next quantity starts another row.
+    for quantity in [30000, 2767, 1, 20000, 12767, 7]:
+        fact_table.add_values([*FIRST, str(quantity)])
+    fact_table.add_values([*SECOND, str(Variables.Sql.SMALLINT_MAX)])
+
+    rows = fact_table.pop_compacted_values()
+    assert [row[0] for row in rows] == list(range(len(rows)))
+    assert all(row[-1] <= Variables.Sql.SMALLINT_MAX for row in rows)
+    assert [row[-1] for row in rows if row[1:-1] == FIRST] == [32767, 20001, 12774]
+    assert [row[-1] for row in rows if row[1:-1] == SECOND] == [32767]
+
+
+def test_compaction_ratio(tmp_path, monkeypatch, capsys):
+    """
+    The summary of a compacted load must report one row per distinct demographic
+    description of the CSV file.
+    """
+
+    file = str(tmp_path / "rows.csv")
+    write_csv(file, 100)
+    descriptions = len(
+        pd.read_csv(file).drop_duplicates(
+            subset=[HEADERS[index] for index in (2, 4, 6, 7, 9, 11)]
+        )
+    )
+
+    monkeypatch.setattr(Files, "COUNTRIES", str(tmp_path / "countries.json"))
+    monkeypatch.setattr(Files, "CHECKPOINT", str(tmp_path / "checkpoint.json"))
+    monkeypatch.setattr(SqlTable, "get_values", lambda *args, **kwargs: [])
+    monkeypatch.setattr(utils, "summarize_tables", lambda *args, **kwargs: None)
+    monkeypatch.setattr(
+        utils,
+        "get_loader",
+        lambda load_mode, sql_executor, country_resolver, export_directory: (
+            RecordingLoader(
+                country_resolver, {reference: [] for reference in TableReference}
+            )
+        ),
+    )
+
+    utils.initialize_tables()
+    utils.data_insertion(
+        load_mode=LoadMode.COPY,
+        chunk_size=0,
+        reader_workers=1,
+        resume=False,
+        append=False,
+        build_indexes=False,
+        fast_load=False,
+        compact=True,
+        pipeline_batches=0,
+        encoding=Encoding.ROW,
+        profile=False,
+        file=file,
+    )
+
+    assert (
+        f"100 rows compacted into {descriptions} ({100 / descriptions:.2f}x)"
+        in capsys.readouterr().out
+    )
+
+
+def test_dimension_dictionary_state_groups_consecutive_ids():
+    items = [
+        ("NO INDICA", "NULL"),
+        ("(NO REGISTRA)", "NULL"),
+        ("BOGOTA", 0),
+        ("MADRID", 1),
+        ("MIAMI", 2),
+        ("PARIS", 7),
+        ("ROMA", 8),
+        (12, 9),
+    ]
+    state = DimensionDictionary(items).get_state()
+    assert state == [
+        ["NULL", ["NO INDICA", "(NO REGISTRA)"]],
+        [0, ["BOGOTA", "MADRID", "MIAMI"]],
+        [7, ["PARIS", "ROMA", 12]],
+    ]
+
+    dictionary = DimensionDictionary()
+    dictionary.set_state(json.loads(json.dumps(state)))
+    assert list(dictionary.get_items()) == items
@@ -0,0 +1,30 @@
+import pytest
+from modules.parsers import SqlParser
+
+
+@pytest.mark.parametrize(
+    "query,normalized",
+    [
+        ("SELECT 1", "SELECT 1"),
+        ("\n    SELECT\n\t*  FROM  t\n    ", "SELECT * FROM t"),
+        ("SELECT 'a   b'  FROM t", "SELECT 'a   b' FROM t"),
+        ("WHERE x = 'it''s\n  here'   AND y", "WHERE x = 'it''s\n  here' AND y"),
+        ('SELECT  "años  persona"  FROM  t', 'SELECT "años  persona" FROM t'),
+        ('SELECT "a ""b  c"""  ,  \'\'', 'SELECT "a ""b  c""" , \'\''),
+    ],
+)
+def test_normalize_query(query, normalized):
+    assert SqlParser.normalize_query(query) == normalized
+
+
+def test_normalize_query_keeps_the_literals_apart():
+    """
+    The queries that only differ in the whitespace of a literal aren't the same query.
+    """
+
+    assert SqlParser.normalize_query(
+        "SELECT * FROM t WHERE name = 'a b'"
+    ) != SqlParser.normalize_query("SELECT * FROM t WHERE name = 'a  b'")
+    assert SqlParser.normalize_query(
+        "SELECT * FROM t\n WHERE name = 'a b'"
+    ) == SqlParser.normalize_query("SELECT * FROM t WHERE   name = 'a b'")
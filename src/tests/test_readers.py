@@ -0,0 +1,144 @@
+import csv
+import gzip
+import io
+import zipfile
+from itertools import chain
+import pytest
+from modules.readers import CsvReader, _parse_byte_range
+from settings import CsvBackend
+
+HEADER = "País,Oficina,Localización,Cantidad\n"
+
+
+def get_lines(num_rows: int) -> list[str]:
+    """
+    Get the lines of a CSV file whose rows have quoted delimiters,
+    multibyte characters and blank lines between them.
+    """
+
+    lines = [HEADER]
+    for row in range(num_rows):
+        lines.append(f'ESPAÑA {row % 3},"BOGOTÁ, D.C.","({row}, -{row})",{row}\n')
+        if row % 7 == 3:
+            lines.append("\n")
+    return lines
+
+
+def get_expected_rows(lines: list[str]) -> list[tuple[list[str], int]]:
+    """
+    Get the rows after the headers, each one along with the byte where the next one begins.
+    """
+
+    expected = []
+    position = len(lines[0].encode("utf-8"))
+    for line in lines[1:]:
+        position += len(line.encode("utf-8"))
+        if line.strip():
+            expected.append((next(csv.reader(io.StringIO(line))), position))
+    return expected
+
+
+@pytest.fixture(scope="module")
+def files(tmp_path_factory) -> dict[str, str]:
+    directory = tmp_path_factory.mktemp("readers")
+    content = "".join(get_lines(200)).encode("utf-8")
+
+    plain = directory / "rows.csv"
+    plain.write_bytes(content)
+    compressed = directory / "rows.csv.gz"
+    with gzip.open(compressed, "wb") as output:
+        output.write(content)
+    archived = directory / "rows.csv.zip"
+    with zipfile.ZipFile(archived, "w") as output:
+        output.writestr("rows.csv", content)
+
+    return {"": str(plain), "gz": str(compressed), "zip": str(archived)}
+
+
+@pytest.fixture(scope="module")
+def expected() -> list[tuple[list[str], int]]:
+    return get_expected_rows(get_lines(200))
+
+
+@pytest.mark.parametrize("compression", ["", "gz", "zip"])
+@pytest.mark.parametrize("backend", list(CsvBackend))
+def test_every_backend_reads_the_same_rows(files, expected, compression, backend):
+    csv_reader = CsvReader(files[compression], backend=backend)
+    csv_reader.block_size = 256
+
+    assert csv_reader.get_headers() == HEADER.strip().split(",")
+    assert list(csv_reader.get_rows()) == [row for row, _ in expected]
+    assert list(csv_reader.get_rows_in_range(with_offsets=True)) == expected
+
+
+@pytest.mark.parametrize("compression", ["", "gz", "zip"])
+@pytest.mark.parametrize("backend", list(CsvBackend))
+def test_rows_resume_from_an_offset(files, expected, compression, backend):
+    csv_reader = CsvReader(files[compression], backend=backend)
+    _, offset = expected[41]
+
+    assert list(csv_reader.get_rows_in_range(offset, with_offsets=True)) == (
+        expected[42:]
+    )
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+@pytest.mark.parametrize("compression", ["", "gz", "zip"])
+@pytest.mark.parametrize("backend", list(CsvBackend))
+def test_row_batches_read_the_same_rows(
+    files, expected, compression, backend, ordered
+):
+    csv_reader = CsvReader(files[compression], backend=backend)
+    _, offset = expected[9]
+
+    rows = list(
+        chain.from_iterable(
+            csv_reader.get_row_batches(
+                workers=2,
+                batch_size=512,
+                ordered=ordered,
+                start=offset,
+                with_offsets=True,
+            )
+        )
+    )
+    if not ordered:
+        rows.sort(key=lambda row: row[1])
+    assert rows == expected[10:]
+
+
+def test_row_batches_stop_at_the_row_limit(files, expected):
+    csv_reader = CsvReader(files[""])
+    batches = list(
+        csv_reader.get_row_batches(row_limit=50, workers=2, batch_size=512)
+    )
+
+    assert len(batches) > 1
+    assert list(chain.from_iterable(batches)) == [row for row, _ in expected[:50]]
+
+
+def test_byte_ranges_split_the_file_in_lines(files, expected):
+    csv_reader = CsvReader(files[""])
+    ranges = csv_reader.get_byte_ranges(300)
+    with open(files[""], "rb") as file:
+        content = file.read()
+
+    assert ranges[0][0] == len(HEADER.encode("utf-8"))
+    assert ranges[-1][1] == len(content)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert content[end - 1 : end] == b"\n"
+
+    rows = chain.from_iterable(
+        _parse_byte_range(
+            files[""], ",", CsvBackend.PYTHON, start, end, slice(0, None), True
+        )
+        for start, end in ranges
+    )
+    assert list(rows) == expected
+
+
+@pytest.mark.parametrize("compression", ["gz", "zip"])
+def test_compressed_files_cant_be_split_in_byte_ranges(files, compression):
+    with pytest.raises(AssertionError):
+        CsvReader(files[compression]).get_byte_ranges(300)
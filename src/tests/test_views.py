@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from modules.views import AgeView
+
+COLUMN = AgeView.BOXPLOT_COLUMNS[0]
+
+
+def get_box_statistics(ages: list[float], rows: list[int]) -> dict:
+    return AgeView._AgeView__get_box_statistics(
+        pd.DataFrame({COLUMN: ages, "filas": rows}), COLUMN
+    )
+
+
+def get_expected_statistics(values: "np.ndarray") -> dict:
+    """
+    Compute the statistics of a box plot the way plotly does from the rows one by one:
+    the quartiles with its linear method (numpy's hazen) and the fences at the furthest
+    values within 1.5 times the interquartile range.
+    """
+
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75], method="hazen")
+    lower_fence = min(q1, values[values >= q1 - 1.5 * (q3 - q1)].min())
+    upper_fence = max(q3, values[values <= q3 + 1.5 * (q3 - q1)].max())
+    return {
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "lowerfence": lower_fence,
+        "upperfence": upper_fence,
+        "outliers": set(values[(values < lower_fence) | (values > upper_fence)]),
+    }
+
+
+@pytest.mark.parametrize(
+    "ages,rows",
+    [
+        ([30], [1]),
+        ([30], [7]),
+        ([20, 40], [1, 1]),
+        ([20, 25, 40], [1, 2, 1]),
+        ([18, 19, 20, 21, 22, 85, -1], [40, 3, 1, 50, 9, 1, 2]),
+        ([40, 20, 30, 10], [5, 1, 5, 1]),
+    ],
+)
+def test_box_statistics_match_the_expanded_rows(ages, rows):
+    statistics = get_box_statistics(ages, rows)
+    expected = get_expected_statistics(np.repeat(np.array(ages, dtype=float), rows))
+
+    for key in ("q1", "median", "q3", "lowerfence", "upperfence"):
+        assert statistics[key][0] == pytest.approx(expected[key]), key
+    assert set(statistics["y"][0]) == expected["outliers"]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_box_statistics_match_random_rows(seed):
+    generator = np.random.default_rng(seed)
+    ages = generator.choice(
+        np.arange(-1, 100), size=generator.integers(1, 40), replace=False
+    )
+    rows = generator.integers(1, 200, size=len(ages))
+
+    statistics = get_box_statistics(ages.tolist(), rows.tolist())
+    expected = get_expected_statistics(np.repeat(ages.astype(float), rows))
+
+    for key in ("q1", "median", "q3", "lowerfence", "upperfence"):
+        assert statistics[key][0] == pytest.approx(expected[key]), key
+    assert set(statistics["y"][0]) == expected["outliers"]
+
+
+def test_box_statistics_without_ages():
+    assert get_box_statistics([None], [3]) == {}
+    assert get_box_statistics([], []) == {}